@@ -0,0 +1,28 @@
+"""add_token_version_to_users
+
+Revision ID: 3c1e5b7a9d20
+Revises: 7d7a19083b72
+Create Date: 2025-09-02 10:15:42.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1e5b7a9d20'
+down_revision: Union[str, None] = '7d7a19083b72'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add token_version column used to revoke issued access tokens
+    op.add_column('users', sa.Column('token_version', sa.Integer(), nullable=False, server_default='0'))
+
+
+def downgrade() -> None:
+    # Remove token_version column from users table
+    op.drop_column('users', 'token_version')
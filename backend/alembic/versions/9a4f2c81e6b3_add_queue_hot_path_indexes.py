@@ -0,0 +1,66 @@
+"""add_queue_hot_path_indexes
+
+Revision ID: 9a4f2c81e6b3
+Revises: 3c1e5b7a9d20
+Create Date: 2025-09-03 09:42:17.504112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f2c81e6b3'
+down_revision: Union[str, None] = '3c1e5b7a9d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Queue.status is a SQLAlchemy Enum, which stores member names
+WAITING = sa.text("status = 'WAITING'")
+
+
+def _create_indexes(**kw) -> None:
+    # Listings filtered by status, ordered by priority desc, check-in time asc
+    op.create_index(
+        'ix_queue_status_priority_check_in', 'queue',
+        ['status', sa.text('priority DESC'), 'check_in_time'],
+        unique=False, **kw
+    )
+    # add_to_queue "already in queue" check
+    op.create_index(
+        'ix_queue_patient_id_status', 'queue',
+        ['patient_id', 'status'],
+        unique=False, **kw
+    )
+    # Head of the waiting queue
+    op.create_index(
+        'ix_queue_waiting_priority_check_in', 'queue',
+        [sa.text('priority DESC'), 'check_in_time'],
+        unique=False, postgresql_where=WAITING, sqlite_where=WAITING, **kw
+    )
+
+
+def _drop_indexes(**kw) -> None:
+    op.drop_index('ix_queue_waiting_priority_check_in', table_name='queue', **kw)
+    op.drop_index('ix_queue_patient_id_status', table_name='queue', **kw)
+    op.drop_index('ix_queue_status_priority_check_in', table_name='queue', **kw)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Build without locking the queue table against writes; CONCURRENTLY
+        # cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            _create_indexes(postgresql_concurrently=True, if_not_exists=True)
+    else:
+        _create_indexes()
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            _drop_indexes(postgresql_concurrently=True, if_exists=True)
+    else:
+        _drop_indexes()
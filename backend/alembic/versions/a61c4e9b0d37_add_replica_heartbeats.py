@@ -0,0 +1,33 @@
+"""add_replica_heartbeats
+
+Revision ID: a61c4e9b0d37
+Revises: f3a9c6d2b817
+Create Date: 2025-09-09 10:41:05.218734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61c4e9b0d37'
+down_revision: Union[str, None] = 'f3a9c6d2b817'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Heartbeat stamped on the primary and read back from the read replica
+    # to measure replication lag
+    op.create_table('replica_heartbeats',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('beat_at', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    # Drop replica heartbeats
+    op.drop_table('replica_heartbeats')
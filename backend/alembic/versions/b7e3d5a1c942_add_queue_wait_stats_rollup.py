@@ -0,0 +1,110 @@
+"""add_queue_wait_stats_rollup
+
+Revision ID: b7e3d5a1c942
+Revises: 9a4f2c81e6b3
+Create Date: 2025-09-04 16:08:51.730245
+
+"""
+import bisect
+from datetime import timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e3d5a1c942'
+down_revision: Union[str, None] = '9a4f2c81e6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copy of QueueWaitStat.BUCKETS at the time of this revision
+BUCKETS = [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 360, 480, 720, 1440, 100000]
+
+# Stored enum names of the statuses counted in queue_status_counts, and their values
+COUNTED_STATUSES = {'COMPLETED': 'completed', 'CANCELLED': 'cancelled'}
+
+
+def _utc_naive(value):
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def upgrade() -> None:
+    # Create wait-time rollup table
+    stats = op.create_table('queue_wait_stats',
+        sa.Column('checkup_type', sa.String(), nullable=False),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('wait_seconds', sa.Float(), nullable=False),
+        sa.Column('service_seconds', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('checkup_type', 'bucket')
+    )
+
+    # Completed and cancelled entries per checkup type, so queue statistics
+    # do not count the whole queue history
+    counts = op.create_table('queue_status_counts',
+        sa.Column('checkup_type', sa.String(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('checkup_type', 'status')
+    )
+
+    queue = sa.table('queue',
+        sa.column('checkup_type', sa.String()),
+        sa.column('status', sa.String()),
+        sa.column('check_in_time', sa.DateTime()),
+        sa.column('start_time', sa.DateTime()),
+        sa.column('end_time', sa.DateTime())
+    )
+    bind = op.get_bind()
+    status_counts = bind.execute(
+        sa.select(queue.c.checkup_type, queue.c.status, sa.func.count())
+        .where(queue.c.status.in_(list(COUNTED_STATUSES)))
+        .group_by(queue.c.checkup_type, queue.c.status)
+    ).all()
+    if status_counts:
+        op.bulk_insert(counts, [
+            {'checkup_type': checkup_type, 'status': COUNTED_STATUSES[status], 'count': count}
+            for checkup_type, status, count in status_counts
+        ])
+
+    # Backfill the wait-time rollup from completed queue history, streaming rows
+    rows = bind.execution_options(stream_results=True, yield_per=5000).execute(
+        sa.select(queue.c.checkup_type, queue.c.check_in_time, queue.c.start_time, queue.c.end_time)
+        .where(queue.c.status == 'COMPLETED')
+        .where(queue.c.check_in_time.isnot(None))
+        .where(queue.c.start_time.isnot(None))
+    )
+
+    totals = {}
+    for checkup_type, check_in_time, start_time, end_time in rows:
+        wait_seconds = max((_utc_naive(start_time) - _utc_naive(check_in_time)).total_seconds(), 0.0)
+        service_seconds = 0.0
+        if end_time is not None:
+            service_seconds = max((_utc_naive(end_time) - _utc_naive(start_time)).total_seconds(), 0.0)
+        bucket = BUCKETS[min(bisect.bisect_left(BUCKETS, wait_seconds / 60), len(BUCKETS) - 1)]
+        entry = totals.setdefault((checkup_type, bucket), [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += wait_seconds
+        entry[2] += service_seconds
+
+    if totals:
+        op.bulk_insert(stats, [
+            {
+                'checkup_type': checkup_type,
+                'bucket': bucket,
+                'count': count,
+                'wait_seconds': wait_seconds,
+                'service_seconds': service_seconds
+            }
+            for (checkup_type, bucket), (count, wait_seconds, service_seconds) in totals.items()
+        ])
+
+
+def downgrade() -> None:
+    # Drop rollup tables
+    op.drop_table('queue_status_counts')
+    op.drop_table('queue_wait_stats')
@@ -0,0 +1,35 @@
+"""add_assigned_to_to_queue
+
+Revision ID: d52a8f6c13e7
+Revises: b7e3d5a1c942
+Create Date: 2025-09-05 11:27:03.914562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd52a8f6c13e7'
+down_revision: Union[str, None] = 'b7e3d5a1c942'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Add assigned_to column recording which station user claimed the entry
+    with op.batch_alter_table('queue') as batch_op:
+        batch_op.add_column(sa.Column('assigned_to', sa.Integer(), nullable=True))
+        # Deleting a user keeps the entries they served, unassigned
+        batch_op.create_foreign_key(
+            'fk_queue_assigned_to_users', 'users', ['assigned_to'], ['id'], ondelete='SET NULL'
+        )
+
+
+def downgrade() -> None:
+    # Remove assigned_to column from queue table
+    with op.batch_alter_table('queue') as batch_op:
+        batch_op.drop_constraint('fk_queue_assigned_to_users', type_='foreignkey')
+        batch_op.drop_column('assigned_to')
@@ -0,0 +1,34 @@
+"""add_id_sequences
+
+Revision ID: e8b14c7f2a65
+Revises: d52a8f6c13e7
+Create Date: 2025-09-06 09:12:38.402917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b14c7f2a65'
+down_revision: Union[str, None] = 'd52a8f6c13e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Create named counters used for block-allocated identifiers. Sequences
+    # start at 1; new queue numbers (Q0001, GC-001, ...) are at least five
+    # characters, so they cannot collide with the old random 4-character ones
+    op.create_table('id_sequences',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('next_value', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    # Drop identifier counters
+    op.drop_table('id_sequences')
@@ -0,0 +1,81 @@
+"""add_patient_search_index
+
+Revision ID: f3a9c6d2b817
+Revises: e8b14c7f2a65
+Create Date: 2025-09-08 14:36:21.557104
+
+"""
+import sqlite3
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3a9c6d2b817'
+down_revision: Union[str, None] = 'e8b14c7f2a65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Copy of the search DDL in app/models/patient.py at the time of this revision
+SEARCH_COLUMNS = ('first_name', 'last_name', 'patient_id')
+
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+        first_name, last_name, patient_id,
+        content='patients', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, first_name, last_name, patient_id)
+        VALUES (new.id, new.first_name, new.last_name, new.patient_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, patient_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.patient_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF first_name, last_name, patient_id ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, patient_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.patient_id);
+        INSERT INTO patients_fts(rowid, first_name, last_name, patient_id)
+        VALUES (new.id, new.first_name, new.last_name, new.patient_id);
+    END""",
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # The trigram tokenizer needs SQLite 3.34+; without it search keeps using ILIKE
+        if sqlite3.sqlite_version_info < (3, 34, 0):
+            return
+        for statement in SQLITE_SEARCH_DDL:
+            op.execute(statement)
+        # Index existing patients
+        op.execute("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # Build without blocking patient writes; CONCURRENTLY cannot run in a transaction
+        with op.get_context().autocommit_block():
+            for column in SEARCH_COLUMNS:
+                op.create_index(
+                    f'ix_patients_{column}_trgm', 'patients', [column],
+                    unique=False, postgresql_using='gin',
+                    postgresql_ops={column: 'gin_trgm_ops'},
+                    postgresql_concurrently=True, if_not_exists=True
+                )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('patients_fts_ai', 'patients_fts_ad', 'patients_fts_au'):
+            op.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        op.execute('DROP TABLE IF EXISTS patients_fts')
+    elif dialect == 'postgresql':
+        with op.get_context().autocommit_block():
+            for column in SEARCH_COLUMNS:
+                op.drop_index(
+                    f'ix_patients_{column}_trgm', table_name='patients',
+                    postgresql_concurrently=True, if_exists=True
+                )
@@ -5,11 +5,11 @@ Authentication API endpoints
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import AnySession, get_db, get_service_db
 from app.schemas.user import UserLogin, Token, UserCreate, UserResponse, LoginResponse
 from app.models.user import User
 from app.services.auth import AuthService
-from app.services.user import UserService
+from app.services.async_services import AsyncAuthService, AsyncUserService
 
 router = APIRouter(
     prefix="/auth",
@@ -48,10 +48,11 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
             }
         },
         400: {"description": "Username or email already exists"},
-        422: {"description": "Validation error"}
+        422: {"description": "Validation error"},
+        503: {"description": "Password hashing pool is overloaded, retry later"}
     }
 )
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AnySession = Depends(get_service_db)):
     """
     Register a new user account.
     
@@ -61,8 +62,9 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     - **full_name**: User's full name (2-100 characters)
     """
     try:
-        user_service = UserService(db)
-        user = user_service.create_user(user_data)
+        hashed_password = await AsyncAuthService(db).get_password_hash_async(user_data.password)
+        user_service = AsyncUserService(db)
+        user = await user_service.create_user(user_data, hashed_password=hashed_password)
         return user
     except ValueError as e:
         raise HTTPException(
@@ -98,12 +100,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
                 }
             }
         },
-        401: {"description": "Invalid credentials"}
+        401: {"description": "Invalid credentials"},
+        503: {"description": "Password hashing pool is overloaded, retry later"}
     }
 )
 async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Authenticate user and return JWT access token with user information.
@@ -111,8 +114,8 @@ async def login(
     - **username**: User's username
     - **password**: User's password
     """
-    auth_service = AuthService(db)
-    user = auth_service.authenticate_user(form_data.username, form_data.password)
+    auth_service = AsyncAuthService(db)
+    user = await auth_service.authenticate_user_async(form_data.username, form_data.password)
     
     if not user:
         raise HTTPException(
@@ -121,7 +124,7 @@ async def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    access_token = auth_service.create_access_token(data={"sub": user.username})
+    access_token = await auth_service.create_access_token(data={"sub": user.username}, user=user)
     
     # Convert user model to response schema
     user_response = UserResponse(
@@ -0,0 +1,67 @@
+"""
+Debug API endpoints
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from app.core.instrumentation import recent_requests
+from app.schemas.user import TokenData
+from app.services.auth import AuthService
+
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"],
+    responses={
+        401: {"description": "Unauthorized"},
+        403: {"description": "Forbidden - Requires superuser privileges"}
+    }
+)
+
+
+@router.get("/queries",
+    summary="Get recent request SQL stats",
+    description="Query count, database time, slow and repeated statements of the latest requests served by this worker",
+    responses={
+        200: {
+            "description": "Recent requests, newest first",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "method": "POST",
+                            "path": "/api/v1/patients/register",
+                            "status_code": 201,
+                            "queries": 9,
+                            "db_ms": 4.12,
+                            "total_ms": 11.87,
+                            "slow_statements": [],
+                            "repeated_statements": []
+                        }
+                    ]
+                }
+            }
+        }
+    }
+)
+async def get_recent_queries(
+    limit: int = Query(50, ge=1, le=1000, description="Maximum number of requests to return"),
+    min_queries: int = Query(0, ge=0, description="Only requests that issued at least this many statements"),
+    current_user: TokenData = Depends(AuthService.get_token_user)
+):
+    """
+    Get SQL stats of the latest requests served by this worker.
+    
+    - **limit**: Maximum number of requests to return (max 1000)
+    - **min_queries**: Only requests that issued at least this many statements
+    - **Requires**: Superuser privileges
+    
+    Slow statements exceed SQL_SLOW_QUERY_MS; repeated statements were issued
+    SQL_REPEATED_STATEMENT_THRESHOLD or more times in one request (likely N+1).
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough privileges"
+        )
+    
+    entries = [entry for entry in recent_requests.latest() if entry["queries"] >= min_queries]
+    return entries[:limit]
@@ -2,16 +2,26 @@
 Patients API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from typing import List, Optional
-from app.core.database import get_db
-from app.schemas.patient import PatientCreate, PatientUpdate, PatientResponse
-from app.schemas.queue import QueueCreate, QueueResponse
-from app.models.user import User
-from app.services.patient import PatientService
-from app.services.queue import QueueService
+from app.core.config import settings
+from app.core.database import AnySession, get_service_db
+from app.core.instrumentation import expect_repeated_statements
+from app.core.pagination import set_next_cursor
+from app.core.replica import get_read_service_db
+from app.schemas.patient import (
+    PatientCreate, PatientUpdate, PatientResponse, PatientSuggestionResponse,
+    PatientRegistration, PatientRegistrationResponse, PatientBatchRegistration,
+    PatientBatchRegistrationResponse, PatientImportResponse
+)
+from app.schemas.user import TokenData
+from app.services.async_services import AsyncPatientService
 from app.services.auth import AuthService
+from app.services.export import export_response
+from app.services.patient import PATIENT_CURSOR
+from app.services.patient_import import import_format, import_patients, make_parser
 
 router = APIRouter(
     prefix="/patients",
@@ -58,8 +68,8 @@ router = APIRouter(
 )
 async def create_patient(
     patient_data: PatientCreate,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Create a new patient record.
@@ -74,9 +84,9 @@ async def create_patient(
     - **emergency_contact**: Emergency contact phone (optional)
     - **medical_history**: Medical history notes (optional)
     """
-    patient_service = PatientService(db)
+    patient_service = AsyncPatientService(db)
     try:
-        patient = patient_service.create_patient(patient_data)
+        patient = await patient_service.create_patient(patient_data)
         return patient
     except ValueError as e:
         raise HTTPException(
@@ -85,6 +95,78 @@ async def create_patient(
         )
 
 
+@router.post("/import",
+    response_model=PatientImportResponse,
+    summary="Bulk import patients",
+    description="Create patients from a CSV or NDJSON upload, streamed and saved in batches",
+    responses={
+        200: {
+            "description": "Upload processed; see the report for rejected rows",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "rows": 3,
+                        "imported": 2,
+                        "failed": 1,
+                        "errors": [
+                            {"row": 2, "errors": ["date_of_birth: Input should be a valid date or datetime, input is too short"]}
+                        ],
+                        "errors_truncated": False
+                    }
+                }
+            }
+        },
+        400: {"description": "Malformed upload (CSV header, encoding)"},
+        415: {"description": "Upload is neither CSV nor NDJSON"}
+    }
+)
+async def import_patients_upload(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Upload format (default: from Content-Type)"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
+):
+    """
+    Import patients from the request body, e.g. for pre-registering a health camp.
+    
+    - **CSV** (`Content-Type: text/csv`): a header row of patient field names
+      (`first_name`, `last_name`, `date_of_birth`, `gender` required; `phone`,
+      `email`, `address`, `emergency_contact`, `medical_history` optional),
+      then one patient per row
+    - **NDJSON** (`Content-Type: application/x-ndjson`): one JSON object with
+      the same fields per line
+    - **format**: `csv` or `ndjson`, overriding the Content-Type
+    
+    The body is parsed as it arrives, each row is validated like `POST /patients/`
+    and valid rows are saved PATIENT_IMPORT_BATCH_SIZE at a time. Rejected rows
+    are listed in the report with their row number and errors; the other rows
+    are still imported.
+    """
+    upload_format = format or import_format(request.headers.get("content-type"))
+    if not upload_format:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Upload text/csv or application/x-ndjson, or pass format=csv|ndjson"
+        )
+    
+    expect_repeated_statements()
+    patient_service = AsyncPatientService(db)
+    try:
+        report = await import_patients(
+            request.stream(),
+            make_parser(upload_format, settings.patient_import_max_record_length),
+            patient_service.import_patients,
+            batch_size=settings.patient_import_batch_size,
+            max_errors=settings.patient_import_max_errors
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return report.as_dict()
+
+
 @router.get("/",
     response_model=List[PatientResponse],
     summary="Get all patients",
@@ -117,24 +199,228 @@ async def create_patient(
     }
 )
 async def get_patients(
-    skip: int = Query(0, ge=0, description="Number of patients to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of patients to skip (deprecated except for search results; use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of patients to return"),
     search: Optional[str] = Query(None, description="Search term for name or patient ID"),
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_read_service_db)
 ):
     """
     Get a list of all patients.
     
-    - **skip**: Number of patients to skip (for pagination)
+    - **cursor**: Continue after the previous page (from its `X-Next-Cursor` header)
+    - **skip**: Number of patients to skip (deprecated offset paging; still used for search results)
     - **limit**: Maximum number of patients to return (max 1000)
     - **search**: Optional search term for filtering by name or patient ID
+    
+    Full pages of the plain listing return the next page's cursor in `X-Next-Cursor`.
+    """
+    patient_service = AsyncPatientService(db)
+    try:
+        patients = await patient_service.get_patients(skip=skip, limit=limit, search=search, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if not search:
+        set_next_cursor(response, PATIENT_CURSOR, patients, limit)
+    return patients
+
+
+@router.get("/autocomplete",
+    response_model=List[PatientSuggestionResponse],
+    summary="Autocomplete patients",
+    description="Suggest patients whose name, patient ID or phone number starts with the typed text",
+    responses={
+        200: {
+            "description": "Suggestions retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": 1,
+                            "patient_id": "P00001Y",
+                            "first_name": "John",
+                            "last_name": "Doe",
+                            "date_of_birth": "1990-01-01",
+                            "phone": "+1234567890"
+                        }
+                    ]
+                }
+            }
+        }
+    }
+)
+async def autocomplete_patients(
+    q: str = Query(..., min_length=1, max_length=100, description="Typed prefix of a name, patient ID or phone number"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of suggestions to return"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
+):
+    """
+    Suggest patients for typeahead fields.
+    
+    - **q**: Typed prefix; matches first name, last name, "first last", "last first",
+      patient ID or phone number (digits only), ignoring case and accents
+    - **limit**: Maximum number of suggestions to return (max 50)
+    
+    Served from an in-memory index, so it never queries the database.
+    """
+    patient_service = AsyncPatientService(db)
+    return await patient_service.autocomplete(q, limit)
+
+
+@router.get("/completed",
+    response_model=List[PatientResponse],
+    summary="Get completed patients",
+    description="Retrieve a list of all completed/served patients",
+    responses={
+        200: {
+            "description": "Completed patients retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": [
+                        {
+                            "id": 1,
+                            "patient_id": "P001",
+                            "first_name": "John",
+                            "last_name": "Doe",
+                            "date_of_birth": "1990-01-01",
+                            "gender": "male",
+                            "phone": "+1234567890",
+                            "email": "john.doe@example.com",
+                            "address": "123 Main St, City, State",
+                            "emergency_contact": "+1987654321",
+                            "medical_history": "No known allergies",
+                            "created_at": "2024-01-01T10:00:00Z",
+                            "updated_at": "2024-01-01T11:00:00Z"
+                        }
+                    ]
+                }
+            }
+        }
+    }
+)
+async def get_completed_patients(
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of patients to skip (deprecated; use cursor)"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of patients to return"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
+):
     """
-    patient_service = PatientService(db)
-    patients = patient_service.get_patients(skip=skip, limit=limit, search=search)
+    Get a list of all completed/served patients.
+    
+    - **cursor**: Continue after the previous page (from its `X-Next-Cursor` header)
+    - **skip**: Number of patients to skip (deprecated offset paging)
+    - **limit**: Maximum number of patients to return (max 1000)
+    """
+    patient_service = AsyncPatientService(db)
+    try:
+        patients = await patient_service.get_completed_patients(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    set_next_cursor(response, PATIENT_CURSOR, patients, limit)
     return patients
 
 
+@router.get("/stats",
+    summary="Get patient statistics",
+    description="Get summary statistics of patients",
+    responses={
+        200: {
+            "description": "Patient statistics retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "total_patients": 150,
+                        "total_in_queue": 25,
+                        "total_served": 125,
+                        "average_wait_time": 45,
+                        "priority_distribution": {
+                            "normal": 100,
+                            "urgent": 30,
+                            "emergency": 20
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_patient_stats(
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_read_service_db)
+):
+    """
+    Get summary statistics of patients.
+    
+    Returns counts by status, average wait times, and priority distribution.
+    """
+    patient_service = AsyncPatientService(db)
+    stats = await patient_service.get_patient_stats()
+    return stats
+
+
+@router.get("/export",
+    response_class=StreamingResponse,
+    summary="Export patients",
+    description="Stream all patients, or those created in a date range, as NDJSON or CSV",
+    responses={
+        200: {
+            "description": "Export stream, one patient per line",
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"id":1,"patient_id":"P00001Y","first_name":"John","last_name":"Doe",'
+                               '"date_of_birth":"1990-01-01","gender":"male","phone":"+1234567890",'
+                               '"email":null,"address":null,"emergency_contact":null,"medical_history":null,'
+                               '"created_at":"2024-01-01T10:00:00","updated_at":null}\n'
+                },
+                "text/csv": {
+                    "example": "id,patient_id,first_name,last_name,date_of_birth,gender,phone,email,address,"
+                               "emergency_contact,medical_history,created_at,updated_at\n"
+                               "1,P00001Y,John,Doe,1990-01-01,male,+1234567890,,,,,2024-01-01T10:00:00,\n"
+                }
+            }
+        },
+        400: {"description": "Empty date range"}
+    }
+)
+async def export_patients(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$", description="Export format"),
+    created_from: Optional[datetime] = Query(None, description="Only patients created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only patients created before this time"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_read_service_db)
+):
+    """
+    Export patients in ID order, e.g. for reporting or a data warehouse load.
+    
+    - **format**: `ndjson` (one JSON object per line, default) or `csv` (with a header row)
+    - **created_from** / **created_to**: Date or date-time range on `created_at`
+      (from inclusive, to exclusive; times without an offset are UTC)
+    
+    Rows are streamed from the database in batches as they are sent, so any
+    number of patients can be exported in one request.
+    """
+    patient_service = AsyncPatientService(db)
+    try:
+        statement = await patient_service.export_query(created_from, created_to)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return export_response(db, statement, format, "patients", settings.export_batch_size)
+
+
 @router.get("/{patient_id}",
     response_model=PatientResponse,
     summary="Get patient by ID",
@@ -167,16 +453,16 @@ async def get_patients(
 )
 async def get_patient(
     patient_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Get a specific patient by ID.
     
     - **patient_id**: The ID of the patient to retrieve
     """
-    patient_service = PatientService(db)
-    patient = patient_service.get_patient(patient_id)
+    patient_service = AsyncPatientService(db)
+    patient = await patient_service.get_patient(patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -218,8 +504,8 @@ async def get_patient(
 async def update_patient(
     patient_id: int,
     patient_update: PatientUpdate,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Update patient information.
@@ -227,8 +513,8 @@ async def update_patient(
     - **patient_id**: The ID of the patient to update
     - **patient_update**: Updated patient data
     """
-    patient_service = PatientService(db)
-    patient = patient_service.update_patient(patient_id, patient_update)
+    patient_service = AsyncPatientService(db)
+    patient = await patient_service.update_patient(patient_id, patient_update)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -248,16 +534,16 @@ async def update_patient(
 )
 async def delete_patient(
     patient_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
-    Delete a patient record.
+    Delete a patient record and the patient's queue entries.
     
     - **patient_id**: The ID of the patient to delete
     """
-    patient_service = PatientService(db)
-    success = patient_service.delete_patient(patient_id)
+    patient_service = AsyncPatientService(db)
+    success = await patient_service.delete_patient(patient_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -268,7 +554,7 @@ async def delete_patient(
 
 
 @router.post("/register",
-    response_model=dict,
+    response_model=PatientRegistrationResponse,
     status_code=status.HTTP_201_CREATED,
     summary="Register patient with queue",
     description="Create a new patient and add them to the queue in one operation",
@@ -317,9 +603,9 @@ async def delete_patient(
     }
 )
 async def register_patient_with_queue(
-    registration_data: dict,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    registration: PatientRegistration,
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Register a new patient and add them to the queue in one operation.
@@ -337,100 +623,100 @@ async def register_patient_with_queue(
     - **checkup_type**: Type of health checkup
     - **priority**: Priority level (0=normal, 1=urgent, 2=emergency)
     - **notes**: Additional notes for queue (optional)
-    - **estimated_wait_time**: Estimated wait time in minutes (optional)
+    - **estimated_wait_time**: Estimated wait time in minutes (optional, default 30)
+    
+    The patient and the queue entry are saved in one transaction: if either
+    fails, neither is created.
     """
+    patient_service = AsyncPatientService(db)
     try:
-        print(f"Received registration data: {registration_data}")
-        
-        # Extract patient data
-        patient_data = PatientCreate(
-            first_name=registration_data["first_name"],
-            last_name=registration_data["last_name"],
-            date_of_birth=registration_data["date_of_birth"],
-            gender=registration_data["gender"],
-            phone=registration_data.get("phone"),
-            email=registration_data.get("email"),
-            address=registration_data.get("address"),
-            emergency_contact=registration_data.get("emergency_contact"),
-            medical_history=registration_data.get("medical_history")
-        )
-        
-        print(f"Created patient data object: {patient_data}")
-        
-        # Create patient
-        patient_service = PatientService(db)
-        patient = patient_service.create_patient(patient_data)
-        
-        print(f"Patient created successfully: {patient}")
-        print(f"Patient ID: {patient.id}, Patient ID string: {patient.patient_id}")
-        
-        # Create queue entry
-        queue_data = QueueCreate(
-            patient_id=patient.id,
-            checkup_type=registration_data["checkup_type"],
-            priority=registration_data.get("priority", 0),
-            notes=registration_data.get("notes"),
-            estimated_wait_time=registration_data.get("estimated_wait_time", 30)
-        )
-        
-        print(f"Queue data: {queue_data}")
-        
-        queue_service = QueueService(db)
-        queue_entry = queue_service.add_to_queue(queue_data)
-        
-        print(f"Queue entry created: {queue_entry}")
-        
-        # Prepare response
-        response = {
-            "patient": {
-                "id": patient.id,
-                "patient_id": patient.patient_id,
-                "first_name": patient.first_name,
-                "last_name": patient.last_name,
-                "date_of_birth": patient.date_of_birth,
-                "gender": patient.gender,
-                "phone": patient.phone,
-                "email": patient.email,
-                "address": patient.address,
-                "emergency_contact": patient.emergency_contact,
-                "medical_history": patient.medical_history,
-                "created_at": patient.created_at,
-                "updated_at": patient.updated_at
-            },
-            "queue": {
-                "id": queue_entry.id,
-                "queue_number": queue_entry.queue_number,
-                "patient_id": queue_entry.patient_id,
-                "checkup_type": queue_entry.checkup_type,
-                "priority": queue_entry.priority,
-                "status": queue_entry.status.value,
-                "notes": queue_entry.notes,
-                "estimated_wait_time": queue_entry.estimated_wait_time,
-                "check_in_time": queue_entry.check_in_time,
-                "start_time": queue_entry.start_time,
-                "end_time": queue_entry.end_time,
-                "created_at": queue_entry.created_at,
-                "updated_at": queue_entry.updated_at
-            }
-        }
-        
-        print(f"Response prepared: {response}")
-        return response
-        
+        patient, queue_entry = await patient_service.register_patient(registration)
     except ValueError as e:
-        print(f"ValueError in registration: {e}")
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
-    except Exception as e:
-        print(f"Unexpected error in registration: {e}")
-        import traceback
-        traceback.print_exc()
+    return {"patient": patient, "queue": queue_entry}
+
+
+@router.post("/register/batch",
+    response_model=PatientBatchRegistrationResponse,
+    status_code=status.HTTP_201_CREATED,
+    summary="Register a group with queue",
+    description="Create several new patients and add them all to the queue in one operation",
+    responses={
+        201: {
+            "description": "Group registered and added to queue successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "registrations": [
+                            {
+                                "patient": {
+                                    "id": 1,
+                                    "patient_id": "P00001Y",
+                                    "first_name": "John",
+                                    "last_name": "Doe",
+                                    "date_of_birth": "1990-01-01",
+                                    "gender": "male",
+                                    "phone": "+1234567890",
+                                    "email": None,
+                                    "address": None,
+                                    "emergency_contact": None,
+                                    "medical_history": None,
+                                    "created_at": "2024-01-01T10:00:00Z",
+                                    "updated_at": "2024-01-01T10:00:00Z"
+                                },
+                                "queue": {
+                                    "id": 1,
+                                    "queue_number": "Q0001",
+                                    "patient_id": 1,
+                                    "checkup_type": "General Checkup",
+                                    "priority": 0,
+                                    "status": "waiting",
+                                    "notes": None,
+                                    "estimated_wait_time": 30,
+                                    "check_in_time": "2024-01-01T10:00:00Z",
+                                    "start_time": None,
+                                    "end_time": None,
+                                    "created_at": "2024-01-01T10:00:00Z",
+                                    "updated_at": None
+                                }
+                            }
+                        ]
+                    }
+                }
+            }
+        },
+        400: {"description": "Group could not be saved; nobody was registered"},
+        422: {"description": "Validation error in one of the registrations; nobody was registered"}
+    }
+)
+async def register_patients_with_queue(
+    batch: PatientBatchRegistration,
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
+):
+    """
+    Register a group of new patients (a family, a company's employees) and
+    add them all to the queue in one operation.
+    
+    - **registrations**: 1-100 registrations, each with the fields of `POST /patients/register`
+    
+    Every registration is validated before anything is saved; a 422 response
+    lists the invalid ones by position (`body.registrations.<index>...`). The
+    patients and queue entries are then saved in one transaction: if any
+    fails, nobody is registered. Results are returned in request order.
+    """
+    patient_service = AsyncPatientService(db)
+    try:
+        registered = await patient_service.register_patients(batch.registrations)
+    except ValueError as e:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to register patient: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
         )
+    return {"registrations": [{"patient": patient, "queue": queue_entry} for patient, queue_entry in registered]}
 
 
 @router.patch("/{patient_id}/serve",
@@ -465,105 +751,19 @@ async def register_patient_with_queue(
 )
 async def mark_patient_served(
     patient_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Mark a patient as served.
     
     - **patient_id**: The ID of the patient to mark as served
     """
-    patient_service = PatientService(db)
-    patient = patient_service.mark_patient_served(patient_id)
+    patient_service = AsyncPatientService(db)
+    patient = await patient_service.mark_patient_served(patient_id)
     if not patient:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Patient not found"
         )
     return patient
-
-
-@router.get("/completed",
-    response_model=List[PatientResponse],
-    summary="Get completed patients",
-    description="Retrieve a list of all completed/served patients",
-    responses={
-        200: {
-            "description": "Completed patients retrieved successfully",
-            "content": {
-                "application/json": {
-                    "example": [
-                        {
-                            "id": 1,
-                            "patient_id": "P001",
-                            "first_name": "John",
-                            "last_name": "Doe",
-                            "date_of_birth": "1990-01-01",
-                            "gender": "male",
-                            "phone": "+1234567890",
-                            "email": "john.doe@example.com",
-                            "address": "123 Main St, City, State",
-                            "emergency_contact": "+1987654321",
-                            "medical_history": "No known allergies",
-                            "created_at": "2024-01-01T10:00:00Z",
-                            "updated_at": "2024-01-01T11:00:00Z"
-                        }
-                    ]
-                }
-            }
-        }
-    }
-)
-async def get_completed_patients(
-    skip: int = Query(0, ge=0, description="Number of patients to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Maximum number of patients to return"),
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Get a list of all completed/served patients.
-    
-    - **skip**: Number of patients to skip (for pagination)
-    - **limit**: Maximum number of patients to return (max 1000)
-    """
-    patient_service = PatientService(db)
-    patients = patient_service.get_completed_patients(skip=skip, limit=limit)
-    return patients
-
-
-@router.get("/stats",
-    summary="Get patient statistics",
-    description="Get summary statistics of patients",
-    responses={
-        200: {
-            "description": "Patient statistics retrieved successfully",
-            "content": {
-                "application/json": {
-                    "example": {
-                        "total_patients": 150,
-                        "total_in_queue": 25,
-                        "total_served": 125,
-                        "average_wait_time": 45,
-                        "priority_distribution": {
-                            "normal": 100,
-                            "urgent": 30,
-                            "emergency": 20
-                        }
-                    }
-                }
-            }
-        }
-    }
-)
-async def get_patient_stats(
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
-):
-    """
-    Get summary statistics of patients.
-    
-    Returns counts by status, average wait times, and priority distribution.
-    """
-    patient_service = PatientService(db)
-    stats = patient_service.get_patient_stats()
-    return stats
@@ -2,14 +2,24 @@
 Queue Management API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
 from typing import List, Optional
-from app.core.database import get_db
-from app.schemas.queue import QueueCreate, QueueUpdate, QueueResponse, QueueStatusUpdate
-from app.models.user import User
-from app.services.queue import QueueService
+from app.core.config import settings
+from app.core.database import AnySession, get_service_db
+from app.core.pagination import set_next_cursor
+from app.core.replica import get_read_service_db
+from app.schemas.queue import (
+    QueueCreate, QueueUpdate, QueueResponse, QueueStatusUpdate, QueueWithPatientResponse
+)
+from app.schemas.user import TokenData
+from app.services.async_services import AsyncQueueService
 from app.services.auth import AuthService
+from app.services.export import export_response
+from app.services.queue import QUEUE_CURSOR
+from app.services.queue_events import queue_events
+from app.services.queue_version import queue_version
 
 router = APIRouter(
     prefix="/queue",
@@ -22,6 +32,26 @@ router = APIRouter(
 )
 
 
+def queue_etag(request: Request) -> str:
+    """ETag of a queue read at the current queue version.
+
+    Answers 304 Not Modified right away when the client's copy is current;
+    declared before the session dependency, so no database work is done.
+    The version counts commits made on the primary, so a body sent under
+    the tag must be read from the primary too: a lagging replica could
+    cache stale data under a current tag.
+    """
+    etag = queue_version.etag(request.url.path, request.query_params.multi_items())
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    if etag in tags or "*" in tags:
+        raise HTTPException(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
+    return etag
+
+
 @router.post("/",
     response_model=QueueResponse,
     status_code=status.HTTP_201_CREATED,
@@ -56,8 +86,8 @@ router = APIRouter(
 )
 async def add_to_queue(
     queue_data: QueueCreate,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Add a patient to the health checkup queue.
@@ -69,9 +99,9 @@ async def add_to_queue(
     - **notes**: Additional notes (optional)
     - **estimated_wait_time**: Estimated wait time in minutes (optional)
     """
-    queue_service = QueueService(db)
+    queue_service = AsyncQueueService(db)
     try:
-        queue_entry = queue_service.add_to_queue(queue_data)
+        queue_entry = await queue_service.add_to_queue(queue_data)
         return queue_entry
     except ValueError as e:
         raise HTTPException(
@@ -80,8 +110,70 @@ async def add_to_queue(
         )
 
 
+@router.post("/claim",
+    response_model=QueueResponse,
+    summary="Claim next patient",
+    description="Atomically take the next waiting patient and assign them to the current user",
+    responses={
+        200: {
+            "description": "Patient claimed successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "id": 1,
+                        "queue_number": "Q001",
+                        "patient_id": 1,
+                        "checkup_type": "General Checkup",
+                        "priority": 2,
+                        "status": "in_progress",
+                        "notes": "Regular health checkup",
+                        "estimated_wait_time": 30,
+                        "check_in_time": "2024-01-01T10:00:00Z",
+                        "start_time": "2024-01-01T10:25:00Z",
+                        "end_time": None,
+                        "assigned_to": 3,
+                        "created_at": "2024-01-01T10:00:00Z",
+                        "updated_at": "2024-01-01T10:25:00Z"
+                    }
+                }
+            }
+        },
+        404: {"description": "No patients waiting"},
+        409: {"description": "Contention with other stations, retry the claim"}
+    }
+)
+async def claim_next_patient(
+    checkup_type: Optional[str] = Query(None, description="Only claim patients waiting for this checkup type"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
+):
+    """
+    Claim the next patient in the queue.
+    
+    - **checkup_type**: Only claim patients waiting for this checkup type (optional)
+    
+    The highest-priority, earliest checked-in waiting patient is moved to
+    in_progress and assigned to the calling user in a single operation, so
+    two stations claiming at the same time never receive the same patient.
+    """
+    queue_service = AsyncQueueService(db)
+    try:
+        queue_entry = await queue_service.claim_next_patient(current_user.id, checkup_type)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    if not queue_entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No patients waiting"
+        )
+    return queue_entry
+
+
 @router.get("/",
-    response_model=List[QueueResponse],
+    response_model=List[QueueWithPatientResponse],
     summary="Get queue status",
     description="Retrieve current queue status with optional filtering",
     responses={
@@ -103,40 +195,177 @@ async def add_to_queue(
                             "start_time": None,
                             "end_time": None,
                             "created_at": "2024-01-01T10:00:00Z",
-                            "updated_at": None
+                            "updated_at": None,
+                            "patient": {
+                                "id": 1,
+                                "patient_id": "P00001Y",
+                                "first_name": "John",
+                                "last_name": "Doe",
+                                "gender": "male",
+                                "age": 34
+                            }
                         }
                     ]
                 }
             }
-        }
+        },
+        304: {"description": "Queue unchanged since the ETag sent in If-None-Match"}
     }
 )
 async def get_queue_status(
+    response: Response,
     status_filter: Optional[str] = Query(None, description="Filter by status (waiting, in_progress, completed, cancelled)"),
     priority_filter: Optional[int] = Query(None, ge=0, le=2, description="Filter by priority level"),
-    skip: int = Query(0, ge=0, description="Number of entries to skip"),
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of entries to skip (deprecated; use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of entries to return"),
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    include_patient: bool = Query(False, description="Embed each entry's patient summary"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    etag: str = Depends(queue_etag),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Get current queue status.
     
     - **status_filter**: Optional filter by queue status
     - **priority_filter**: Optional filter by priority level
-    - **skip**: Number of entries to skip (for pagination)
+    - **cursor**: Continue after the previous page (from its `X-Next-Cursor` header)
+    - **skip**: Number of entries to skip (deprecated offset paging)
     - **limit**: Maximum number of entries to return (max 1000)
+    - **include_patient**: Embed the patient's name, patient ID, age and gender
+      (`patient` is null otherwise), saving a patient lookup per entry
+    
+    Entries are in queue order (priority, then check-in time). Full pages
+    return the next page's cursor in `X-Next-Cursor`; a cursor keeps its
+    place while entries ahead of it are served or removed.
+    
+    Send the returned `ETag` back in `If-None-Match` to get `304 Not Modified`
+    while the queue has not changed.
     """
-    queue_service = QueueService(db)
-    queue_entries = queue_service.get_queue_status(
-        status_filter=status_filter,
-        priority_filter=priority_filter,
-        skip=skip,
-        limit=limit
-    )
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    queue_service = AsyncQueueService(db)
+    try:
+        queue_entries = await queue_service.get_queue_status(
+            status_filter=status_filter,
+            priority_filter=priority_filter,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            include_patient=include_patient
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    set_next_cursor(response, QUEUE_CURSOR, queue_entries, limit)
     return queue_entries
 
 
+@router.get("/events",
+    response_class=StreamingResponse,
+    summary="Stream queue changes",
+    description="Server-sent events for every queue change, replacing polling of the queue and statistics",
+    responses={
+        200: {
+            "description": "Event stream",
+            "content": {
+                "text/event-stream": {
+                    "example": 'id: 42\nevent: status_changed\ndata: {"queue_id":7,"entry":{"id":7,"status":"in_progress"}}\n\n'
+                }
+            }
+        },
+        404: {"description": "Queue events are disabled"}
+    }
+)
+async def stream_queue_events(
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID", description="Id of the last event received"),
+    since: Optional[int] = Query(None, ge=0, description="Resume after this event id (for clients that cannot set headers)"),
+    current_user: TokenData = Depends(AuthService.get_token_user)
+):
+    """
+    Stream queue changes as server-sent events.
+    
+    Event types: **added**, **status_changed**, **priority_changed**, **updated**
+    and **removed**; data is `{"queue_id": ..., "entry": <queue entry>}`.
+    Reconnect with the `Last-Event-ID` header (or `since`) to receive the
+    events missed in between. A **reset** event means those events are no
+    longer available and the queue should be reloaded. Clients that fall too
+    far behind are disconnected and should reconnect the same way.
+    """
+    if not settings.queue_events_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Queue events are disabled"
+        )
+    
+    # A new client starts from the current event so nothing published
+    # before its stream starts is lost
+    resume_after = last_event_id if last_event_id is not None else since
+    if resume_after is None:
+        resume_after = queue_events.sequence
+    return StreamingResponse(
+        queue_events.stream(resume_after, settings.queue_events_keepalive_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/export",
+    response_class=StreamingResponse,
+    summary="Export queue history",
+    description="Stream queue entries of every status, optionally for a check-in date range, as NDJSON or CSV",
+    responses={
+        200: {
+            "description": "Export stream, one queue entry per line",
+            "content": {
+                "application/x-ndjson": {
+                    "example": '{"id":1,"queue_number":"GC-001","patient_id":1,"checkup_type":"General Checkup",'
+                               '"priority":0,"status":"completed","notes":null,"estimated_wait_time":30,'
+                               '"check_in_time":"2024-01-01T10:00:00","start_time":"2024-01-01T10:20:00",'
+                               '"end_time":"2024-01-01T10:35:00","assigned_to":2,'
+                               '"created_at":"2024-01-01T10:00:00","updated_at":"2024-01-01T10:35:00"}\n'
+                },
+                "text/csv": {
+                    "example": "id,queue_number,patient_id,checkup_type,priority,status,notes,estimated_wait_time,"
+                               "check_in_time,start_time,end_time,assigned_to,created_at,updated_at\n"
+                               "1,GC-001,1,General Checkup,0,completed,,30,2024-01-01T10:00:00,"
+                               "2024-01-01T10:20:00,2024-01-01T10:35:00,2,2024-01-01T10:00:00,2024-01-01T10:35:00\n"
+                }
+            }
+        },
+        400: {"description": "Empty date range"}
+    }
+)
+async def export_queue_history(
+    format: str = Query("ndjson", pattern="^(csv|ndjson)$", description="Export format"),
+    checked_in_from: Optional[datetime] = Query(None, description="Only entries checked in at or after this time"),
+    checked_in_to: Optional[datetime] = Query(None, description="Only entries checked in before this time"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_read_service_db)
+):
+    """
+    Export queue history (entries of every status) in ID order.
+    
+    - **format**: `ndjson` (one JSON object per line, default) or `csv` (with a header row)
+    - **checked_in_from** / **checked_in_to**: Date or date-time range on `check_in_time`
+      (from inclusive, to exclusive; times without an offset are UTC)
+    
+    Rows are streamed from the database in batches as they are sent, so any
+    amount of history can be exported in one request.
+    """
+    queue_service = AsyncQueueService(db)
+    try:
+        statement = await queue_service.export_query(checked_in_from, checked_in_to)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return export_response(db, statement, format, "queue_history", settings.export_batch_size)
+
+
 @router.get("/{queue_id}",
     response_model=QueueResponse,
     summary="Get queue entry by ID",
@@ -169,16 +398,16 @@ async def get_queue_status(
 )
 async def get_queue_entry(
     queue_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Get a specific queue entry by ID.
     
     - **queue_id**: The ID of the queue entry to retrieve
     """
-    queue_service = QueueService(db)
-    queue_entry = queue_service.get_queue_entry(queue_id)
+    queue_service = AsyncQueueService(db)
+    queue_entry = await queue_service.get_queue_entry(queue_id)
     if not queue_entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -187,6 +416,48 @@ async def get_queue_entry(
     return queue_entry
 
 
+@router.get("/{queue_id}/position",
+    summary="Get queue position",
+    description="Get the position of a waiting patient in the queue",
+    responses={
+        200: {
+            "description": "Queue position retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "queue_id": 1,
+                        "position": 3,
+                        "patients_ahead": 2,
+                        "total_waiting": 15
+                    }
+                }
+            }
+        },
+        404: {"description": "Queue entry not found or not waiting"}
+    }
+)
+async def get_queue_position(
+    queue_id: int,
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
+):
+    """
+    Get the position of a waiting patient in the queue.
+    
+    - **queue_id**: The ID of the queue entry
+    
+    Position 1 is the next patient to be served (highest priority, earliest check-in).
+    """
+    queue_service = AsyncQueueService(db)
+    position = await queue_service.get_queue_position(queue_id)
+    if position is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Queue entry not found or not waiting"
+        )
+    return position
+
+
 @router.put("/{queue_id}",
     response_model=QueueResponse,
     summary="Update queue entry",
@@ -220,8 +491,8 @@ async def get_queue_entry(
 async def update_queue_entry(
     queue_id: int,
     queue_update: QueueUpdate,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Update queue entry information.
@@ -229,8 +500,8 @@ async def update_queue_entry(
     - **queue_id**: The ID of the queue entry to update
     - **queue_update**: Updated queue data
     """
-    queue_service = QueueService(db)
-    queue_entry = queue_service.update_queue_entry(queue_id, queue_update)
+    queue_service = AsyncQueueService(db)
+    queue_entry = await queue_service.update_queue_entry(queue_id, queue_update)
     if not queue_entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -272,8 +543,8 @@ async def update_queue_entry(
 async def update_queue_status(
     queue_id: int,
     status_update: QueueStatusUpdate,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Update the status of a queue entry.
@@ -281,8 +552,8 @@ async def update_queue_status(
     - **queue_id**: The ID of the queue entry to update
     - **status_update**: New status and optional notes
     """
-    queue_service = QueueService(db)
-    queue_entry = queue_service.update_queue_status(queue_id, status_update)
+    queue_service = AsyncQueueService(db)
+    queue_entry = await queue_service.update_queue_status(queue_id, status_update)
     if not queue_entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -302,16 +573,16 @@ async def update_queue_status(
 )
 async def remove_from_queue(
     queue_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Remove a patient from the queue.
     
     - **queue_id**: The ID of the queue entry to remove
     """
-    queue_service = QueueService(db)
-    success = queue_service.remove_from_queue(queue_id)
+    queue_service = AsyncQueueService(db)
+    success = await queue_service.remove_from_queue(queue_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -335,22 +606,39 @@ async def remove_from_queue(
                         "total_completed": 25,
                         "total_cancelled": 2,
                         "average_wait_time": 45,
-                        "estimated_completion_time": "2024-01-01T15:00:00Z"
+                        "estimated_completion_time": "2024-01-01T15:00:00Z",
+                        "by_checkup_type": {
+                            "General Checkup": {
+                                "waiting": 15,
+                                "in_progress": 3,
+                                "completed": 25,
+                                "average_wait_time": 45,
+                                "p50_wait_time": 38,
+                                "p90_wait_time": 82
+                            }
+                        }
                     }
                 }
             }
-        }
+        },
+        304: {"description": "Queue unchanged since the ETag sent in If-None-Match"}
     }
 )
 async def get_queue_statistics(
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    response: Response,
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    etag: str = Depends(queue_etag),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Get summary statistics of the current queue.
     
-    Returns counts by status, average wait times, and estimated completion times.
+    Returns counts by status, average wait times, and estimated completion times,
+    plus per-checkup-type counts and p50/p90 wait times. Supports `If-None-Match`
+    like the queue listing.
     """
-    queue_service = QueueService(db)
-    stats = queue_service.get_queue_statistics()
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    queue_service = AsyncQueueService(db)
+    stats = await queue_service.get_queue_statistics()
     return stats
@@ -2,14 +2,15 @@
 Users API endpoints
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from typing import List, Optional
-from app.core.database import get_db
-from app.schemas.user import UserCreate, UserUpdate, UserResponse
-from app.models.user import User
-from app.services.user import UserService
-from app.services.auth import AuthService
+from app.core.database import AnySession, get_service_db
+from app.core.pagination import set_next_cursor
+from app.core.replica import get_read_service_db
+from app.schemas.user import UserCreate, UserUpdate, UserResponse, TokenData
+from app.services.async_services import AsyncUserService
+from app.services.auth import AuthService, user_cache
+from app.services.user import USER_CURSOR
 
 router = APIRouter(
     prefix="/users",
@@ -50,15 +51,18 @@ router = APIRouter(
     }
 )
 async def get_users(
-    skip: int = Query(0, ge=0, description="Number of users to skip"),
+    response: Response,
+    skip: int = Query(0, ge=0, deprecated=True, description="Number of users to skip (deprecated; use cursor)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of users to return"),
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header of the previous page"),
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_read_service_db)
 ):
     """
     Get a list of all users.
     
-    - **skip**: Number of users to skip (for pagination)
+    - **cursor**: Continue after the previous page (from its `X-Next-Cursor` header)
+    - **skip**: Number of users to skip (deprecated offset paging)
     - **limit**: Maximum number of users to return (max 1000)
     - **Requires**: Superuser privileges
     """
@@ -68,11 +72,57 @@ async def get_users(
             detail="Not enough privileges"
         )
     
-    user_service = UserService(db)
-    users = user_service.get_users(skip=skip, limit=limit)
+    user_service = AsyncUserService(db)
+    try:
+        users = await user_service.get_users(skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    set_next_cursor(response, USER_CURSOR, users, limit)
     return users
 
 
+@router.get("/cache/stats",
+    summary="Get user cache statistics",
+    description="Hit/miss counters for the authenticated-user cache of this worker (requires superuser privileges)",
+    responses={
+        200: {
+            "description": "Cache statistics retrieved successfully",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "size": 12,
+                        "max_size": 1024,
+                        "ttl_seconds": 60,
+                        "hits": 5230,
+                        "misses": 41,
+                        "evictions": 0,
+                        "hit_ratio": 0.9922
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_user_cache_stats(
+    current_user: TokenData = Depends(AuthService.get_token_user)
+):
+    """
+    Get hit/miss counters for the authenticated-user cache.
+    
+    - **Requires**: Superuser privileges
+    """
+    if not current_user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough privileges"
+        )
+    
+    return user_cache.stats()
+
+
 @router.get("/{user_id}",
     response_model=UserResponse,
     summary="Get user by ID",
@@ -100,8 +150,8 @@ async def get_users(
 )
 async def get_user(
     user_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Get a specific user by ID.
@@ -115,8 +165,8 @@ async def get_user(
             detail="Not enough privileges"
         )
     
-    user_service = UserService(db)
-    user = user_service.get_user(user_id)
+    user_service = AsyncUserService(db)
+    user = await user_service.get_user(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -154,8 +204,8 @@ async def get_user(
 async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Update user information.
@@ -170,8 +220,8 @@ async def update_user(
             detail="Not enough privileges"
         )
     
-    user_service = UserService(db)
-    user = user_service.update_user(user_id, user_update)
+    user_service = AsyncUserService(db)
+    user = await user_service.update_user(user_id, user_update)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -187,13 +237,14 @@ async def update_user(
     responses={
         204: {"description": "User deleted successfully"},
         404: {"description": "User not found"},
-        403: {"description": "Not enough privileges"}
+        403: {"description": "Not enough privileges"},
+        409: {"description": "User is still referenced and cannot be deleted"}
     }
 )
 async def delete_user(
     user_id: int,
-    current_user: User = Depends(AuthService.get_current_user),
-    db: Session = Depends(get_db)
+    current_user: TokenData = Depends(AuthService.get_token_user),
+    db: AnySession = Depends(get_service_db)
 ):
     """
     Delete a user account.
@@ -207,8 +258,14 @@ async def delete_user(
             detail="Not enough privileges"
         )
     
-    user_service = UserService(db)
-    success = user_service.delete_user(user_id)
+    user_service = AsyncUserService(db)
+    try:
+        success = await user_service.delete_user(user_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -22,11 +22,118 @@ class Settings(BaseSettings):
     # Database - Default to SQLite for development
     database_url: str = "sqlite:///./test.db"
     
+    # Run API services on an asyncio engine (postgresql+asyncpg /
+    # sqlite+aiosqlite) instead of the threadpool
+    database_async: bool = False
+    
+    # SQLite tuning applied to every new connection (ignored on PostgreSQL).
+    # WAL lets polling readers carry on while a check-in is being written;
+    # synchronous=normal is durable in WAL mode except across power loss
+    sqlite_tuning: bool = True
+    sqlite_journal_mode: str = "wal"
+    sqlite_synchronous: str = "normal"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kb: int = 65536
+    sqlite_mmap_size_mb: int = 256
+    sqlite_temp_store: str = "memory"
+    # Foreign key enforcement is opt-in: existing SQLite databases were
+    # written without it and may hold rows that would now be rejected
+    sqlite_foreign_keys: bool = False
+    
+    # Optional read replica for list, search and statistics endpoints; reads
+    # go to the primary while the replica is more than replica_max_lag_seconds
+    # behind (measured every replica_lag_check_seconds) or unreachable
+    database_replica_url: str = ""
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_seconds: float = 1.0
+    
+    # Per-request SQL instrumentation: Server-Timing header, slow statements,
+    # warnings for statements repeated this often in one request (N+1), and
+    # the latest requests at GET /api/v1/debug/queries
+    sql_instrumentation: bool = True
+    sql_slow_query_ms: float = 100
+    sql_repeated_statement_threshold: int = 5
+    sql_recent_requests: int = 200
+    
+    # Prometheus metrics at GET /metrics: route latency, in-flight requests,
+    # pool checkout waits and queue gauges (rebuilt from the database this
+    # often so changes made by other workers are picked up; 0 = only at startup).
+    # Scrapers send metrics_token as a bearer token; without one set, only
+    # clients on the loopback interface are served
+    metrics_enabled: bool = True
+    metrics_queue_refresh_seconds: int = 30
+    metrics_token: str = ""
+    
     # JWT - Default key for development (change in production!)
     jwt_secret_key: str = "your-super-secret-jwt-key-change-this-in-production"
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
     
+    # Authenticated user cache (per worker process)
+    user_cache_max_size: int = 1024
+    user_cache_ttl_seconds: int = 60
+    
+    # How often the token version map is reloaded from the users table
+    token_version_refresh_seconds: int = 30
+    
+    # In-memory waiting-queue index; rebuilt from the database this often so
+    # changes made by other workers are picked up (0 = only at startup)
+    queue_index_enabled: bool = True
+    queue_index_refresh_seconds: int = 30
+    
+    # ETags of queue listings and statistics (304 when unchanged) follow the
+    # changes made through this worker and also expire this often, so other
+    # workers' changes show up (0 = only local changes, single worker)
+    queue_version_refresh_seconds: int = 10
+    
+    # Queue change events at GET /api/v1/queue/events (server-sent events):
+    # events kept for Last-Event-ID resume, events a client may fall behind
+    # before it is disconnected, and the keep-alive comment interval
+    queue_events_enabled: bool = True
+    queue_events_history: int = 1000
+    queue_events_max_pending: int = 256
+    queue_events_keepalive_seconds: float = 15
+    
+    # Claim-next-patient fallback (non-PostgreSQL): candidates read per attempt
+    queue_claim_batch_size: int = 5
+    queue_claim_max_attempts: int = 10
+    
+    # Queue numbers: optional checkup-type (GC-042) and daily (250905-042)
+    # prefixes; each worker reserves this many numbers per database round trip
+    queue_number_type_prefix: bool = False
+    queue_number_daily: bool = False
+    queue_number_block_size: int = 20
+    
+    # Patient IDs reserved per database round trip by each worker
+    patient_id_block_size: int = 100
+    
+    # Patient search through the FTS5 (SQLite) / pg_trgm (PostgreSQL) index
+    # (false falls back to ILIKE scans), and how many name-prefix matches and
+    # other matches a search ranks
+    patient_search_index: bool = True
+    patient_search_max_results: int = 1000
+    
+    # In-memory autocomplete index; reloaded in the background this often so
+    # patients added by other workers show up (0 = only at startup)
+    patient_index_enabled: bool = True
+    patient_index_refresh_seconds: int = 300
+    
+    # Bulk patient import: rows saved per transaction (one multi-row INSERT),
+    # how many failed rows the import report lists individually, and the
+    # longest record accepted in characters (bounds the memory an upload with
+    # an unbalanced quote or no line breaks can take)
+    patient_import_batch_size: int = 1000
+    patient_import_max_errors: int = 100
+    patient_import_max_record_length: int = 65536
+    
+    # Patient and queue history exports: rows fetched (and sent) per batch
+    export_batch_size: int = 1000
+    
+    # Password hashing worker pool ("thread" or "process")
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
+    
     # CORS - Allow multiple frontend ports for development and production
     allowed_origins: str = "http://localhost:3000,http://localhost:5173,http://localhost:4173,http://127.0.0.1:5173,http://127.0.0.1:4173,http://localhost:8080,https://*.onrender.com"
     
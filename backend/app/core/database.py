@@ -2,36 +2,216 @@
 Database configuration and session management
 """
 
-from sqlalchemy import create_engine
+from typing import List, Union
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
+from .instrumentation import instrument_engine
+from .metrics import TimedAsyncQueuePool, TimedQueuePool, watch_engine
 
-# Fix postgres:// URLs to postgresql:// (SQLAlchemy requirement)
-database_url = settings.database_url
-if database_url.startswith("postgres://"):
-    database_url = database_url.replace("postgres://", "postgresql://", 1)
-
-# Create database engine with SQLite and PostgreSQL support
-if database_url.startswith("sqlite"):
-    engine = create_engine(
-        database_url,
-        connect_args={"check_same_thread": False},
-        echo=settings.debug
-    )
-else:
-    # PostgreSQL configuration
-    engine = create_engine(
-        database_url,
-        pool_pre_ping=True,
-        pool_size=10,
-        max_overflow=20,
-        echo=settings.debug
-    )
+# asyncio drivers used in async engine mode, by dialect
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+# Accepted values of the string SQLite pragmas
+SQLITE_PRAGMA_CHOICES = {
+    "journal_mode": {"delete", "truncate", "persist", "memory", "wal", "off"},
+    "synchronous": {"off", "normal", "full", "extra"},
+    "temp_store": {"default", "file", "memory"},
+}
+
+
+def sqlite_pragmas() -> List[str]:
+    """PRAGMA statements of the tuned SQLite profile, built from settings"""
+    choices = {
+        "journal_mode": settings.sqlite_journal_mode.lower(),
+        "synchronous": settings.sqlite_synchronous.lower(),
+        "temp_store": settings.sqlite_temp_store.lower(),
+    }
+    for name, value in choices.items():
+        if value not in SQLITE_PRAGMA_CHOICES[name]:
+            raise ValueError(f"Invalid SQLite {name}: {value}")
+    return [
+        f"PRAGMA journal_mode={choices['journal_mode']}",
+        f"PRAGMA synchronous={choices['synchronous']}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}",
+        # Negative cache_size is in KiB rather than pages
+        f"PRAGMA cache_size={-int(settings.sqlite_cache_size_kb)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size_mb) * 1024 * 1024}",
+        f"PRAGMA temp_store={choices['temp_store']}",
+        f"PRAGMA foreign_keys={'ON' if settings.sqlite_foreign_keys else 'OFF'}",
+    ]
+
+
+def configure_sqlite(engine) -> None:
+    """Apply the tuned SQLite profile to every new connection of engine"""
+    pragmas = sqlite_pragmas()
+
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    event.listen(engine, "connect", set_pragmas)
+
+
+def normalize_database_url(url: str) -> str:
+    """Fix postgres:// URLs to postgresql:// (SQLAlchemy requirement)"""
+    if url.startswith("postgres://"):
+        url = url.replace("postgres://", "postgresql://", 1)
+    return url
+
+
+def async_database_url(url: str) -> URL:
+    """Swap the driver of a database URL for its asyncio counterpart"""
+    url = make_url(url)
+    dialect = url.get_backend_name()
+    if dialect not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {dialect} databases")
+    url = url.set(drivername=ASYNC_DRIVERS[dialect])
+    if dialect == "postgresql" and "sslmode" in url.query:
+        # asyncpg spells libpq's sslmode as ssl
+        query = dict(url.query)
+        query["ssl"] = query.pop("sslmode")
+        url = url.set(query=query)
+    return url
+
+
+def pool_options(url: str, name: str, async_pool: bool = False) -> dict:
+    """Engine options timing pool checkouts for /metrics, labelled with name.
+
+    In-memory SQLite keeps SQLAlchemy's single-connection pools, which never wait.
+    """
+    if not settings.metrics_enabled:
+        return {}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (
+        parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory"
+    ):
+        return {}
+    return {
+        "poolclass": TimedAsyncQueuePool if async_pool else TimedQueuePool,
+        "pool_logging_name": name,
+    }
+
+
+def build_engine(url: str, name: str = "primary"):
+    """Create a database engine with SQLite and PostgreSQL support"""
+    if url.startswith("sqlite"):
+        new_engine = create_engine(
+            url,
+            connect_args={"check_same_thread": False},
+            echo=settings.debug,
+            **pool_options(url, name)
+        )
+        if settings.sqlite_tuning:
+            configure_sqlite(new_engine)
+    else:
+        # PostgreSQL configuration
+        new_engine = create_engine(
+            url,
+            pool_pre_ping=True,
+            pool_size=10,
+            max_overflow=20,
+            echo=settings.debug,
+            **pool_options(url, name)
+        )
+    if settings.sql_instrumentation:
+        instrument_engine(new_engine)
+    if settings.metrics_enabled:
+        watch_engine(name, new_engine)
+    return new_engine
+
+
+def build_async_engine(url: str, name: str = "primary"):
+    """Create an asyncio engine for the same database as build_engine(url)"""
+    name = f"{name}_async"
+    if url.startswith("sqlite"):
+        new_engine = create_async_engine(
+            async_database_url(url), echo=settings.debug, **pool_options(url, name, async_pool=True)
+        )
+        if settings.sqlite_tuning:
+            configure_sqlite(new_engine.sync_engine)
+    else:
+        new_engine = create_async_engine(
+            async_database_url(url),
+            pool_pre_ping=True,
+            pool_size=10,
+            max_overflow=20,
+            echo=settings.debug,
+            **pool_options(url, name, async_pool=True)
+        )
+    if settings.sql_instrumentation:
+        instrument_engine(new_engine.sync_engine)
+    if settings.metrics_enabled:
+        watch_engine(name, new_engine.sync_engine)
+    return new_engine
+
+
+def commit_without_expiring(db: Session) -> None:
+    """Commit without expiring loaded objects, for writes whose rows are fully
+    known after the flush (values written, server defaults from RETURNING),
+    so returning them does not reload each row"""
+    expire_on_commit, db.expire_on_commit = db.expire_on_commit, False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+database_url = normalize_database_url(settings.database_url)
+engine = build_engine(database_url)
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Optional read replica for list, search and statistics endpoints. Its
+# sessions are marked so services never feed in-memory state from it.
+replica_engine = None
+ReplicaSessionLocal = None
+if settings.database_replica_url:
+    replica_engine = build_engine(normalize_database_url(settings.database_replica_url), "replica")
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine, info={"replica": True}
+    )
+
+# Async engine mode: API services run on an AsyncSession so one worker keeps
+# serving requests while queries wait on the database. The sync engines stay
+# for migrations, startup tasks, the background index rebuilds and the
+# replica lag checks. Objects stay loaded after commit: lazy loads are not
+# possible once a service call has returned to the event loop.
+async_engine = None
+AsyncSessionLocal = None
+async_replica_engine = None
+AsyncReplicaSessionLocal = None
+if settings.database_async:
+    async_engine = build_async_engine(database_url)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+    if settings.database_replica_url:
+        async_replica_engine = build_async_engine(normalize_database_url(settings.database_replica_url), "replica")
+        AsyncReplicaSessionLocal = async_sessionmaker(
+            async_replica_engine, autoflush=False, expire_on_commit=False, info={"replica": True}
+        )
+
+# Either kind of session, as handed to the API services
+AnySession = Union[Session, AsyncSession]
+
+
+def session_factory_for(db: AnySession) -> Union[sessionmaker, async_sessionmaker]:
+    """Factory for new sessions like db: same engine mode, replica or primary"""
+    replica = db.info.get("replica", False)
+    if isinstance(db, AsyncSession):
+        return AsyncReplicaSessionLocal if replica else AsyncSessionLocal
+    return ReplicaSessionLocal if replica else SessionLocal
+
 # Create base class for models
 Base = declarative_base()
 
@@ -43,6 +223,14 @@ def get_db():
     finally:
         db.close()
 
+async def get_async_db():
+    """Dependency to get an async database session (async engine mode only)"""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Session the API services run on, depending on the engine mode
+get_service_db = get_async_db if settings.database_async else get_db
+
 def create_tables():
     """Create all tables"""
     Base.metadata.create_all(bind=engine)
@@ -0,0 +1,168 @@
+"""
+Per-request SQL instrumentation
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, List, Optional
+from sqlalchemy import event
+from .config import settings
+
+# Longest statement text kept for slow and repeated statements
+STATEMENT_PREVIEW_LENGTH = 300
+
+
+def _preview(statement: str) -> str:
+    return " ".join(statement.split())[:STATEMENT_PREVIEW_LENGTH]
+
+
+class RequestQueryStats:
+    """SQL statements issued while serving one request"""
+
+    __slots__ = ("count", "duration", "slow", "statements", "batched")
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slow: List[Dict[str, Any]] = []
+        self.statements: Counter = Counter()
+        self.batched = False
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        # Statements are parameterized, so the same text with different
+        # parameters is one query per row: the N+1 pattern
+        self.statements[statement] += 1
+        if duration * 1000 >= settings.sql_slow_query_ms and len(self.slow) < 10:
+            self.slow.append({"statement": _preview(statement), "duration_ms": round(duration * 1000, 2)})
+
+    def repeated(self) -> List[Dict[str, Any]]:
+        """Statements issued at least sql_repeated_statement_threshold times"""
+        return [
+            {"statement": _preview(statement), "count": count}
+            for statement, count in self.statements.most_common()
+            if count >= settings.sql_repeated_statement_threshold
+        ]
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing header value splitting the request time into db and app"""
+        db_ms = self.duration * 1000
+        app_ms = max(total * 1000 - db_ms, 0.0)
+        return f'db;dur={db_ms:.2f};desc="{self.count} queries", app;dur={app_ms:.2f}'
+
+
+# Stats of the request being served. The object is mutated rather than
+# replaced, so service calls running in the threadpool (which get a copy of
+# the context) record into the same instance.
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+def expect_repeated_statements() -> None:
+    """Mark the current request as batch work (e.g. a bulk import): statements
+    repeated once per batch are expected there, so they are not warned about"""
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.batched = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_start_time"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
+
+
+def instrument_engine(engine) -> None:
+    """Time every statement run on a sync engine (or an async engine's sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+class RecentRequests:
+    """Bounded log of instrumented requests for the debug endpoint"""
+
+    def __init__(self, max_size: int):
+        self._entries: Deque[Dict[str, Any]] = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def latest(self) -> List[Dict[str, Any]]:
+        """All kept entries, most recent first"""
+        with self._lock:
+            return list(reversed(self._entries))
+
+
+recent_requests = RecentRequests(max_size=settings.sql_recent_requests)
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware that collects SQL stats for each HTTP request.
+
+    Adds a Server-Timing header (db and app time), prints a warning when a
+    request repeats the same statement sql_repeated_statement_threshold
+    times (unless it is marked as batch work), and keeps the latest requests
+    for GET /api/v1/debug/queries.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = current_query_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing(time.perf_counter() - started).encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_query_stats.reset(token)
+            self._finish(scope, status_code, stats, time.perf_counter() - started)
+
+    def _finish(self, scope, status_code: int, stats: RequestQueryStats, total: float) -> None:
+        repeated = stats.repeated()
+        for entry in repeated if not stats.batched else []:
+            print(
+                f"⚠️  Warning: {scope['method']} {scope['path']} ran the same statement "
+                f"{entry['count']} times (possible N+1): {entry['statement']}"
+            )
+        recent_requests.add({
+            "method": scope["method"],
+            "path": scope["path"],
+            "status_code": status_code,
+            "queries": stats.count,
+            "db_ms": round(stats.duration * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "slow_statements": stats.slow,
+            "repeated_statements": repeated,
+        })
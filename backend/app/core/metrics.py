@@ -0,0 +1,292 @@
+"""
+Prometheus text-format metrics
+"""
+
+import bisect
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Seconds; covers cached reads (~1 ms) up to slow exports
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_sample(name: str, labels: Dict[str, str], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(label)}"' for key, label in labels.items())
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class Metric(ABC):
+    """Base class for a metric family with a fixed set of label names"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        """(sample name, labels, value) for every labelled series"""
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield f"{self.name}_total", self._labels(key), value
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield self.name, self._labels(key), value
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (+Inf last), sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key) or self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    def samples(self) -> Iterable[Sample]:
+        with self._lock:
+            values = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in values:
+            labels = self._labels(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                yield f"{self.name}_bucket", {**labels, "le": le}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """Metrics rendered by GET /metrics.
+
+    Collectors are callables run at scrape time for values that are read
+    from in-memory state (pool sizes, queue gauges) instead of being pushed.
+    """
+
+    def __init__(self):
+        self._metrics: List[Metric] = []
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            collector()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(_format_sample(name, labels, value) for name, labels, value in metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "mhcqms_http_request_duration_seconds", "HTTP request latency by route",
+    ["method", "route", "status"]
+))
+http_requests_in_flight = registry.register(Gauge(
+    "mhcqms_http_requests_in_flight", "HTTP requests being served", ["method"]
+))
+db_pool_checkout_wait = registry.register(Histogram(
+    "mhcqms_db_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection",
+    ["pool"], buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+))
+db_pool_connections = registry.register(Gauge(
+    "mhcqms_db_pool_connections", "Pooled database connections by state (checked_out, idle, overflow)",
+    ["pool", "state"]
+))
+db_pool_size = registry.register(Gauge(
+    "mhcqms_db_pool_size", "Configured pool size (overflow connections come on top)", ["pool"]
+))
+
+_engines: Dict[str, object] = {}
+
+
+def _timed_do_get(base):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return base._do_get(self)
+        finally:
+            db_pool_checkout_wait.observe(time.perf_counter() - started, pool=self.logging_name or "default")
+    return _do_get
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waits for a connection"""
+
+    _do_get = _timed_do_get(QueuePool)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waits for a connection"""
+
+    _do_get = _timed_do_get(AsyncAdaptedQueuePool)
+
+
+def watch_engine(name: str, engine) -> None:
+    """Report the engine's pool occupancy at scrape time"""
+    _engines[name] = engine
+
+
+def _collect_pools() -> None:
+    for name, engine in list(_engines.items()):
+        pool = engine.pool
+        if not isinstance(pool, QueuePool):
+            continue
+        db_pool_size.set(pool.size(), pool=name)
+        db_pool_connections.set(pool.checkedout(), pool=name, state="checked_out")
+        db_pool_connections.set(pool.checkedin(), pool=name, state="idle")
+        db_pool_connections.set(max(pool.overflow(), 0), pool=name, state="overflow")
+
+
+registry.add_collector(_collect_pools)
+
+
+def route_template(scope) -> str:
+    """Path template of the matched route, e.g. /api/v1/queue/{queue_id}.
+
+    Routes of an included router carry their path without the include prefix,
+    so the leading request path segments the template does not cover are
+    prepended. Unmatched paths share one label to keep the label set small.
+    """
+    route_path = getattr(scope.get("route"), "path", None)
+    if not route_path:
+        return "unmatched"
+    segments = scope["path"].strip("/").split("/")
+    covered = len(route_path.strip("/").split("/")) if route_path.strip("/") else 0
+    prefix = "/".join(segments[:len(segments) - covered])
+    return f"/{prefix}{route_path}" if prefix else route_path
+
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request by its route template.
+
+    A response sent without Content-Length is streamed (server-sent events,
+    exports) and can stay open for minutes, so it counts as served once its
+    headers are out: it leaves the in-flight gauge then, and its latency is
+    the time to the start of the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        started = time.perf_counter()
+        served = False
+
+        def finish():
+            nonlocal served
+            if served:
+                return
+            served = True
+            http_requests_in_flight.dec(method=method)
+            http_request_duration.observe(
+                time.perf_counter() - started, method=method, route=route_template(scope), status=str(status_code)
+            )
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if not any(name.lower() == b"content-length" for name, _ in message.get("headers", ())):
+                    finish()
+            await send(message)
+
+        http_requests_in_flight.inc(method=method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            finish()
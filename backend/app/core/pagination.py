@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class CursorKey:
+    """Sort key of a listing, turned into opaque cursor tokens.
+
+    A cursor holds the sort key values of the last row of a page, so the
+    next page is read with a WHERE on those values instead of an OFFSET: it
+    costs the same at any depth and rows added or removed meanwhile do not
+    shift the page boundaries. The listing name is part of the token, so a
+    cursor from one listing is rejected by another.
+    """
+
+    def __init__(self, name: str, fields: Dict[str, type]):
+        self.name = name
+        self.fields = fields
+
+    def encode(self, item: Any) -> str:
+        """Cursor pointing just after item"""
+        values = []
+        for field in self.fields:
+            value = getattr(item, field)
+            values.append(value.isoformat() if isinstance(value, datetime) else value)
+        payload = json.dumps([self.name, values], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode(self, cursor: str) -> Tuple[Any, ...]:
+        """Sort key values stored in cursor; raises ValueError for a malformed or foreign cursor"""
+        try:
+            payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            name, values = json.loads(payload)
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if name != self.name or not isinstance(values, list) or len(values) != len(self.fields):
+            raise ValueError("Invalid cursor")
+        decoded = []
+        for field_type, value in zip(self.fields.values(), values):
+            if value is not None and field_type is datetime:
+                try:
+                    value = datetime.fromisoformat(value)
+                except (TypeError, ValueError):
+                    raise ValueError("Invalid cursor")
+            elif value is not None and type(value) is not field_type:
+                raise ValueError("Invalid cursor")
+            decoded.append(value)
+        return tuple(decoded)
+
+    def next_cursor(self, items: List[Any], limit: int) -> Optional[str]:
+        """Cursor of the page after items, or None when items is the last page"""
+        if not items or len(items) < limit:
+            return None
+        return self.encode(items[-1])
+
+
+def check_page_args(cursor: Optional[str], skip: int) -> None:
+    """Reject a request mixing cursor and (deprecated) offset paging"""
+    if cursor and skip:
+        raise ValueError("Use either cursor or skip, not both")
+
+
+# Response header carrying the cursor of the next page (list bodies stay plain arrays)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def set_next_cursor(response, key: CursorKey, items: List[Any], limit: int) -> None:
+    """Add the next page's cursor to response when items filled the page"""
+    next_cursor = key.next_cursor(items, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
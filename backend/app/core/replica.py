@@ -0,0 +1,135 @@
+"""
+Read-replica routing with a replication lag guard
+"""
+
+import threading
+import time
+from typing import Optional
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.database import (
+    AsyncReplicaSessionLocal,
+    AsyncSessionLocal,
+    ReplicaSessionLocal,
+    SessionLocal,
+    engine,
+    get_service_db,
+    replica_engine,
+)
+from app.models.heartbeat import ReplicaHeartbeat
+
+HEARTBEAT_NAME = "primary"
+
+
+class ReplicaLagGuard:
+    """Decides whether the read replica is fresh enough to serve reads.
+
+    Every check_seconds the guard stamps the current time into the
+    heartbeat row on the primary and reads the row back from the replica;
+    the difference is how far replication is behind. This works the same for
+    streaming replication, logical replication or a copied SQLite file, and
+    an idle primary does not look lagged. Only one thread runs a check at a
+    time; the others keep using the last result meanwhile.
+    """
+
+    def __init__(self, primary: Engine, replica: Engine, max_lag_seconds: float, check_seconds: float):
+        self.primary = primary
+        self.replica = replica
+        self.max_lag_seconds = max_lag_seconds
+        self.check_seconds = check_seconds
+        self._lag: Optional[float] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def lag(self) -> Optional[float]:
+        """Seconds the replica was behind at the last check, None if unknown or unreachable"""
+        return self._lag
+
+    def is_due(self) -> bool:
+        """True when the next call to usable() runs a lag check"""
+        return self._checked_at is None or time.monotonic() - self._checked_at >= self.check_seconds
+
+    def usable(self) -> bool:
+        """True when the replica is reachable and within max_lag_seconds"""
+        if self.is_due() and self._lock.acquire(blocking=False):
+            try:
+                if self.is_due():
+                    self._check()
+            finally:
+                self._lock.release()
+        return self._lag is not None and self._lag <= self.max_lag_seconds
+
+    def _check(self) -> None:
+        now = time.time()
+        table = ReplicaHeartbeat.__table__
+        try:
+            with self.primary.begin() as conn:
+                self._stamp(conn, now)
+            with self.replica.connect() as conn:
+                beat = conn.execute(
+                    select(table.c.beat_at).where(table.c.name == HEARTBEAT_NAME)
+                ).scalar_one_or_none()
+        except SQLAlchemyError as e:
+            print(f"⚠️  Warning: Replica lag check failed: {e}")
+            beat = None
+        self._lag = None if beat is None else max(now - beat, 0.0)
+        self._checked_at = time.monotonic()
+
+    def _stamp(self, conn, now: float) -> None:
+        table = ReplicaHeartbeat.__table__
+        dialect = self.primary.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            conn.execute(
+                dialect_insert(table).values(name=HEARTBEAT_NAME, beat_at=now)
+                .on_conflict_do_update(index_elements=["name"], set_={"beat_at": now})
+            )
+            return
+        if not conn.execute(update(table).where(table.c.name == HEARTBEAT_NAME).values(beat_at=now)).rowcount:
+            conn.execute(insert(table).values(name=HEARTBEAT_NAME, beat_at=now))
+
+
+replica_guard = None
+if replica_engine is not None:
+    replica_guard = ReplicaLagGuard(
+        engine,
+        replica_engine,
+        max_lag_seconds=settings.replica_max_lag_seconds,
+        check_seconds=settings.replica_lag_check_seconds
+    )
+
+
+def use_replica() -> bool:
+    """True when read-only requests should go to the replica"""
+    return replica_guard is not None and replica_guard.usable()
+
+
+def get_read_db():
+    """Dependency to get a session for read-only endpoints, on the replica when usable"""
+    db = ReplicaSessionLocal() if use_replica() else SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    """Async variant of get_read_db; lag checks run in the threadpool"""
+    replica = await run_in_threadpool(use_replica) if replica_guard.is_due() else use_replica()
+    async with (AsyncReplicaSessionLocal if replica else AsyncSessionLocal)() as db:
+        yield db
+
+
+# Session the read-only API services run on. Without a replica this is the
+# primary session dependency itself, so it is shared with the rest of the request.
+if replica_guard is None:
+    get_read_service_db = get_service_db
+elif settings.database_async:
+    get_read_service_db = get_async_read_db
+else:
+    get_read_service_db = get_read_db
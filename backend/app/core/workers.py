@@ -0,0 +1,74 @@
+"""
+Bounded worker pools for CPU-heavy work that must not run on the event loop
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+class PoolOverloadedError(RuntimeError):
+    """Raised when a worker pool already has its maximum number of pending jobs"""
+
+
+class BoundedWorkerPool:
+    """Thread or process pool that rejects work once its backlog is full.
+
+    The executor is created lazily so importing the module never spawns
+    threads or processes.
+    """
+
+    def __init__(self, kind: str = "thread", max_workers: int = 4, max_pending: int = 64, name: str = "worker"):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown worker pool kind: {kind}")
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.name = name
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs queued or running"""
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    if self.kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.max_workers,
+                            thread_name_prefix=self.name
+                        )
+        return self._executor
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run func(*args) in the pool and await the result.
+
+        For process pools func and args must be picklable, i.e. module-level
+        functions and plain values.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise PoolOverloadedError(f"{self.name} pool has {self._pending} pending jobs")
+            self._pending += 1
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def shutdown(self) -> None:
+        """Stop the executor, waiting for running jobs"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
@@ -3,18 +3,31 @@ MHCQMS Backend - FastAPI Application
 Main entry point for the API server
 """
 
+import asyncio
+import secrets
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.openapi.utils import get_openapi
+from starlette.concurrency import run_in_threadpool
 
 # Import models to ensure they are available for migrations
 from app.models import User, Patient, Queue
 from app.core.config import settings
-from app.core.database import create_tables
+from app.core.database import create_tables, SessionLocal, async_engine, async_replica_engine
+from app.core.instrumentation import QueryStatsMiddleware
+from app.core.metrics import MetricsMiddleware, registry as metrics_registry
+from app.core.replica import replica_guard
+from app.services.auth import password_pool, token_versions
+from app.services.patient import PatientService
+from app.services.patient_index import patient_index
+from app.services.queue import QueueService
+from app.services.queue_events import queue_events
+from app.services.queue_metrics import queue_gauges
 
 # Import API routers
-from app.api import auth_router, users_router, patients_router, queue_router
+from app.api import auth_router, users_router, patients_router, queue_router, debug_router
 
 # Create FastAPI app instance
 app = FastAPI(
@@ -65,14 +78,77 @@ app = FastAPI(
     ]
 )
 
+def rebuild_patient_index():
+    """Reload the patient autocomplete index with its own session"""
+    db = SessionLocal()
+    try:
+        PatientService(db).rebuild_patient_index()
+    finally:
+        db.close()
+
+async def refresh_patient_index():
+    """Periodically reload the patient autocomplete index off the event loop"""
+    loop = asyncio.get_running_loop()
+    while True:
+        await asyncio.sleep(patient_index.refresh_seconds)
+        try:
+            await loop.run_in_executor(None, rebuild_patient_index)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not refresh patient index: {e}")
+
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup"""
+    """Create database tables and load the in-memory indexes on startup"""
     try:
         create_tables()
         print("✅ Database tables created successfully")
     except Exception as e:
         print(f"⚠️  Warning: Could not create database tables: {e}")
+    
+    # Load the token version map, the in-memory waiting queue and queue gauges
+    db = SessionLocal()
+    try:
+        token_versions.load(db)
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load token versions: {e}")
+    try:
+        QueueService(db).rebuild_waiting_index()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load waiting queue index: {e}")
+    try:
+        QueueService(db).rebuild_queue_gauges()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load queue gauges: {e}")
+    finally:
+        db.close()
+    
+    # Load the patient autocomplete index and keep it fresh
+    try:
+        rebuild_patient_index()
+    except Exception as e:
+        print(f"⚠️  Warning: Could not load patient index: {e}")
+    app.state.patient_index_refresh = None
+    if settings.patient_index_enabled and patient_index.refresh_seconds > 0:
+        app.state.patient_index_refresh = asyncio.create_task(refresh_patient_index())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks, event streams and worker pools"""
+    if app.state.patient_index_refresh is not None:
+        app.state.patient_index_refresh.cancel()
+    queue_events.close()
+    password_pool.shutdown()
+    for engine in (async_engine, async_replica_engine):
+        if engine is not None:
+            await engine.dispose()
+
+# Per-request SQL stats (Server-Timing header, N+1 warnings)
+if settings.sql_instrumentation:
+    app.add_middleware(QueryStatsMiddleware)
+
+# Route latency and in-flight requests for GET /metrics
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
 
 # Configure CORS with more permissive settings for development
 app.add_middleware(
@@ -89,6 +165,7 @@ app.include_router(auth_router, prefix="/api/v1")
 app.include_router(users_router, prefix="/api/v1")
 app.include_router(patients_router, prefix="/api/v1")
 app.include_router(queue_router, prefix="/api/v1")
+app.include_router(debug_router, prefix="/api/v1")
 
 # Custom OpenAPI schema
 def custom_openapi():
@@ -151,7 +228,8 @@ async def root():
                 "authentication": "/api/v1/auth",
                 "users": "/api/v1/users",
                 "patients": "/api/v1/patients",
-                "queue": "/api/v1/queue"
+                "queue": "/api/v1/queue",
+                "metrics": "/metrics"
             }
         }
     )
@@ -159,14 +237,46 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return JSONResponse(
-        content={
-            "status": "healthy",
-            "service": "MHCQMS Backend",
-            "version": "1.0.0",
-            "timestamp": "2024-01-01T10:00:00Z"
+    content = {
+        "status": "healthy",
+        "service": "MHCQMS Backend",
+        "version": "1.0.0",
+        "timestamp": "2024-01-01T10:00:00Z"
+    }
+    if replica_guard is not None:
+        content["replica"] = {
+            "lag_seconds": replica_guard.lag,
+            "max_lag_seconds": replica_guard.max_lag_seconds,
+            "serving_reads": replica_guard.lag is not None and replica_guard.lag <= replica_guard.max_lag_seconds
         }
-    )
+    return JSONResponse(content=content)
+
+def rebuild_queue_gauges():
+    """Reload the queue gauges with their own session"""
+    db = SessionLocal()
+    try:
+        QueueService(db).rebuild_queue_gauges()
+    finally:
+        db.close()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics(request: Request):
+    """Prometheus metrics in the text exposition format"""
+    if not settings.metrics_enabled:
+        return PlainTextResponse("Metrics are disabled\n", status_code=404)
+    if settings.metrics_token:
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not secrets.compare_digest(token.encode(), settings.metrics_token.encode()):
+            return PlainTextResponse("Invalid metrics token\n", status_code=401, headers={"WWW-Authenticate": "Bearer"})
+    elif request.client is None or request.client.host not in ("127.0.0.1", "::1"):
+        return PlainTextResponse("Set METRICS_TOKEN to scrape metrics from another host\n", status_code=403)
+    # Queue gauges come from memory; the database is only read when they are due for a reload
+    if queue_gauges.is_stale():
+        try:
+            await run_in_threadpool(rebuild_queue_gauges)
+        except Exception as e:
+            print(f"⚠️  Warning: Could not refresh queue gauges: {e}")
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 @app.get("/cors-test")
 async def cors_test():
@@ -212,6 +322,7 @@ async def api_info():
                     "endpoints": [
                         "POST / - Create new patient",
                         "GET / - Get all patients",
+                        "GET /autocomplete - Autocomplete patients",
                         "GET /{patient_id} - Get patient by ID",
                         "PUT /{patient_id} - Update patient",
                         "DELETE /{patient_id} - Delete patient"
@@ -221,13 +332,22 @@ async def api_info():
                     "base_url": "/api/v1/queue",
                     "endpoints": [
                         "POST / - Add patient to queue",
+                        "POST /claim - Claim next patient",
                         "GET / - Get queue status",
+                        "GET /events - Stream queue changes (server-sent events)",
                         "GET /{queue_id} - Get queue entry by ID",
+                        "GET /{queue_id}/position - Get queue position",
                         "PUT /{queue_id} - Update queue entry",
                         "PATCH /{queue_id}/status - Update queue status",
                         "DELETE /{queue_id} - Remove from queue",
                         "GET /stats/summary - Get queue statistics"
                     ]
+                },
+                "debug": {
+                    "base_url": "/api/v1/debug",
+                    "endpoints": [
+                        "GET /queries - Get recent request SQL stats"
+                    ]
                 }
             },
             "documentation": {
@@ -1,6 +1,8 @@
 # Database models module
 from .user import User
 from .patient import Patient
-from .queue import Queue
+from .queue import Queue, QueueStatusCount, QueueWaitStat
+from .sequence import IdSequence
+from .heartbeat import ReplicaHeartbeat
 
-__all__ = ["User", "Patient", "Queue"]
+__all__ = ["User", "Patient", "Queue", "QueueWaitStat", "QueueStatusCount", "IdSequence", "ReplicaHeartbeat"]
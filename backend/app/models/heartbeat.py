@@ -0,0 +1,14 @@
+"""
+Heartbeat model for measuring read-replica lag
+"""
+
+from sqlalchemy import Column, String, Float
+from app.core.database import Base
+
+
+class ReplicaHeartbeat(Base):
+    """Timestamp stamped on the primary; its age on the replica is the replication lag"""
+    __tablename__ = "replica_heartbeats"
+
+    name = Column(String(50), primary_key=True)
+    beat_at = Column(Float, nullable=False)  # Unix time of the last stamp
@@ -2,7 +2,8 @@
 Patient model for storing patient information
 """
 
-from sqlalchemy import Column, Integer, String, Date, DateTime, Text
+import sqlite3
+from sqlalchemy import Column, Integer, String, Date, DateTime, Text, event
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -11,7 +12,9 @@ class Patient(Base):
     __tablename__ = "patients"
 
     id = Column(Integer, primary_key=True, index=True)
-    patient_id = Column(String, unique=True, index=True, nullable=False)
+    # Unique and allocated before the INSERT, so the ORM can insert many rows in
+    # one INSERT ... RETURNING and match the returned IDs back by it (sentinel)
+    patient_id = Column(String, unique=True, index=True, nullable=False, insert_sentinel=True)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
     date_of_birth = Column(Date, nullable=False)
@@ -26,3 +29,56 @@ class Patient(Base):
 
     def __repr__(self):
         return f"<Patient(id={self.id}, patient_id='{self.patient_id}', name='{self.first_name} {self.last_name}')>"
+
+
+# Search index over first_name, last_name and patient_id. SQLite uses an FTS5
+# trigram table kept in sync by triggers; PostgreSQL uses pg_trgm GIN indexes,
+# which serve ILIKE '%term%' directly. Both match substrings of 3+ characters.
+SEARCH_COLUMNS = ("first_name", "last_name", "patient_id")
+SQLITE_FTS_TABLE = "patients_fts"
+SQLITE_TRIGRAM_SUPPORTED = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+SQLITE_SEARCH_DDL = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS patients_fts USING fts5(
+        first_name, last_name, patient_id,
+        content='patients', content_rowid='id', tokenize='trigram'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+        INSERT INTO patients_fts(rowid, first_name, last_name, patient_id)
+        VALUES (new.id, new.first_name, new.last_name, new.patient_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, patient_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.patient_id);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS patients_fts_au AFTER UPDATE OF first_name, last_name, patient_id ON patients BEGIN
+        INSERT INTO patients_fts(patients_fts, rowid, first_name, last_name, patient_id)
+        VALUES ('delete', old.id, old.first_name, old.last_name, old.patient_id);
+        INSERT INTO patients_fts(rowid, first_name, last_name, patient_id)
+        VALUES (new.id, new.first_name, new.last_name, new.patient_id);
+    END""",
+]
+
+POSTGRESQL_SEARCH_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_patients_{column}_trgm ON patients USING gin ({column} gin_trgm_ops)"
+    for column in SEARCH_COLUMNS
+]
+
+
+@event.listens_for(Patient.__table__, "after_create")
+def _create_search_index(target, connection, **kw):
+    if connection.dialect.name == "sqlite" and SQLITE_TRIGRAM_SUPPORTED:
+        statements = SQLITE_SEARCH_DDL
+    elif connection.dialect.name == "postgresql":
+        statements = POSTGRESQL_SEARCH_DDL
+    else:
+        return
+    for statement in statements:
+        connection.exec_driver_sql(statement)
+
+
+@event.listens_for(Patient.__table__, "before_drop")
+def _drop_search_index(target, connection, **kw):
+    # Triggers go with the table, but the FTS table has to be dropped itself
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}")
@@ -2,9 +2,10 @@
 Queue model for managing health checkup queue
 """
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Enum, Index, Float
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
+import bisect
 import enum
 from app.core.database import Base
 
@@ -20,7 +21,9 @@ class Queue(Base):
     __tablename__ = "queue"
 
     id = Column(Integer, primary_key=True, index=True)
-    queue_number = Column(String, unique=True, index=True, nullable=False)
+    # Insert sentinel, like Patient.patient_id: new entries are flushed in one
+    # multi-row INSERT ... RETURNING instead of one INSERT each
+    queue_number = Column(String, unique=True, index=True, nullable=False, insert_sentinel=True)
     patient_id = Column(Integer, ForeignKey("patients.id"), nullable=False)
     checkup_type = Column(String, nullable=False)
     priority = Column(Integer, default=0)  # 0 = normal, 1 = urgent, 2 = emergency
@@ -30,8 +33,60 @@ class Queue(Base):
     check_in_time = Column(DateTime(timezone=True), server_default=func.now())
     start_time = Column(DateTime(timezone=True))
     end_time = Column(DateTime(timezone=True))
+    assigned_to = Column(Integer, ForeignKey("users.id", name="fk_queue_assigned_to_users", ondelete="SET NULL"), nullable=True)  # station user serving the entry
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationship
     patient = relationship("Patient", backref="queue_entries")
+
+
+# Hot-path indexes: status listings ordered by priority/check-in time, the
+# "already in queue" check in add_to_queue, and the waiting-queue head
+Index(
+    "ix_queue_status_priority_check_in",
+    Queue.status, Queue.priority.desc(), Queue.check_in_time
+)
+Index("ix_queue_patient_id_status", Queue.patient_id, Queue.status)
+Index(
+    "ix_queue_waiting_priority_check_in",
+    Queue.priority.desc(), Queue.check_in_time,
+    postgresql_where=Queue.status == QueueStatus.WAITING,
+    sqlite_where=Queue.status == QueueStatus.WAITING
+)
+
+
+class QueueWaitStat(Base):
+    """Rollup of completed queue entries: one row per checkup type and
+    wait-time histogram bucket, updated as entries complete so statistics
+    never scan queue history"""
+    __tablename__ = "queue_wait_stats"
+
+    # Upper bounds of the wait-time buckets in minutes; the last one is open-ended
+    BUCKETS = [1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 240, 360, 480, 720, 1440, 100000]
+
+    checkup_type = Column(String, primary_key=True)
+    bucket = Column(Integer, primary_key=True)  # bucket upper bound in minutes
+    count = Column(Integer, nullable=False, default=0)
+    wait_seconds = Column(Float, nullable=False, default=0)  # sum of check-in to start
+    service_seconds = Column(Float, nullable=False, default=0)  # sum of start to end
+
+    @classmethod
+    def bucket_for(cls, wait_minutes: float) -> int:
+        """Return the bucket upper bound for a wait time"""
+        index = bisect.bisect_left(cls.BUCKETS, wait_minutes)
+        return cls.BUCKETS[min(index, len(cls.BUCKETS) - 1)]
+
+
+class QueueStatusCount(Base):
+    """Number of queue entries per checkup type in each final status (completed,
+    cancelled), kept up to date as entries change so statistics never count
+    queue history"""
+    __tablename__ = "queue_status_counts"
+
+    # Statuses counted here; waiting and in-progress entries are counted live
+    STATUSES = (QueueStatus.COMPLETED, QueueStatus.CANCELLED)
+
+    checkup_type = Column(String, primary_key=True)
+    status = Column(String, primary_key=True)  # QueueStatus value
+    count = Column(Integer, nullable=False, default=0)
@@ -0,0 +1,14 @@
+"""
+Sequence model for block-allocated identifiers
+"""
+
+from sqlalchemy import Column, String, BigInteger
+from app.core.database import Base
+
+
+class IdSequence(Base):
+    """Named counter handing out blocks of identifiers to worker processes"""
+    __tablename__ = "id_sequences"
+
+    name = Column(String, primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=1)  # first value not yet reserved
@@ -17,5 +17,6 @@ class User(Base):
     full_name = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
     is_superuser = Column(Boolean, default=False)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bumped to revoke issued tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
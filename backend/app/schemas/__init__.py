@@ -1,11 +1,11 @@
 # Pydantic schemas module
 
 from .user import UserCreate, UserUpdate, UserResponse, UserLogin, Token
-from .patient import PatientCreate, PatientUpdate, PatientResponse
+from .patient import PatientCreate, PatientUpdate, PatientResponse, PatientSuggestionResponse
 from .queue import QueueCreate, QueueUpdate, QueueResponse, QueueStatus
 
 __all__ = [
     "UserCreate", "UserUpdate", "UserResponse", "UserLogin", "Token",
-    "PatientCreate", "PatientUpdate", "PatientResponse",
+    "PatientCreate", "PatientUpdate", "PatientResponse", "PatientSuggestionResponse",
     "QueueCreate", "QueueUpdate", "QueueResponse", "QueueStatus"
 ]
@@ -4,8 +4,9 @@ Patient schemas for API requests and responses
 
 from pydantic import BaseModel, Field
 from pydantic.networks import EmailStr
-from typing import Optional
+from typing import List, Optional
 from datetime import date, datetime
+from app.schemas.queue import QueueResponse
 
 
 class PatientBase(BaseModel):
@@ -26,6 +27,14 @@ class PatientCreate(PatientBase):
     pass
 
 
+class PatientRegistration(PatientCreate):
+    """Schema for registering a new patient and adding them to the queue"""
+    checkup_type: str = Field(..., min_length=2, max_length=100, description="Type of health checkup")
+    priority: int = Field(default=0, ge=0, le=2, description="Priority level (0=normal, 1=urgent, 2=emergency)")
+    notes: Optional[str] = Field(None, max_length=1000, description="Additional notes for the queue entry")
+    estimated_wait_time: Optional[int] = Field(30, ge=0, description="Estimated wait time in minutes")
+
+
 class PatientUpdate(BaseModel):
     """Schema for updating patient information"""
     first_name: Optional[str] = Field(None, min_length=2, max_length=50, description="Patient's first name")
@@ -39,6 +48,19 @@ class PatientUpdate(BaseModel):
     medical_history: Optional[str] = Field(None, max_length=2000, description="Patient's medical history")
 
 
+class PatientSuggestionResponse(BaseModel):
+    """Schema for patient autocomplete suggestions"""
+    id: int = Field(..., description="Unique patient ID")
+    patient_id: str = Field(..., description="Unique patient identifier")
+    first_name: str = Field(..., description="Patient's first name")
+    last_name: str = Field(..., description="Patient's last name")
+    date_of_birth: Optional[date] = Field(None, description="Patient's date of birth")
+    phone: Optional[str] = Field(None, description="Patient's phone number")
+
+    class Config:
+        from_attributes = True
+
+
 class PatientResponse(PatientBase):
     """Schema for patient response"""
     id: int = Field(..., description="Unique patient ID")
@@ -48,3 +70,36 @@ class PatientResponse(PatientBase):
 
     class Config:
         from_attributes = True
+
+
+class PatientRegistrationResponse(BaseModel):
+    """Schema for a registered patient and their queue entry"""
+    patient: PatientResponse
+    queue: QueueResponse
+
+
+class PatientBatchRegistration(BaseModel):
+    """Schema for registering a group of new patients and adding them all to the queue"""
+    registrations: List[PatientRegistration] = Field(
+        ..., min_length=1, max_length=100, description="Patients to register (1-100)"
+    )
+
+
+class PatientBatchRegistrationResponse(BaseModel):
+    """Schema for a registered group, in the order of the request"""
+    registrations: List[PatientRegistrationResponse]
+
+
+class PatientImportError(BaseModel):
+    """Schema for a row rejected by a bulk import"""
+    row: int = Field(..., description="Data row number in the upload (1-based, CSV header not counted)")
+    errors: List[str] = Field(..., description="Why the row was rejected")
+
+
+class PatientImportResponse(BaseModel):
+    """Schema for a bulk import report"""
+    rows: int = Field(..., description="Data rows read from the upload")
+    imported: int = Field(..., description="Patients created")
+    failed: int = Field(..., description="Rows rejected")
+    errors: List[PatientImportError] = Field(..., description="Rejected rows (the first PATIENT_IMPORT_MAX_ERRORS)")
+    errors_truncated: bool = Field(..., description="Whether more rows were rejected than listed")
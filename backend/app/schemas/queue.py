@@ -2,9 +2,9 @@
 Queue schemas for API requests and responses
 """
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, computed_field
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime
 from app.models.queue import QueueStatus
 
 
@@ -41,6 +41,7 @@ class QueueResponse(QueueBase):
     check_in_time: datetime = Field(..., description="When the patient checked in")
     start_time: Optional[datetime] = Field(None, description="When the checkup started")
     end_time: Optional[datetime] = Field(None, description="When the checkup ended")
+    assigned_to: Optional[int] = Field(None, description="ID of the user serving this entry")
     created_at: datetime = Field(..., description="Queue entry creation timestamp")
     updated_at: Optional[datetime] = Field(None, description="Last update timestamp")
 
@@ -48,6 +49,31 @@ class QueueResponse(QueueBase):
         from_attributes = True
 
 
+class QueuePatientSummary(BaseModel):
+    """Patient fields embedded in queue listings"""
+    id: int = Field(..., description="Unique patient ID")
+    patient_id: str = Field(..., description="Unique patient identifier")
+    first_name: str = Field(..., description="Patient's first name")
+    last_name: str = Field(..., description="Patient's last name")
+    gender: str = Field(..., description="Patient's gender")
+    date_of_birth: date = Field(..., exclude=True)
+
+    @computed_field(description="Patient's age in years")
+    @property
+    def age(self) -> int:
+        today = date.today()
+        born = self.date_of_birth
+        return today.year - born.year - ((today.month, today.day) < (born.month, born.day))
+
+    class Config:
+        from_attributes = True
+
+
+class QueueWithPatientResponse(QueueResponse):
+    """Schema for queue listing entries, optionally with the patient embedded"""
+    patient: Optional[QueuePatientSummary] = Field(None, description="Patient summary (with include_patient=true)")
+
+
 class QueueStatusUpdate(BaseModel):
     """Schema for updating queue status"""
     status: QueueStatus = Field(..., description="New status for the queue entry")
@@ -64,4 +64,8 @@ class LoginResponse(BaseModel):
 
 class TokenData(BaseModel):
     """Schema for token payload data"""
+    id: Optional[int] = None
     username: Optional[str] = None
+    is_active: bool = True
+    is_superuser: bool = False
+    token_version: int = 0
@@ -0,0 +1,81 @@
+"""
+Awaitable variants of the services for the API layer
+"""
+
+import functools
+import inspect
+from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from app.core.database import AnySession
+from app.models.user import User
+from app.services.auth import AuthService
+from app.services.patient import PatientService
+from app.services.queue import QueueService
+from app.services.user import UserService
+
+
+class AsyncService:
+    """Awaitable wrapper around a sync service.
+
+    Every method of the wrapped service is exposed as a coroutine. On an
+    AsyncSession (async engine mode) the call runs inside run_sync, where the
+    ORM drives asyncpg / aiosqlite through greenlets, so the event loop serves
+    other requests while a query waits on the database. On a plain Session
+    the call runs in the threadpool instead. Either way the service code
+    itself is shared with the sync callers.
+
+    Methods that are already coroutines (the password helpers) are called
+    directly; they must not touch the session.
+    """
+
+    service_class: type = None
+
+    def __init__(self, db: AnySession):
+        self.db = db
+
+    async def run(self, func, *args, **kwargs):
+        """Call func(service, *args, **kwargs) without blocking the event loop"""
+        if isinstance(self.db, AsyncSession):
+            return await self.db.run_sync(
+                lambda session: func(self.service_class(session), *args, **kwargs)
+            )
+        return await run_in_threadpool(func, self.service_class(self.db), *args, **kwargs)
+
+    def __getattr__(self, name):
+        method = getattr(self.service_class, name)
+        if not callable(method):
+            return method
+        if inspect.iscoroutinefunction(method):
+            session = self.db.sync_session if isinstance(self.db, AsyncSession) else self.db
+            return getattr(self.service_class(session), name)
+
+        @functools.wraps(method)
+        async def call(*args, **kwargs):
+            return await self.run(method, *args, **kwargs)
+        return call
+
+
+class AsyncPatientService(AsyncService):
+    service_class = PatientService
+
+
+class AsyncQueueService(AsyncService):
+    service_class = QueueService
+
+
+class AsyncUserService(AsyncService):
+    service_class = UserService
+
+
+class AsyncAuthService(AsyncService):
+    service_class = AuthService
+
+    async def authenticate_user_async(self, username: str, password: str) -> Optional[User]:
+        """Authenticate a user; the lookup and the bcrypt check both run off the event loop"""
+        user = await self.get_login_user(username)
+        if not user:
+            return None
+        if not await self.verify_password_async(password, user.hashed_password):
+            return None
+        return user
@@ -2,22 +2,111 @@
 Authentication service for JWT token handling and user authentication
 """
 
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from app.models.user import User
+from app.schemas.user import TokenData
 from app.core.config import settings
+from app.core.cache import TTLCache
+from app.core.database import get_db
+from app.core.workers import BoundedWorkerPool, PoolOverloadedError
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt takes ~200 ms per call, so password work runs in a bounded pool
+# instead of blocking the event loop
+password_pool = BoundedWorkerPool(
+    kind=settings.password_hash_executor,
+    max_workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    name="password-hash"
+)
+
+
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
 
+# Authenticated users keyed by token subject (username). Entries are detached
+# from their session, so they must be treated as read-only snapshots.
+user_cache = TTLCache(
+    max_size=settings.user_cache_max_size,
+    ttl_seconds=settings.user_cache_ttl_seconds
+)
+
+
+class TokenVersionMap:
+    """In-memory map of user id to token version, reloaded periodically.
+
+    Tokens carry the version they were issued with; bumping a user's
+    token_version revokes every token issued before. Changes made by this
+    worker apply immediately, changes made by other workers once the map is
+    next reloaded. The map is loaded at startup and reloaded on the session
+    of the request that finds it stale, so it never takes a pooled
+    connection of its own.
+    """
+
+    # Unknown user ids trigger a reload, at most this often
+    MIN_RELOAD_INTERVAL = 1.0
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        self._versions: Dict[int, int] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> None:
+        """Reload every user's token version through db"""
+        rows = db.query(User.id, User.token_version).all()
+        self._versions = {user_id: version or 0 for user_id, version in rows}
+        self._loaded_at = time.monotonic()
+
+    def _age(self) -> float:
+        if self._loaded_at is None:
+            return float("inf")
+        return time.monotonic() - self._loaded_at
+
+    def get(self, user_id: int, db: Session) -> Optional[int]:
+        """Return the current token version, or None for unknown users.
+
+        db is the request's session, used if the map has to be reloaded.
+        """
+        if self._age() >= self.refresh_seconds:
+            with self._lock:
+                if self._age() >= self.refresh_seconds:
+                    self.load(db)
+
+        version = self._versions.get(user_id)
+        if version is None and self._age() >= self.MIN_RELOAD_INTERVAL:
+            with self._lock:
+                if self._age() >= self.MIN_RELOAD_INTERVAL:
+                    self.load(db)
+            version = self._versions.get(user_id)
+        return version
+
+    def set(self, user_id: int, version: int) -> None:
+        self._versions[user_id] = version or 0
+
+    def discard(self, user_id: int) -> None:
+        self._versions.pop(user_id, None)
+
+
+token_versions = TokenVersionMap(refresh_seconds=settings.token_version_refresh_seconds)
+
 
 class AuthService:
     def __init__(self, db: Session):
@@ -31,6 +120,24 @@ class AuthService:
         """Hash a password"""
         return pwd_context.hash(password)
 
+    async def _run_password_job(self, func, *args):
+        try:
+            return await password_pool.run(func, *args)
+        except PoolOverloadedError:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry",
+                headers={"Retry-After": "1"},
+            )
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password in the password worker pool"""
+        return await self._run_password_job(_verify_password, plain_password, hashed_password)
+
+    async def get_password_hash_async(self, password: str) -> str:
+        """Hash a password in the password worker pool"""
+        return await self._run_password_job(_hash_password, password)
+
     def authenticate_user(self, username: str, password: str) -> Optional[User]:
         """Authenticate a user with username and password"""
         user = self.db.query(User).filter(User.username == username).first()
@@ -40,9 +147,46 @@ class AuthService:
             return None
         return user
 
-    def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
-        """Create a JWT access token"""
+    def get_login_user(self, username: str) -> Optional[User]:
+        """Load a user for password verification, detached from the session"""
+        user = self.db.query(User).filter(User.username == username).first()
+        if user:
+            self.db.expunge(user)
+
+        # Hand the connection back to the pool while bcrypt runs, otherwise a
+        # login burst holds every pooled connection and stalls the event loop
+        self.db.rollback()
+        return user
+
+    async def authenticate_user_async(self, username: str, password: str) -> Optional[User]:
+        """Authenticate a user, verifying the password off the event loop"""
+        user = self.get_login_user(username)
+        if not user:
+            return None
+        if not await self.verify_password_async(password, user.hashed_password):
+            return None
+        return user
+
+    def create_access_token(
+        self,
+        data: dict,
+        expires_delta: Optional[timedelta] = None,
+        user: Optional[User] = None
+    ):
+        """Create a JWT access token.
+
+        When user is given, its id, flags and token version are embedded so
+        requests can be authorized without reading the users table.
+        """
         to_encode = data.copy()
+        if user is not None:
+            to_encode.update({
+                "uid": user.id,
+                "active": bool(user.is_active),
+                "su": bool(user.is_superuser),
+                "ver": user.token_version or 0
+            })
+            token_versions.set(user.id, user.token_version)
         if expires_delta:
             expire = datetime.utcnow() + expires_delta
         else:
@@ -55,7 +199,7 @@ class AuthService:
     @staticmethod
     def get_current_user(
         token: str = Depends(oauth2_scheme),
-        db: Session = Depends(lambda: None)  # This will be injected by FastAPI
+        db: Session = Depends(get_db)  # Same session the endpoint receives
     ) -> User:
         """Get the current authenticated user from JWT token"""
         credentials_exception = HTTPException(
@@ -72,11 +216,75 @@ class AuthService:
         except JWTError:
             raise credentials_exception
         
-        # Get user from database
-        from app.core.database import get_db
-        db = next(get_db())
-        user = db.query(User).filter(User.username == username).first()
+        user = user_cache.get(username)
         if user is None:
-            raise credentials_exception
+            # Get user from database
+            user = db.query(User).filter(User.username == username).first()
+            if user is None:
+                raise credentials_exception
+            
+            db.expunge(user)
+            user_cache.set(username, user)
+        
+        if not user.is_active:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Inactive user"
+            )
         
         return user
+
+    @staticmethod
+    def get_token_user(
+        token: str = Depends(oauth2_scheme),
+        db: Session = Depends(get_db)
+    ) -> TokenData:
+        """Authorize from the JWT claims alone, without reading the users table.
+
+        The token's version is checked against the in-memory version map, so
+        deactivated users and changed privileges are revoked. Tokens issued
+        before claims were embedded fall back to get_current_user.
+        """
+        credentials_exception = HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+        
+        try:
+            payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
+        except JWTError:
+            raise credentials_exception
+        
+        username = payload.get("sub")
+        user_id = payload.get("uid")
+        if username is None:
+            raise credentials_exception
+        
+        if user_id is None:
+            user = AuthService.get_current_user(token=token, db=db)
+            return TokenData(
+                id=user.id,
+                username=user.username,
+                is_active=user.is_active,
+                is_superuser=user.is_superuser,
+                token_version=user.token_version or 0
+            )
+        
+        token_version = payload.get("ver", 0)
+        if token_versions.get(user_id, db) != token_version:
+            raise credentials_exception
+        
+        if not payload.get("active", False):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Inactive user"
+            )
+        
+        return TokenData(
+            id=user_id,
+            username=username,
+            is_active=True,
+            is_superuser=payload.get("su", False),
+            token_version=token_version
+        )
@@ -0,0 +1,171 @@
+"""
+Streaming CSV and NDJSON exports of database tables
+"""
+
+import csv
+import enum
+import io
+import json
+from abc import ABC, abstractmethod
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Union
+from sqlalchemy import literal
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.sql import Select
+from starlette.responses import StreamingResponse
+from app.core.database import AnySession, session_factory_for
+from app.services.queue_index import utc_naive
+
+# Media type of each export format
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def time_range(column, start: Optional[datetime], end: Optional[datetime], dialect: str) -> List[Any]:
+    """Filters keeping column within [start, end); either bound may be left open.
+
+    Bounds are compared as naive UTC, like the stored timestamps. SQLite
+    compares timestamps as text, and server-side now() stores whole seconds
+    without the fraction bound datetimes always carry, so whole-second bounds
+    are written the same way there.
+    """
+    if start and end and utc_naive(start) >= utc_naive(end):
+        raise ValueError("The start of the date range must be before its end")
+    filters = []
+    for bound, include in ((start, column.__ge__), (end, column.__lt__)):
+        if bound is None:
+            continue
+        bound = utc_naive(bound)
+        if dialect == "sqlite":
+            bound = literal(bound.isoformat(sep=" ", timespec="microseconds" if bound.microsecond else "seconds"))
+        filters.append(include(bound))
+    return filters
+
+
+def _plain(value: Any) -> Any:
+    """JSON/CSV friendly form of a column value"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class ExportEncoder(ABC):
+    """Turns batches of result rows into chunks of the export body"""
+
+    def __init__(self, columns: Sequence[str]):
+        self.columns = list(columns)
+
+    def header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def encode(self, rows: Sequence[Sequence[Any]]) -> str:
+        """Body chunk for one batch of rows"""
+
+
+class CsvExportEncoder(ExportEncoder):
+    """CSV with a header row of column names; NULL is an empty cell"""
+
+    def _write(self, rows) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+
+    def header(self) -> str:
+        return self._write([self.columns])
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> str:
+        return self._write(
+            ["" if value is None else _plain(value) for value in row] for row in rows
+        )
+
+
+class NdjsonExportEncoder(ExportEncoder):
+    """One JSON object per row and line"""
+
+    def encode(self, rows: Sequence[Sequence[Any]]) -> str:
+        return "".join(
+            json.dumps(dict(zip(self.columns, map(_plain, row))), separators=(",", ":")) + "\n"
+            for row in rows
+        )
+
+
+def make_encoder(export_format: str, columns: Sequence[str]) -> ExportEncoder:
+    return CsvExportEncoder(columns) if export_format == "csv" else NdjsonExportEncoder(columns)
+
+
+def stream_export(
+    session_factory: Union[sessionmaker, async_sessionmaker],
+    statement: Select,
+    encoder: ExportEncoder,
+    batch_size: int = 1000
+) -> Union[Iterator[bytes], AsyncIterator[bytes]]:
+    """Body of an export of statement's rows, for a StreamingResponse.
+
+    Rows are fetched batch_size at a time with yield_per, which reads them
+    through a server-side cursor where the driver has one (psycopg2,
+    asyncpg), and each batch is encoded and sent before the next one is
+    read, so memory does not grow with the table. The rows are read on a
+    session of session_factory that the generator opens and closes itself,
+    so the body does not depend on the request's session staying open while
+    it is sent.
+
+    With an async_sessionmaker the rows are streamed on the event loop; with
+    a sessionmaker the returned generator is iterated in the threadpool by
+    StreamingResponse.
+    """
+    statement = statement.execution_options(yield_per=batch_size)
+    if isinstance(session_factory, async_sessionmaker):
+        return _stream_async(session_factory, statement, encoder)
+    return _stream_sync(session_factory, statement, encoder)
+
+
+def _stream_sync(session_factory: sessionmaker, statement: Select, encoder: ExportEncoder) -> Iterator[bytes]:
+    header = encoder.header()
+    if header:
+        yield header.encode()
+    db = session_factory()
+    try:
+        result = db.execute(statement)
+        try:
+            for rows in result.partitions():
+                yield encoder.encode(rows).encode()
+        finally:
+            result.close()
+    finally:
+        db.close()
+
+
+async def _stream_async(
+    session_factory: async_sessionmaker, statement: Select, encoder: ExportEncoder
+) -> AsyncIterator[bytes]:
+    header = encoder.header()
+    if header:
+        yield header.encode()
+    async with session_factory() as db:
+        result = await db.stream(statement)
+        try:
+            async for rows in result.partitions():
+                yield encoder.encode(rows).encode()
+        finally:
+            await result.close()
+
+
+def export_response(
+    db: AnySession, statement: Select, export_format: str, name: str, batch_size: int = 1000
+) -> StreamingResponse:
+    """StreamingResponse exporting statement's rows as a name.csv / name.ndjson download.
+
+    The body is read on a new session like db (see stream_export), not on db.
+    """
+    encoder = make_encoder(export_format, statement.selected_columns.keys())
+    return StreamingResponse(
+        stream_export(session_factory_for(db), statement, encoder, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{export_format}"'}
+    )
@@ -2,10 +2,94 @@
 Patient service for patient management operations
 """
 
-from sqlalchemy.orm import Session
-from typing import List, Optional
-from app.models.patient import Patient
-from app.schemas.patient import PatientCreate, PatientUpdate
+import weakref
+from sqlalchemy import bindparam, case, column, func, insert, select, table, text, union
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import Select
+from datetime import datetime
+from typing import List, Optional, Tuple
+from app.core.config import settings
+from app.core.database import commit_without_expiring
+from app.core.pagination import CursorKey, check_page_args
+from app.models.patient import Patient, SQLITE_FTS_TABLE
+from app.models.queue import Queue
+from app.schemas.patient import PatientCreate, PatientRegistration, PatientUpdate
+from app.schemas.queue import QueueBase
+from app.services.export import time_range
+from app.services.patient_index import PatientSuggestion, patient_index
+from app.services.queue import QueueService
+from app.services.queue_version import queue_version
+from app.services.sequence import get_allocator
+
+# Words shorter than a trigram cannot use the search index
+MIN_INDEXED_WORD = 3
+
+# Patient listings are ordered by ID
+PATIENT_CURSOR = CursorKey("patients", {"id": int})
+
+# Whether each engine's database has the SQLite FTS table (created by migration)
+_fts_available: "weakref.WeakKeyDictionary[Engine, bool]" = weakref.WeakKeyDictionary()
+
+# Crockford base32: no I, L, O or U, so IDs survive being read aloud or retyped
+PATIENT_ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+PATIENT_ID_WIDTH = 5
+
+
+def _check_character(payload: str) -> str:
+    """Luhn mod 32 check character; catches any single wrong character and
+    most swaps of adjacent characters"""
+    base = len(PATIENT_ID_ALPHABET)
+    total = 0
+    factor = 2
+    for char in reversed(payload):
+        addend = factor * PATIENT_ID_ALPHABET.index(char)
+        total += addend // base + addend % base
+        factor = 1 if factor == 2 else 2
+    return PATIENT_ID_ALPHABET[(base - total % base) % base]
+
+
+def format_patient_id(value: int) -> str:
+    """Encode a sequence value as a patient ID, e.g. 1 -> 'P00001Y'"""
+    digits = []
+    while value:
+        value, remainder = divmod(value, len(PATIENT_ID_ALPHABET))
+        digits.append(PATIENT_ID_ALPHABET[remainder])
+    payload = "".join(reversed(digits)).rjust(PATIENT_ID_WIDTH, "0")
+    return f"P{payload}{_check_character(payload)}"
+
+
+def is_valid_patient_id(patient_id: str) -> bool:
+    """True if patient_id is a well-formed sequence-derived ID with a matching check character"""
+    payload, check = patient_id[1:-1], patient_id[-1:]
+    return (
+        patient_id.startswith("P")
+        and len(payload) >= PATIENT_ID_WIDTH
+        and all(char in PATIENT_ID_ALPHABET for char in payload)
+        and _check_character(payload) == check
+    )
+
+
+def _fts_phrase(word: str) -> str:
+    """word as an FTS5 phrase, matched literally"""
+    return '"{}"'.format(word.replace('"', '""'))
+
+
+def _ids(statement: Select) -> Select:
+    """SELECT id FROM (statement), so a limited select can go into a UNION"""
+    subquery = statement.subquery()
+    return select(subquery.c.id)
+
+
+def _word_filter(word: str):
+    """Match one search word anywhere in the first name, last name or patient ID"""
+    pattern = f"%{word}%"
+    return (
+        Patient.first_name.ilike(pattern) |
+        Patient.last_name.ilike(pattern) |
+        Patient.patient_id.ilike(pattern)
+    )
+
 
 class PatientService:
     def __init__(self, db: Session):
@@ -14,73 +98,160 @@ class PatientService:
     def create_patient(self, patient_data: PatientCreate) -> Patient:
         """Create a new patient"""
         try:
-            # Generate unique patient ID
-            patient_id = self._generate_patient_id()
-            
-            # Import datetime for created_at
-            from datetime import datetime
-            
-            # Create patient object with all required fields
-            db_patient = Patient(
-                patient_id=patient_id,
-                first_name=patient_data.first_name,
-                last_name=patient_data.last_name,
-                date_of_birth=patient_data.date_of_birth,
-                gender=patient_data.gender,
-                phone=patient_data.phone,
-                email=patient_data.email,
-                address=patient_data.address,
-                emergency_contact=patient_data.emergency_contact,
-                medical_history=patient_data.medical_history,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
-            )
-            
-            print(f"Creating patient with data: {db_patient}")
-            
+            db_patient = self._new_patient(patient_data)
             self.db.add(db_patient)
             self.db.commit()
             self.db.refresh(db_patient)
+            self._mirror(db_patient)
             
             # Verify the patient was created correctly
             if not db_patient.id:
                 raise ValueError("Failed to create patient - no ID generated")
-                
-            print(f"Patient created successfully with ID: {db_patient.id}")
             return db_patient
             
         except Exception as e:
             # Always rollback on any error
             self.db.rollback()
             print(f"Error creating patient: {e}")
-            print(f"Patient data: {patient_data}")
             raise ValueError(f"Failed to create patient: {str(e)}")
 
+    def register_patient(self, registration: PatientRegistration) -> Tuple[Patient, Queue]:
+        """Create a patient and add them to the queue in one transaction (see register_patients)"""
+        return self.register_patients([registration])[0]
+
+    def register_patients(self, registrations: List[PatientRegistration]) -> List[Tuple[Patient, Queue]]:
+        """Create patients and add them all to the queue in one transaction.
+        
+        All rows are inserted by one flush and committed once, so a failure
+        leaves none of them behind. Their generated values come back from the
+        INSERTs, so nothing is reloaded afterwards. Patient IDs and queue
+        numbers are allocated for the whole group before anything is written
+        (the allocator uses its own connection, which must not wait on this
+        transaction's write lock). New patients cannot already be in the
+        queue, so add_to_queue's duplicate check is skipped.
+        """
+        queue_service = QueueService(self.db)
+        try:
+            db_patients = self._new_patients(registrations)
+            db_entries = queue_service.new_entries([
+                QueueBase(
+                    checkup_type=registration.checkup_type,
+                    priority=registration.priority,
+                    notes=registration.notes,
+                    estimated_wait_time=registration.estimated_wait_time
+                )
+                for registration in registrations
+            ])
+            for db_patient, db_queue in zip(db_patients, db_entries):
+                db_queue.patient = db_patient
+            self.db.add_all(db_patients + db_entries)
+            commit_without_expiring(self.db)
+        except Exception as e:
+            self.db.rollback()
+            noun = "patients" if len(registrations) > 1 else "patient"
+            print(f"Error registering {noun}: {e}")
+            raise ValueError(f"Failed to register {noun}: {str(e)}")
+        
+        if settings.patient_index_enabled:
+            patient_index.upsert_many(db_patients)
+        for db_queue in db_entries:
+            queue_service.entry_added(db_queue)
+        return list(zip(db_patients, db_entries))
+
+    def import_patients(self, patients: List[PatientCreate]) -> List[str]:
+        """Save a batch of validated patients in one transaction; returns their patient IDs.
+        
+        IDs are reserved for the whole batch at once and the rows go in through
+        executemany (batched multi-row INSERTs where the dialect supports it).
+        """
+        patient_ids = self._generate_patient_ids(len(patients))
+        # created_at comes from the server default; updated_at stays NULL until the first update
+        rows = [
+            dict(patient.model_dump(), patient_id=patient_id)
+            for patient, patient_id in zip(patients, patient_ids)
+        ]
+        # Read back what the autocomplete index needs with RETURNING when possible
+        mirror = settings.patient_index_enabled and self.db.get_bind().dialect.insert_executemany_returning
+        statement = insert(Patient)
+        if mirror:
+            statement = statement.returning(*(getattr(Patient, field) for field in PatientSuggestion.FIELDS))
+        try:
+            result = self.db.execute(statement, rows)
+            inserted = result.all() if mirror else []
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            print(f"Error importing patients: {e}")
+            raise ValueError(f"Failed to import patients: {str(e)}")
+        
+        if inserted:
+            patient_index.upsert_many(inserted)
+        return patient_ids
+
+    def _new_patient(self, patient_data: PatientCreate) -> Patient:
+        """Unsaved patient for patient_data with a newly generated patient ID"""
+        return self._new_patients([patient_data])[0]
+
+    def _new_patients(self, patients: List[PatientCreate]) -> List[Patient]:
+        """Unsaved patients like _new_patient, with their patient IDs reserved together.
+        
+        created_at is left to the server default and read back by the INSERT's
+        RETURNING; updated_at stays NULL until the first update.
+        """
+        return [
+            Patient(
+                patient_id=patient_id,
+                first_name=patient_data.first_name,
+                last_name=patient_data.last_name,
+                date_of_birth=patient_data.date_of_birth,
+                gender=patient_data.gender,
+                phone=patient_data.phone,
+                email=patient_data.email,
+                address=patient_data.address,
+                emergency_contact=patient_data.emergency_contact,
+                medical_history=patient_data.medical_history
+            )
+            for patient_data, patient_id in zip(patients, self._generate_patient_ids(len(patients)))
+        ]
+
     def get_patient(self, patient_id: int) -> Optional[Patient]:
         """Get a patient by ID"""
         return self.db.query(Patient).filter(Patient.id == patient_id).first()
 
     def get_patient_by_patient_id(self, patient_id: str) -> Optional[Patient]:
         """Get a patient by patient ID (external ID)"""
-        try:
-            return self.db.query(Patient).filter(Patient.patient_id == patient_id).first()
-        except Exception as e:
-            print(f"Error querying patient by patient_id '{patient_id}': {e}")
-            return None
+        return self.db.query(Patient).filter(Patient.patient_id == patient_id).first()
 
-    def get_patients(self, skip: int = 0, limit: int = 100, search: Optional[str] = None) -> List[Patient]:
-        """Get a list of patients with optional search and pagination"""
-        query = self.db.query(Patient)
+    def get_patients(
+        self, skip: int = 0, limit: int = 100, search: Optional[str] = None, cursor: Optional[str] = None
+    ) -> List[Patient]:
+        """Get a list of patients with optional search and pagination.
         
+        Search results are ranked and capped (see _search_query), so they are
+        paged with skip; plain listings continue from cursor.
+        """
         if search:
-            search_term = f"%{search}%"
-            query = query.filter(
-                (Patient.first_name.ilike(search_term)) |
-                (Patient.last_name.ilike(search_term)) |
-                (Patient.patient_id.ilike(search_term))
-            )
-        
-        return query.offset(skip).limit(limit).all()
+            if cursor:
+                raise ValueError("Search results are paged with skip, not cursor")
+            return self._search_query(search).offset(skip).limit(limit).all()
+        return self._page(self.db.query(Patient), skip, limit, cursor)
+
+    def _page(self, query: Query, skip: int, limit: int, cursor: Optional[str]) -> List[Patient]:
+        """One page of a patient listing in ID order, after cursor or skip rows"""
+        check_page_args(cursor, skip)
+        if cursor:
+            (after_id,) = PATIENT_CURSOR.decode(cursor)
+            query = query.filter(Patient.id > after_id)
+        return query.order_by(Patient.id).offset(skip).limit(limit).all()
+
+    def export_query(self, created_from: Optional[datetime] = None, created_to: Optional[datetime] = None) -> Select:
+        """Rows of the patients created in [created_from, created_to), in ID order, for stream_export"""
+        dialect = self.db.get_bind().dialect.name
+        return (
+            select(*Patient.__table__.columns)
+            .where(*time_range(Patient.created_at, created_from, created_to, dialect))
+            .order_by(Patient.id)
+        )
 
     def update_patient(self, patient_id: int, patient_update: PatientUpdate) -> Optional[Patient]:
         """Update a patient"""
@@ -106,57 +277,167 @@ class PatientService:
         
         self.db.commit()
         self.db.refresh(db_patient)
+        self._mirror(db_patient)
+        # Queue listings can embed patient summaries
+        queue_version.bump()
         return db_patient
 
     def delete_patient(self, patient_id: int) -> bool:
-        """Delete a patient"""
+        """Delete a patient together with their queue entries"""
         db_patient = self.get_patient(patient_id)
         if not db_patient:
             return False
         
+        queue_service = QueueService(self.db)
+        removed = queue_service.delete_entries(db_patient.queue_entries)
         self.db.delete(db_patient)
         self.db.commit()
+        patient_index.discard(patient_id)
+        if removed:
+            queue_service.entries_removed(removed)
         return True
 
     def search_patients(self, search_term: str, limit: int = 50) -> List[Patient]:
         """Search patients by name or patient ID"""
-        search_pattern = f"%{search_term}%"
-        return self.db.query(Patient).filter(
-            (Patient.first_name.ilike(search_pattern)) |
-            (Patient.last_name.ilike(search_pattern)) |
-            (Patient.patient_id.ilike(search_pattern))
-        ).limit(limit).all()
-
-    def get_patients_by_gender(self, gender: str, skip: int = 0, limit: int = 100) -> List[Patient]:
+        return self._search_query(search_term).limit(limit).all()
+
+    def autocomplete(self, query: str, limit: int = 10) -> List[PatientSuggestion]:
+        """Patients whose name, patient ID or phone number starts with query.
+        
+        Served from the in-memory prefix index without touching the database;
+        falls back to the search index when the prefix index is disabled.
+        """
+        if settings.patient_index_enabled and patient_index.loaded:
+            return patient_index.lookup(query, limit)
+        return [PatientSuggestion.from_model(patient) for patient in self.search_patients(query, limit)]
+
+    def rebuild_patient_index(self) -> None:
+        """Load the in-memory autocomplete index from the database"""
+        if settings.patient_index_enabled:
+            patient_index.rebuild(self.db)
+
+    def _mirror(self, db_patient: Patient) -> None:
+        """Reflect a committed change in the in-memory autocomplete index"""
+        if settings.patient_index_enabled:
+            patient_index.upsert(db_patient)
+
+    def _search_query(self, search: str) -> Query:
+        """Patients where every word of search appears in the first name, last
+        name or patient ID, best matches first.
+        
+        Words of 3+ characters are matched through the FTS5 trigram table on
+        SQLite or the pg_trgm indexes on PostgreSQL; shorter words are checked
+        with ILIKE. Broad terms would make ranking every match costly, so only
+        an exact patient ID match, the PATIENT_SEARCH_MAX_RESULTS best matches
+        whose name starts with the first word, and the first
+        PATIENT_SEARCH_MAX_RESULTS other matches are ranked. The exact and
+        prefix matches always rank first; name prefixes are found through the
+        index too (FTS5 initial-token queries, pg_trgm ILIKE).
+        """
+        words = search.split()
+        if not words:
+            return self.db.query(Patient)
+        
+        dialect = self.db.get_bind().dialect.name
+        indexed = [word for word in words if len(word) >= MIN_INDEXED_WORD]
+        use_index = settings.patient_search_index and bool(indexed)
+        max_results = settings.patient_search_max_results
+        first = words[0]
+        
+        if use_index and dialect == "postgresql":
+            full_name = Patient.first_name + " " + Patient.last_name
+            ordering = [func.greatest(
+                func.similarity(full_name, search),
+                func.similarity(Patient.patient_id, search)
+            ).desc()]
+        else:
+            # Exact patient ID, then names starting with the first word, then
+            # the rest, shortest names (where the term covers the most) first.
+            # FTS5's bm25 is far costlier per row and favours the same rows.
+            ordering = [
+                case(
+                    (Patient.patient_id.ilike(first), 0),
+                    (Patient.first_name.ilike(f"{first}%") | Patient.last_name.ilike(f"{first}%"), 1),
+                    else_=2
+                ),
+                func.length(Patient.first_name) + func.length(Patient.last_name)
+            ]
+        
+        prefix_filter = Patient.first_name.ilike(f"{first}%") | Patient.last_name.ilike(f"{first}%")
+        if use_index and dialect == "sqlite" and self._has_fts_table():
+            fts = table(SQLITE_FTS_TABLE, column("rowid"))
+            match = " AND ".join(_fts_phrase(word) for word in indexed)
+            short = [word for word in words if len(word) < MIN_INDEXED_WORD]
+
+            def fts_matches(query: str) -> Select:
+                return select(Patient.id).select_from(fts).join(Patient, Patient.id == fts.c.rowid).where(
+                    text(f"{SQLITE_FTS_TABLE} MATCH :match").bindparams(bindparam("match", query, unique=True)),
+                    *[_word_filter(word) for word in short]
+                )
+
+            matches = fts_matches(match)
+            if len(first) >= MIN_INDEXED_WORD:
+                # ^ anchors the phrase to the first token of the column
+                prefixed = fts_matches(f"{{first_name last_name}} : ^{_fts_phrase(first)} AND {match}")
+            else:
+                prefixed = matches.where(prefix_filter)
+        else:
+            matches = select(Patient.id).where(*[_word_filter(word) for word in words])
+            prefixed = matches.where(prefix_filter)
+        
+        exact = select(Patient.id).where(
+            Patient.patient_id == first.upper(), *[_word_filter(word) for word in words[1:]]
+        )
+        candidates = union(
+            exact,
+            _ids(prefixed.order_by(*ordering, Patient.id).limit(max_results)),
+            _ids(matches.limit(max_results))
+        ).subquery()
+        
+        return self.db.query(Patient).join(
+            candidates, candidates.c.id == Patient.id
+        ).order_by(*ordering, Patient.id)
+
+    def _has_fts_table(self) -> bool:
+        engine = self.db.get_bind()
+        available = _fts_available.get(engine)
+        if available is None:
+            available = self.db.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": SQLITE_FTS_TABLE}
+            ).first() is not None
+            _fts_available[engine] = available
+        return available
+
+    def get_patients_by_gender(
+        self, gender: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Patient]:
         """Get patients by gender"""
-        return self.db.query(Patient).filter(
-            Patient.gender == gender
-        ).offset(skip).limit(limit).all()
+        return self._page(self.db.query(Patient).filter(Patient.gender == gender), skip, limit, cursor)
 
-    def get_patients_by_age_range(self, min_age: int, max_age: int, skip: int = 0, limit: int = 100) -> List[Patient]:
+    def get_patients_by_age_range(
+        self, min_age: int, max_age: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+    ) -> List[Patient]:
         """Get patients within an age range"""
         from datetime import date
         today = date.today()
         min_date = today.replace(year=today.year - max_age)
         max_date = today.replace(year=today.year - min_age)
         
-        return self.db.query(Patient).filter(
-            Patient.date_of_birth.between(min_date, max_date)
-        ).offset(skip).limit(limit).all()
+        return self._page(
+            self.db.query(Patient).filter(Patient.date_of_birth.between(min_date, max_date)), skip, limit, cursor
+        )
 
     def _generate_patient_id(self) -> str:
-        """Generate a unique patient ID"""
-        import random
-        import string
-        
-        while True:
-            # Generate a 6-character alphanumeric ID
-            patient_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
-            
-            # Check if it already exists
-            existing = self.get_patient_by_patient_id(patient_id)
-            if not existing:
-                return patient_id
+        """Generate a unique patient ID from the block-allocated patient sequence"""
+        return format_patient_id(self._patient_id_allocator().next())
+
+    def _generate_patient_ids(self, count: int) -> List[str]:
+        """Generate unique patient IDs for a batch, reserving them in one round trip at most"""
+        return [format_patient_id(value) for value in self._patient_id_allocator().take(count)]
+
+    def _patient_id_allocator(self):
+        return get_allocator(self.db.get_bind(), "patient_id", settings.patient_id_block_size)
 
     def mark_patient_served(self, patient_id: int) -> Optional[Patient]:
         """Mark a patient as served"""
@@ -174,11 +455,11 @@ class PatientService:
         self.db.refresh(db_patient)
         return db_patient
 
-    def get_completed_patients(self, skip: int = 0, limit: int = 100) -> List[Patient]:
+    def get_completed_patients(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[Patient]:
         """Get a list of completed/served patients"""
         # This would need to be implemented based on your business logic
         # For now, returning all patients (you might want to filter by some status)
-        return self.get_patients(skip=skip, limit=limit)
+        return self.get_patients(skip=skip, limit=limit, cursor=cursor)
 
     def get_patient_stats(self) -> dict:
         """Get patient statistics"""
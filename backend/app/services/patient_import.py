@@ -0,0 +1,288 @@
+"""
+Streaming bulk patient import from CSV and NDJSON uploads
+"""
+
+import codecs
+import csv
+import json
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import AsyncIterable, Awaitable, Callable, Deque, Dict, List, Optional, Tuple, Union
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from app.schemas.patient import PatientCreate
+
+# Media types accepted by the import endpoint and the format each one means
+IMPORT_MEDIA_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/x-jsonlines": "ndjson",
+}
+
+REQUIRED_COLUMNS = tuple(name for name, field in PatientCreate.model_fields.items() if field.is_required())
+
+# (row number, validated patient or why the row was rejected)
+ImportRow = Tuple[int, Union[PatientCreate, List[str]]]
+
+
+def import_format(content_type: Optional[str]) -> Optional[str]:
+    """Import format ("csv" or "ndjson") for a Content-Type header, or None"""
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return IMPORT_MEDIA_TYPES.get(media_type)
+
+
+def _describe(error: dict) -> str:
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+class _NeedMore(Exception):
+    """Raised to a csv.reader that asks for a line not received yet"""
+
+
+class _LineSource:
+    """Line iterator of a persistent csv.reader, refilled as the upload arrives.
+
+    Lines handed out since the current record started are kept in taken, so
+    a record cut short by the end of the lines received so far can be put
+    back and parsed again once the rest arrives.
+    """
+
+    def __init__(self):
+        self.lines: Deque[str] = deque()
+        self.taken: List[str] = []
+        self.final = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            if self.final:
+                raise StopIteration
+            raise _NeedMore()
+        line = self.lines.popleft()
+        self.taken.append(line)
+        return line
+
+    def put_back(self) -> None:
+        self.lines.extendleft(reversed(self.taken))
+        self.taken = []
+
+
+class PatientRowParser(ABC):
+    """Incremental parser turning upload chunks into numbered, validated rows.
+
+    feed() takes the next chunk of the upload and returns the rows completed
+    by it; close() returns whatever is left. Only the unfinished record is
+    kept between chunks, and a record longer than max_record_length
+    characters (e.g. after an unbalanced quote) raises ValueError, so memory
+    does not grow with the file. Rows are validated with PatientCreate;
+    invalid rows come back with their error messages instead. Text that is
+    not UTF-8 raises ValueError.
+    """
+
+    def __init__(self, max_record_length: int = 65536):
+        self.rows = 0
+        self.max_record_length = max_record_length
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._decoded_bytes = 0
+        self._pending = ""
+
+    def feed(self, chunk: bytes) -> List[ImportRow]:
+        return self._parse(self._split(self._decode(chunk)), final=False)
+
+    def close(self) -> List[ImportRow]:
+        lines = self._split(self._decode(b"", final=True))
+        if self._pending:
+            lines.append(self._pending)
+            self._pending = ""
+        return self._parse(lines, final=True)
+
+    def _decode(self, chunk: bytes, final: bool = False) -> str:
+        try:
+            text = self._decoder.decode(chunk, final)
+        except UnicodeDecodeError as e:
+            raise ValueError(f"Upload is not UTF-8 text (byte {self._decoded_bytes + e.start})")
+        self._decoded_bytes += len(chunk)
+        return text
+
+    def _split(self, text: str) -> List[str]:
+        """Complete lines (with their line break) received so far; the unfinished one is kept"""
+        lines = (self._pending + text).split("\n")
+        self._pending = lines.pop()
+        self._check_length(len(self._pending))
+        return [line + "\n" for line in lines]
+
+    def _check_length(self, length: int) -> None:
+        if length > self.max_record_length:
+            raise ValueError(
+                f"Row {self.rows + 1} is longer than {self.max_record_length} characters "
+                f"(unbalanced quote or missing line breaks?)"
+            )
+
+    @abstractmethod
+    def _parse(self, lines: List[str], final: bool) -> List[ImportRow]:
+        """Rows completed by lines (the last lines of the upload when final)"""
+
+    def _row(self, values: Union[Dict, List[str]]) -> ImportRow:
+        """Number the next row and validate it (a list is a list of errors already)"""
+        self.rows += 1
+        if isinstance(values, list):
+            return self.rows, values
+        try:
+            return self.rows, PatientCreate.model_validate(values)
+        except ValidationError as e:
+            return self.rows, [_describe(error) for error in e.errors()]
+
+
+class CsvPatientParser(PatientRowParser):
+    """CSV with a header row of PatientCreate field names.
+
+    Empty cells count as missing values and unknown columns are ignored.
+    Quoted cells may contain commas and line breaks. Lines go through one
+    csv.reader for the whole upload, so quoting follows the csv module.
+    """
+
+    def __init__(self, max_record_length: int = 65536):
+        super().__init__(max_record_length)
+        self.columns: Optional[List[str]] = None
+        self._source = _LineSource()
+        self._reader = csv.reader(self._source)
+
+    def _parse(self, lines: List[str], final: bool) -> List[ImportRow]:
+        self._source.lines.extend(lines)
+        self._source.final = final
+        rows = []
+        while True:
+            self._source.taken = []
+            try:
+                values = next(self._reader)
+            except StopIteration:
+                break
+            except _NeedMore:
+                # A quoted cell goes on past the lines received so far: read the
+                # record again once the rest has arrived
+                self._source.put_back()
+                self._check_length(sum(map(len, self._source.lines)) + len(self._pending))
+                break
+            except csv.Error as e:
+                raise ValueError(f"Malformed CSV after row {self.rows}: {e}")
+            self._check_length(sum(map(len, self._source.taken)))
+            if not values or (len(values) == 1 and not values[0].strip()):
+                continue
+            if self.columns is None:
+                self.columns = [name.strip() for name in values]
+                missing = [name for name in REQUIRED_COLUMNS if name not in self.columns]
+                if missing:
+                    raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+                continue
+            if len(values) != len(self.columns):
+                rows.append(self._row([f"Expected {len(self.columns)} columns, got {len(values)}"]))
+                continue
+            rows.append(self._row({
+                name: value.strip() for name, value in zip(self.columns, values) if value.strip()
+            }))
+        return rows
+
+
+class NdjsonPatientParser(PatientRowParser):
+    """One JSON object with PatientCreate fields per line; blank lines are skipped"""
+
+    def _parse(self, lines: List[str], final: bool) -> List[ImportRow]:
+        rows = []
+        for line in lines:
+            if not line.strip():
+                continue
+            self._check_length(len(line))
+            try:
+                values = json.loads(line)
+            except ValueError as e:
+                rows.append(self._row([f"Invalid JSON: {e}"]))
+                continue
+            rows.append(self._row(values if isinstance(values, dict) else ["Row is not a JSON object"]))
+        return rows
+
+
+def make_parser(upload_format: str, max_record_length: int = 65536) -> PatientRowParser:
+    parser_class = CsvPatientParser if upload_format == "csv" else NdjsonPatientParser
+    return parser_class(max_record_length)
+
+
+class PatientImportReport:
+    """Counts of an import, plus the first max_errors rejected rows"""
+
+    def __init__(self, max_errors: int = 100):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[Dict] = []
+
+    def reject(self, row: int, errors: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "errors": errors})
+
+    def as_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+async def import_patients(
+    chunks: AsyncIterable[bytes],
+    parser: PatientRowParser,
+    save: Callable[[List[PatientCreate]], Awaitable[List[str]]],
+    batch_size: int = 1000,
+    max_errors: int = 100,
+) -> PatientImportReport:
+    """Parse an upload as it arrives and save its valid rows in batches.
+
+    save stores one batch in one transaction (PatientService.import_patients).
+    A batch that fails to save is reported row by row; the import goes on
+    with the next one. Batches saved before an error in the upload itself
+    (ValueError from the parser) stay saved.
+    """
+    report = PatientImportReport(max_errors)
+    batch: List[Tuple[int, PatientCreate]] = []
+
+    async def flush():
+        if not batch:
+            return
+        try:
+            await save([patient for _, patient in batch])
+            report.imported += len(batch)
+        except ValueError as e:
+            for row, _ in batch:
+                report.reject(row, [str(e)])
+        batch.clear()
+
+    async def take(rows: List[ImportRow]):
+        for row, result in rows:
+            report.rows += 1
+            if isinstance(result, PatientCreate):
+                batch.append((row, result))
+                if len(batch) >= batch_size:
+                    await flush()
+            else:
+                report.reject(row, result)
+
+    # Parsing and validation are CPU-bound, so they run off the event loop
+    try:
+        async for chunk in chunks:
+            await take(await run_in_threadpool(parser.feed, chunk))
+        await take(await run_in_threadpool(parser.close))
+    except ValueError as e:
+        if report.imported:
+            raise ValueError(f"{e}; {report.imported} patients were imported before it")
+        raise
+    await flush()
+    return report
@@ -0,0 +1,228 @@
+"""
+In-process prefix index for patient autocomplete
+"""
+
+import bisect
+import heapq
+import threading
+import time
+import unicodedata
+from datetime import date
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.patient import Patient
+
+# Separates the normalized key from the patient's primary key inside an entry;
+# sorts before every printable character, so "ann\0..." comes before "anna\0..."
+SEPARATOR = "\x00"
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, strip accents and collapse whitespace: "  José  Núñez" -> "jose nunez" """
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", value)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.lower().split())
+
+
+def normalize_phone(value: Optional[str]) -> str:
+    """Keep only the digits of a phone number: "+1 (555) 010-99" -> "155501099" """
+    return "".join(char for char in value or "" if char.isdigit())
+
+
+def normalize_query(query: str) -> str:
+    """Normalize a typed prefix the same way as the keys it should match"""
+    if any(char.isdigit() for char in query) and not any(char.isalpha() for char in query):
+        return normalize_phone(query)
+    return normalize_text(query)
+
+
+class PatientSuggestion:
+    """Detached copy of the patient fields shown in autocomplete results"""
+
+    FIELDS = ("id", "patient_id", "first_name", "last_name", "date_of_birth", "phone")
+    __slots__ = FIELDS + ("keys",)
+
+    def __init__(self, id: int, patient_id: str, first_name: str, last_name: str,
+                 date_of_birth: Optional[date], phone: Optional[str]):
+        self.id = id
+        self.patient_id = patient_id
+        self.first_name = first_name
+        self.last_name = last_name
+        self.date_of_birth = date_of_birth
+        self.phone = phone
+
+        # Normalized strings a typed prefix is matched against
+        first = normalize_text(first_name)
+        last = normalize_text(last_name)
+        keys = {first, last, f"{first} {last}", f"{last} {first}", normalize_text(patient_id), normalize_phone(phone)}
+        keys.discard("")
+        self.keys = frozenset(keys)
+
+    @classmethod
+    def from_model(cls, patient) -> "PatientSuggestion":
+        return cls(*(getattr(patient, field) for field in cls.FIELDS))
+
+
+class PatientPrefixIndex:
+    """Sorted array of "key NUL id" entries searched with bisect.
+
+    Lookups are two binary searches plus a short scan, so they cost the same
+    at any table size and never touch the database. New entries go into a
+    small sorted buffer that is merged into the main array once it outgrows
+    merge_threshold (or 1/32 of the array), so an insert does not shift the
+    whole array. Entries left
+    behind by updates and deletes are skipped at lookup time and dropped when
+    the array is compacted.
+
+    Each worker only sees its own writes, so the index is reloaded from the
+    database every refresh_seconds by a background task (0 = startup only).
+    """
+
+    def __init__(self, refresh_seconds: float = 300, merge_threshold: int = 1024):
+        self.refresh_seconds = refresh_seconds
+        self.merge_threshold = merge_threshold
+        self._patients: Dict[int, PatientSuggestion] = {}
+        self._entries: List[str] = []
+        self._pending: List[str] = []
+        self._stale_entries = 0
+        self._rebuild_log: Optional[List[tuple]] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._patients)
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every patient from the database.
+
+        The query runs without holding the lock so lookups keep being served;
+        changes mirrored while it runs are replayed on top of the new arrays.
+        """
+        with self._lock:
+            self._rebuild_log = []
+        try:
+            rows = db.query(
+                Patient.id, Patient.patient_id, Patient.first_name,
+                Patient.last_name, Patient.date_of_birth, Patient.phone
+            ).yield_per(10000)
+            patients = {row.id: PatientSuggestion(*row) for row in rows}
+            entries = sorted(
+                f"{key}{SEPARATOR}{patient.id}"
+                for patient in patients.values()
+                for key in patient.keys
+            )
+        except Exception:
+            with self._lock:
+                self._rebuild_log = None
+            raise
+
+        with self._lock:
+            log, self._rebuild_log = self._rebuild_log, None
+            self._patients = patients
+            self._entries = entries
+            self._pending = []
+            self._stale_entries = 0
+            for operation, value in log:
+                if operation == "upsert":
+                    self._upsert(value)
+                else:
+                    self._discard(value)
+            self._loaded_at = time.monotonic()
+
+    def upsert(self, patient) -> None:
+        """Mirror a committed patient row"""
+        suggestion = PatientSuggestion.from_model(patient)
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("upsert", suggestion))
+            self._upsert(suggestion)
+
+    def upsert_many(self, patients) -> None:
+        """Mirror a batch of committed patient rows, merging them into the index once"""
+        suggestions = [PatientSuggestion.from_model(patient) for patient in patients]
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.extend(("upsert", suggestion) for suggestion in suggestions)
+            for suggestion in suggestions:
+                self._upsert(suggestion, maintain=False)
+            self._maintain()
+
+    def discard(self, patient_id: int) -> None:
+        """Drop a deleted patient; its entries are skipped until compaction"""
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("discard", patient_id))
+            self._discard(patient_id)
+
+    def lookup(self, query: str, limit: int = 10) -> List[PatientSuggestion]:
+        """Patients with a name, "first last"/"last first", patient ID or phone
+        number starting with query, in key order"""
+        prefix = normalize_query(query)
+        if not prefix or limit <= 0:
+            return []
+
+        with self._lock:
+            results: List[PatientSuggestion] = []
+            seen = set()
+            for entry in heapq.merge(self._scan(self._entries, prefix), self._scan(self._pending, prefix)):
+                key, _, pk = entry.partition(SEPARATOR)
+                patient_id = int(pk)
+                if patient_id in seen:
+                    continue
+                patient = self._patients.get(patient_id)
+                if patient is None or key not in patient.keys:
+                    continue  # left behind by an update or delete
+                seen.add(patient_id)
+                results.append(patient)
+                if len(results) >= limit:
+                    break
+            return results
+
+    def _scan(self, entries: List[str], prefix: str) -> Iterable[str]:
+        index = bisect.bisect_left(entries, prefix)
+        while index < len(entries) and entries[index].startswith(prefix):
+            yield entries[index]
+            index += 1
+
+    def _upsert(self, suggestion: PatientSuggestion, maintain: bool = True) -> None:
+        previous = self._patients.get(suggestion.id)
+        self._patients[suggestion.id] = suggestion
+        previous_keys = previous.keys if previous else frozenset()
+        for key in suggestion.keys:
+            if key not in previous_keys:
+                bisect.insort(self._pending, f"{key}{SEPARATOR}{suggestion.id}")
+        self._stale_entries += len(previous_keys - suggestion.keys)
+        if maintain:
+            self._maintain()
+
+    def _discard(self, patient_id: int) -> None:
+        previous = self._patients.pop(patient_id, None)
+        if previous is not None:
+            self._stale_entries += len(previous.keys)
+            self._maintain()
+
+    def _maintain(self) -> None:
+        if self._stale_entries > max(len(self._entries) // 4, self.merge_threshold):
+            # Too many dead entries: rebuild the arrays from the live patients
+            self._entries = sorted(
+                f"{key}{SEPARATOR}{patient.id}"
+                for patient in self._patients.values()
+                for key in patient.keys
+            )
+            self._pending = []
+            self._stale_entries = 0
+        elif len(self._pending) > max(self.merge_threshold, len(self._entries) // 32):
+            # Inserting into the buffer shifts only the buffer, so let it grow
+            # with the index; most of it is absorbed by the periodic rebuild
+            self._entries = list(heapq.merge(self._entries, self._pending))
+            self._pending = []
+
+
+patient_index = PatientPrefixIndex(refresh_seconds=settings.patient_index_refresh_seconds)
@@ -2,11 +2,72 @@
 Queue service for queue management operations
 """
 
-from sqlalchemy.orm import Session
-from typing import List, Optional, Dict, Any
-from datetime import datetime
-from app.models.queue import Queue, QueueStatus
-from app.schemas.queue import QueueCreate, QueueUpdate, QueueStatusUpdate
+from sqlalchemy import func, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, aliased, joinedload, noload
+from sqlalchemy.sql import Select
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, timedelta
+from app.models.patient import Patient
+from app.models.queue import Queue, QueueStatus, QueueStatusCount, QueueWaitStat
+from app.schemas.queue import QueueBase, QueueCreate, QueueUpdate, QueueResponse, QueueStatusUpdate
+from app.core.config import settings
+from app.core.pagination import CursorKey, check_page_args
+from app.services import queue_events as events
+from app.services.export import time_range
+from app.services.queue_index import waiting_queue, utc_naive
+from app.services.queue_metrics import queue_gauges
+from app.services.queue_version import queue_version
+from app.services.sequence import get_allocator
+
+
+# Queue order: priority desc, check-in time asc, id asc
+QUEUE_CURSOR = CursorKey("queue", {"priority": int, "check_in_time": datetime, "id": int})
+
+
+def _seconds_between(start: datetime, end: datetime) -> float:
+    return max((utc_naive(end) - utc_naive(start)).total_seconds(), 0.0)
+
+
+def _checkup_type_code(checkup_type: str) -> str:
+    """Short display code for a checkup type, e.g. 'General Checkup' -> 'GC'"""
+    words = [word for word in checkup_type.upper().split() if word[:1].isalnum()]
+    return "".join(word[0] for word in words)[:3] or "Q"
+
+
+def _rollup_key(db_queue: Queue) -> Tuple[Any, ...]:
+    """Values of a queue entry that the statistics rollups depend on"""
+    return (db_queue.status, db_queue.checkup_type, db_queue.check_in_time, db_queue.start_time, db_queue.end_time)
+
+
+def _change_event(db_queue: Queue, previous_status: QueueStatus, previous_priority: int) -> str:
+    """Event type published for an edit of an existing entry"""
+    if db_queue.status != previous_status:
+        return events.STATUS_CHANGED
+    if db_queue.priority != previous_priority:
+        return events.PRIORITY_CHANGED
+    return events.UPDATED
+
+
+def _percentile(histogram: List[Tuple[int, int]], fraction: float) -> int:
+    """Estimate a percentile in minutes from (bucket upper bound, count) pairs,
+    interpolating linearly inside the bucket that contains it"""
+    total = sum(count for _, count in histogram)
+    if not total:
+        return 0
+    
+    target = fraction * total
+    seen = 0
+    lower = 0
+    for upper, count in sorted(histogram):
+        if count and seen + count >= target:
+            if upper == QueueWaitStat.BUCKETS[-1]:
+                return lower
+            return round(lower + (upper - lower) * (target - seen) / count)
+        seen += count
+        lower = upper
+    return lower
+
 
 class QueueService:
     def __init__(self, db: Session):
@@ -15,8 +76,6 @@ class QueueService:
     def add_to_queue(self, queue_data: QueueCreate) -> Queue:
         """Add a patient to the queue"""
         try:
-            print(f"Adding patient to queue: {queue_data}")
-            
             # Check if patient is already in queue
             existing_queue = self.db.query(Queue).filter(
                 Queue.patient_id == queue_data.patient_id,
@@ -26,38 +85,48 @@ class QueueService:
             if existing_queue:
                 raise ValueError("Patient is already in queue")
             
-            # Generate unique queue number
-            queue_number = self._generate_queue_number()
-            
-            print(f"Generated queue number: {queue_number}")
-            
-            # Create queue entry
-            db_queue = Queue(
-                queue_number=queue_number,
-                patient_id=queue_data.patient_id,
-                checkup_type=queue_data.checkup_type,
-                priority=queue_data.priority,
-                status=queue_data.status,
-                notes=queue_data.notes,
-                estimated_wait_time=queue_data.estimated_wait_time
-            )
-            
-            print(f"Created queue object: {db_queue}")
-            
+            db_queue = self.new_entry(queue_data)
+            db_queue.patient_id = queue_data.patient_id
             self.db.add(db_queue)
+            self._update_rollups(None, db_queue)
             self.db.commit()
             self.db.refresh(db_queue)
-            
-            print(f"Queue entry saved successfully: {db_queue}")
+            self.entry_added(db_queue)
             return db_queue
             
         except Exception as e:
             # Always rollback on any error
             self.db.rollback()
             print(f"Error adding patient to queue: {e}")
-            print(f"Queue data: {queue_data}")
             raise ValueError(f"Failed to add patient to queue: {str(e)}")
 
+    def new_entry(self, queue_data: QueueBase) -> Queue:
+        """Unsaved queue entry for queue_data with a newly generated queue number.
+        
+        The caller links it to its patient (patient_id, or patient for a patient
+        saved in the same flush), adds and commits it, then calls entry_added.
+        """
+        return self.new_entries([queue_data])[0]
+
+    def new_entries(self, queue_data_list: List[QueueBase]) -> List[Queue]:
+        """Unsaved queue entries like new_entry, with their queue numbers allocated together"""
+        queue_numbers = self._generate_queue_numbers([queue_data.checkup_type for queue_data in queue_data_list])
+        return [
+            Queue(
+                queue_number=queue_number,
+                checkup_type=queue_data.checkup_type,
+                priority=queue_data.priority,
+                status=queue_data.status,
+                notes=queue_data.notes,
+                estimated_wait_time=queue_data.estimated_wait_time
+            )
+            for queue_data, queue_number in zip(queue_data_list, queue_numbers)
+        ]
+
+    def entry_added(self, db_queue: Queue) -> None:
+        """Announce a committed new queue entry (see _mirror)"""
+        self._mirror(db_queue, events.ADDED)
+
     def get_queue_entry(self, queue_id: int) -> Optional[Queue]:
         """Get a queue entry by ID"""
         return self.db.query(Queue).filter(Queue.id == queue_id).first()
@@ -67,10 +136,35 @@ class QueueService:
         status_filter: Optional[str] = None, 
         priority_filter: Optional[int] = None,
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_patient: bool = False
     ) -> List[Queue]:
-        """Get queue status with optional filtering"""
-        query = self.db.query(Queue)
+        """Get queue status with optional filtering.
+        
+        Pages continue from cursor (see QUEUE_CURSOR); skip is the deprecated
+        offset alternative. With include_patient each entry's patient is
+        loaded along with the page (joined, or one IN query for the waiting
+        index); otherwise entries have patient None and nothing lazy-loads.
+        """
+        check_page_args(cursor, skip)
+        after = QUEUE_CURSOR.decode(cursor) if cursor else None
+        
+        index = self._waiting_index() if status_filter == QueueStatus.WAITING.value else None
+        if index is not None:
+            entries = index.ordered()
+            if priority_filter is not None:
+                entries = [entry for entry in entries if entry.priority == priority_filter]
+            if after:
+                priority, check_in_time, queue_id = after
+                after_key = (-(priority or 0), utc_naive(check_in_time) if check_in_time else datetime.max, queue_id)
+                entries = [entry for entry in entries if entry.sort_key > after_key]
+            entries = entries[skip:skip + limit]
+            return self._with_patients(entries) if include_patient else entries
+        
+        query = self.db.query(Queue).options(
+            joinedload(Queue.patient, innerjoin=True) if include_patient else noload(Queue.patient)
+        )
         
         if status_filter:
             try:
@@ -82,10 +176,60 @@ class QueueService:
         if priority_filter is not None:
             query = query.filter(Queue.priority == priority_filter)
         
-        # Order by priority (higher first) and then by check-in time
-        query = query.order_by(Queue.priority.desc(), Queue.check_in_time.asc())
+        # Order by priority (higher first), then by check-in time, then by ID
+        order = (Queue.priority.desc(), Queue.check_in_time.asc(), Queue.id.asc())
+        
+        if after:
+            return self._queue_page_after(query, order, after, limit)
+        return query.order_by(*order).offset(skip).limit(limit).all()
+
+    def export_query(
+        self, checked_in_from: Optional[datetime] = None, checked_in_to: Optional[datetime] = None
+    ) -> Select:
+        """Rows of the queue entries (any status) checked in within [checked_in_from,
+        checked_in_to), in ID order, for stream_export"""
+        dialect = self.db.get_bind().dialect.name
+        return (
+            select(*Queue.__table__.columns)
+            .where(*time_range(Queue.check_in_time, checked_in_from, checked_in_to, dialect))
+            .order_by(Queue.id)
+        )
+
+    def _with_patients(self, snapshots: List[Any]) -> List[Any]:
+        """Copies of waiting index snapshots with their patients, loaded in one query"""
+        patient_ids = {snapshot.patient_id for snapshot in snapshots}
+        patients = {}
+        if patient_ids:
+            patients = {
+                patient.id: patient
+                for patient in self.db.query(Patient).filter(Patient.id.in_(patient_ids))
+            }
+        return [snapshot.with_patient(patients.get(snapshot.patient_id)) for snapshot in snapshots]
+
+    def _queue_page_after(self, query, order, after: Tuple[Any, ...], limit: int) -> List[Queue]:
+        """Page of query continuing after a decoded QUEUE_CURSOR.
         
-        return query.offset(skip).limit(limit).all()
+        The rest of the cursor's priority level is read as a check-in time range
+        and topped up from the lower levels, so both parts seek straight to their
+        start in the priority/check-in time indexes instead of scanning the rows
+        before the cursor.
+        """
+        priority, check_in_time, queue_id = after
+        # Compare against the cursor row's stored check-in time while it exists:
+        # SQLite compares timestamps as text, and server-side now() values are
+        # stored in a different format from bound datetime parameters
+        check_in_time = func.coalesce(
+            self.db.query(Queue.check_in_time).filter(Queue.id == queue_id).scalar_subquery(),
+            check_in_time
+        )
+        entries = query.filter(
+            Queue.priority == priority,
+            Queue.check_in_time >= check_in_time,
+            or_(Queue.check_in_time > check_in_time, Queue.id > queue_id)
+        ).order_by(*order).limit(limit).all()
+        if len(entries) < limit:
+            entries += query.filter(Queue.priority < priority).order_by(*order).limit(limit - len(entries)).all()
+        return entries
 
     def update_queue_entry(self, queue_id: int, queue_update: QueueUpdate) -> Optional[Queue]:
         """Update a queue entry"""
@@ -95,6 +239,9 @@ class QueueService:
         
         # Update only provided fields
         update_data = queue_update.dict(exclude_unset=True)
+        previous_status = db_queue.status
+        previous_priority = db_queue.priority
+        previous_rollup_key = _rollup_key(db_queue)
         
         # Handle status-specific updates
         if "status" in update_data:
@@ -108,8 +255,11 @@ class QueueService:
         for field, value in update_data.items():
             setattr(db_queue, field, value)
         
+        self._update_rollups(previous_rollup_key, db_queue)
+        
         self.db.commit()
         self.db.refresh(db_queue)
+        self._mirror(db_queue, _change_event(db_queue, previous_status, previous_priority))
         return db_queue
 
     def update_queue_status(self, queue_id: int, status_update: QueueStatusUpdate) -> Optional[Queue]:
@@ -119,6 +269,8 @@ class QueueService:
             return None
         
         # Update status
+        previous_status = db_queue.status
+        previous_rollup_key = _rollup_key(db_queue)
         db_queue.status = status_update.status
         
         # Update notes if provided
@@ -131,8 +283,11 @@ class QueueService:
         elif status_update.status == QueueStatus.COMPLETED and not db_queue.end_time:
             db_queue.end_time = datetime.utcnow()
         
+        self._update_rollups(previous_rollup_key, db_queue)
+        
         self.db.commit()
         self.db.refresh(db_queue)
+        self._mirror(db_queue, _change_event(db_queue, previous_status, db_queue.priority))
         return db_queue
 
     def remove_from_queue(self, queue_id: int) -> bool:
@@ -141,49 +296,120 @@ class QueueService:
         if not db_queue:
             return False
         
-        self.db.delete(db_queue)
+        removed = self.delete_entries([db_queue])
         self.db.commit()
+        self.entries_removed(removed)
         return True
 
+    def delete_entries(self, entries: List[Queue]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Delete queue entries in the caller's transaction.
+        
+        The caller commits, then passes the result to entries_removed.
+        """
+        removed = []
+        for db_queue in entries:
+            removed.append((db_queue.id, self._event_entry(db_queue)))
+            self._update_rollups(_rollup_key(db_queue), None)
+            self.db.delete(db_queue)
+        return removed
+
+    def entries_removed(self, removed: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Announce committed deletions from delete_entries"""
+        queue_version.bump()
+        for queue_id, entry in removed:
+            waiting_queue.discard(queue_id)
+            if settings.metrics_enabled:
+                queue_gauges.discard(queue_id)
+            if settings.queue_events_enabled:
+                events.queue_events.publish(events.REMOVED, queue_id, entry)
+
     def get_queue_statistics(self) -> Dict[str, Any]:
-        """Get queue statistics"""
-        # Count by status
-        total_waiting = self.db.query(Queue).filter(Queue.status == QueueStatus.WAITING).count()
-        total_in_progress = self.db.query(Queue).filter(Queue.status == QueueStatus.IN_PROGRESS).count()
-        total_completed = self.db.query(Queue).filter(Queue.status == QueueStatus.COMPLETED).count()
-        total_cancelled = self.db.query(Queue).filter(Queue.status == QueueStatus.CANCELLED).count()
-        
-        # Calculate average wait time for completed entries
-        completed_entries = self.db.query(Queue).filter(
-            Queue.status == QueueStatus.COMPLETED,
-            Queue.start_time.isnot(None),
-            Queue.check_in_time.isnot(None)
-        ).all()
-        
-        total_wait_time = 0
-        for entry in completed_entries:
-            wait_time = (entry.start_time - entry.check_in_time).total_seconds() / 60
-            total_wait_time += wait_time
-        
-        average_wait_time = round(total_wait_time / len(completed_entries)) if completed_entries else 0
-        
-        # Estimate completion time for waiting entries
+        """Get queue statistics.
+        
+        Waiting and in-progress entries are counted through the status index;
+        completed and cancelled totals come from the queue_status_counts rollup
+        and wait times from the queue_wait_stats rollup, so the cost does not
+        grow with queue history.
+        """
+        counts = {status: 0 for status in QueueStatus}
+        by_type: Dict[str, Dict[str, Any]] = {}
+        
+        def type_stats(checkup_type: str) -> Dict[str, Any]:
+            return by_type.setdefault(checkup_type, {
+                "waiting": 0,
+                "in_progress": 0,
+                "completed": 0,
+                "average_wait_time": 0,
+                "p50_wait_time": 0,
+                "p90_wait_time": 0
+            })
+        
+        rows = self.db.query(
+            Queue.status, Queue.checkup_type, func.count(Queue.id)
+        ).filter(
+            Queue.status.in_([QueueStatus.WAITING, QueueStatus.IN_PROGRESS])
+        ).group_by(Queue.status, Queue.checkup_type).all()
+        
+        for status, checkup_type, count in rows:
+            counts[status] += count
+            type_stats(checkup_type)[status.value] = count
+        
+        for total in self.db.query(QueueStatusCount).filter(QueueStatusCount.count > 0):
+            status = QueueStatus(total.status)
+            counts[status] += total.count
+            if status == QueueStatus.COMPLETED:
+                type_stats(total.checkup_type)["completed"] = total.count
+        
+        # Wait-time histogram per checkup type
+        histograms: Dict[str, List[Tuple[int, int]]] = {}
+        total_count = 0
+        total_wait_seconds = 0.0
+        total_service_seconds = 0.0
+        for stat in self.db.query(QueueWaitStat).filter(QueueWaitStat.count > 0):
+            histograms.setdefault(stat.checkup_type, []).append((stat.bucket, stat.count))
+            stats = type_stats(stat.checkup_type)
+            stats["_count"] = stats.get("_count", 0) + stat.count
+            stats["_wait_seconds"] = stats.get("_wait_seconds", 0.0) + stat.wait_seconds
+            total_count += stat.count
+            total_wait_seconds += stat.wait_seconds
+            total_service_seconds += stat.service_seconds
+        
+        for checkup_type, stats in by_type.items():
+            count = stats.pop("_count", 0)
+            wait_seconds = stats.pop("_wait_seconds", 0.0)
+            if count:
+                stats["average_wait_time"] = round(wait_seconds / count / 60)
+                stats["p50_wait_time"] = _percentile(histograms[checkup_type], 0.5)
+                stats["p90_wait_time"] = _percentile(histograms[checkup_type], 0.9)
+        
+        average_wait_time = round(total_wait_seconds / total_count / 60) if total_count else 0
+        
+        # Estimate when the current waiting list clears: each waiting entry
+        # takes the average service time, spread over the busy stations
         estimated_completion_time = None
-        if total_waiting > 0 and average_wait_time > 0:
-            estimated_minutes = total_waiting * average_wait_time
-            estimated_completion_time = datetime.utcnow().isoformat()
+        total_waiting = counts[QueueStatus.WAITING]
+        if total_waiting > 0 and total_service_seconds > 0:
+            average_service_seconds = total_service_seconds / total_count
+            stations = max(counts[QueueStatus.IN_PROGRESS], 1)
+            estimated_seconds = total_waiting * average_service_seconds / stations
+            estimated_completion_time = (datetime.utcnow() + timedelta(seconds=estimated_seconds)).isoformat()
         
         return {
             "total_waiting": total_waiting,
-            "total_in_progress": total_in_progress,
-            "total_completed": total_completed,
-            "total_cancelled": total_cancelled,
+            "total_in_progress": counts[QueueStatus.IN_PROGRESS],
+            "total_completed": counts[QueueStatus.COMPLETED],
+            "total_cancelled": counts[QueueStatus.CANCELLED],
             "average_wait_time": average_wait_time,
-            "estimated_completion_time": estimated_completion_time
+            "estimated_completion_time": estimated_completion_time,
+            "by_checkup_type": by_type
         }
 
     def get_next_patient(self) -> Optional[Queue]:
         """Get the next patient from the queue (highest priority, earliest check-in)"""
+        index = self._waiting_index()
+        if index is not None:
+            return index.peek()
+        
         return self.db.query(Queue).filter(
             Queue.status == QueueStatus.WAITING
         ).order_by(
@@ -191,33 +417,227 @@ class QueueService:
             Queue.check_in_time.asc()
         ).first()
 
+    def claim_next_patient(self, user_id: int, checkup_type: Optional[str] = None) -> Optional[Queue]:
+        """Atomically move the next waiting entry to IN_PROGRESS and assign it to a user.
+
+        On PostgreSQL the head row is locked with FOR UPDATE SKIP LOCKED, so
+        concurrent stations each take a different row without waiting on one
+        another. Other databases fall back to a compare-and-set UPDATE that only
+        succeeds while the row is still WAITING, retrying on the next candidate.
+        """
+        waiting = self.db.query(Queue).filter(Queue.status == QueueStatus.WAITING)
+        if checkup_type:
+            waiting = waiting.filter(Queue.checkup_type == checkup_type)
+        waiting = waiting.order_by(Queue.priority.desc(), Queue.check_in_time.asc(), Queue.id.asc())
+
+        if self.db.get_bind().dialect.name == "postgresql":
+            db_queue = waiting.with_for_update(skip_locked=True).first()
+            if not db_queue:
+                self.db.rollback()
+                return None
+            db_queue.status = QueueStatus.IN_PROGRESS
+            db_queue.start_time = datetime.utcnow()
+            db_queue.assigned_to = user_id
+            self.db.commit()
+            self.db.refresh(db_queue)
+            self._mirror(db_queue, events.STATUS_CHANGED)
+            return db_queue
+
+        for _ in range(settings.queue_claim_max_attempts):
+            candidate_ids = [row.id for row in waiting.with_entities(Queue.id).limit(settings.queue_claim_batch_size)]
+            if not candidate_ids:
+                self.db.rollback()
+                return None
+
+            for queue_id in candidate_ids:
+                claimed = self.db.query(Queue).filter(
+                    Queue.id == queue_id,
+                    Queue.status == QueueStatus.WAITING
+                ).update({
+                    Queue.status: QueueStatus.IN_PROGRESS,
+                    Queue.start_time: datetime.utcnow(),
+                    Queue.assigned_to: user_id
+                }, synchronize_session=False)
+                if claimed:
+                    self.db.commit()
+                    db_queue = self.get_queue_entry(queue_id)
+                    self._mirror(db_queue, events.STATUS_CHANGED)
+                    return db_queue
+            # Every candidate was taken by another station; read a fresh batch
+            self.db.rollback()
+
+        raise ValueError("Could not claim a patient, please retry")
+
+    def get_queue_position(self, queue_id: int) -> Optional[Dict[str, Any]]:
+        """Get the position of a waiting entry in the queue (1 = next to be served)"""
+        index = self._waiting_index()
+        if index is not None:
+            position = index.position(queue_id)
+            total_waiting = len(index)
+        else:
+            db_queue = self.get_queue_entry(queue_id)
+            if not db_queue or db_queue.status != QueueStatus.WAITING:
+                return None
+            # Compare against the stored row so timestamps are compared in SQL
+            target = aliased(Queue)
+            waiting = self.db.query(Queue).filter(Queue.status == QueueStatus.WAITING)
+            ahead = waiting.join(target, target.id == queue_id).filter(
+                (Queue.priority > target.priority) |
+                ((Queue.priority == target.priority) & (Queue.check_in_time < target.check_in_time)) |
+                ((Queue.priority == target.priority) & (Queue.check_in_time == target.check_in_time) & (Queue.id < target.id))
+            ).count()
+            position = ahead + 1
+            total_waiting = waiting.count()
+        
+        if position is None:
+            return None
+        
+        return {
+            "queue_id": queue_id,
+            "position": position,
+            "patients_ahead": position - 1,
+            "total_waiting": total_waiting
+        }
+
+    def rebuild_waiting_index(self) -> None:
+        """Load the in-memory waiting queue from the database"""
+        if settings.queue_index_enabled:
+            waiting_queue.rebuild(self.db)
+
+    def _waiting_index(self):
+        """Return the waiting-queue index, rebuilding it when stale, or None if disabled"""
+        if not settings.queue_index_enabled:
+            return None
+        if waiting_queue.is_stale():
+            if self.db.info.get("replica"):
+                return None  # Only rebuild from the primary; read the replica meanwhile
+            if not waiting_queue.rebuild(self.db) and not waiting_queue.loaded:
+                return None  # First load still running in another request
+        return waiting_queue
+
+    def rebuild_queue_gauges(self) -> None:
+        """Load the queue gauges reported at /metrics from the database"""
+        if settings.metrics_enabled:
+            queue_gauges.rebuild(self.db)
+
+    def _mirror(self, db_queue: Queue, event_type: Optional[str] = None) -> None:
+        """Reflect a committed change in the queue version, the in-memory waiting
+        queue and queue gauges, and publish it to queue event subscribers"""
+        queue_version.bump()
+        if settings.queue_index_enabled:
+            waiting_queue.update(db_queue)
+        if settings.metrics_enabled:
+            queue_gauges.update(db_queue)
+        if settings.queue_events_enabled and event_type:
+            events.queue_events.publish(event_type, db_queue.id, self._event_entry(db_queue))
+
+    def _event_entry(self, db_queue: Queue) -> Optional[Dict[str, Any]]:
+        """Queue entry as sent in events (same shape as QueueResponse)"""
+        if not settings.queue_events_enabled:
+            return None
+        return QueueResponse.model_validate(db_queue).model_dump(mode="json")
+
     def move_to_next_status(self, queue_id: int) -> Optional[Queue]:
         """Move a queue entry to the next logical status"""
         db_queue = self.get_queue_entry(queue_id)
         if not db_queue:
             return None
         
+        previous_status = db_queue.status
+        previous_rollup_key = _rollup_key(db_queue)
         if db_queue.status == QueueStatus.WAITING:
             db_queue.status = QueueStatus.IN_PROGRESS
             db_queue.start_time = datetime.utcnow()
         elif db_queue.status == QueueStatus.IN_PROGRESS:
             db_queue.status = QueueStatus.COMPLETED
             db_queue.end_time = datetime.utcnow()
+            self._update_rollups(previous_rollup_key, db_queue)
         
         self.db.commit()
         self.db.refresh(db_queue)
+        self._mirror(db_queue, events.STATUS_CHANGED if db_queue.status != previous_status else None)
         return db_queue
 
-    def _generate_queue_number(self) -> str:
-        """Generate a unique queue number"""
-        import random
-        import string
+    def _update_rollups(self, previous: Optional[Tuple[Any, ...]], db_queue: Optional[Queue]) -> None:
+        """Move an entry's contribution to the statistics rollups from previous
+        (its _rollup_key before the change, None for a new entry) to its current
+        state (db_queue None for a deleted entry), in the same transaction"""
+        current = _rollup_key(db_queue) if db_queue is not None else None
+        if current == previous:
+            return
+        if previous is not None:
+            self._add_to_rollups(previous, -1)
+        if current is not None:
+            self._add_to_rollups(current, 1)
+
+    def _add_to_rollups(self, rollup_key: Tuple[Any, ...], sign: int) -> None:
+        """Count (sign 1) or uncount (sign -1) an entry in the rollups"""
+        status, checkup_type, check_in_time, start_time, end_time = rollup_key
+        if status in QueueStatusCount.STATUSES:
+            self._add_to_rollup(
+                QueueStatusCount, {"checkup_type": checkup_type, "status": status.value}, {"count": sign}
+            )
+        if status != QueueStatus.COMPLETED or not start_time or not check_in_time:
+            return
         
-        while True:
-            # Generate a 4-character alphanumeric ID
-            queue_number = ''.join(random.choices(string.ascii_uppercase + string.digits, k=4))
-            
-            # Check if it already exists
-            existing = self.db.query(Queue).filter(Queue.queue_number == queue_number).first()
-            if not existing:
-                return queue_number
+        wait_seconds = _seconds_between(check_in_time, start_time)
+        service_seconds = _seconds_between(start_time, end_time) if end_time else 0.0
+        self._add_to_rollup(
+            QueueWaitStat,
+            {"checkup_type": checkup_type, "bucket": QueueWaitStat.bucket_for(wait_seconds / 60)},
+            {"count": sign, "wait_seconds": sign * wait_seconds, "service_seconds": sign * service_seconds}
+        )
+
+    def _add_to_rollup(self, model, key: Dict[str, Any], amounts: Dict[str, Any]) -> None:
+        """Add amounts to the rollup row of model at key, creating the row if missing"""
+        increments = {name: getattr(model, name) + amount for name, amount in amounts.items()}
+        
+        dialect = self.db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = insert(model).values(**key, **amounts).on_conflict_do_update(
+                index_elements=list(key),
+                set_=increments
+            )
+            self.db.execute(statement)
+            return
+        
+        updated = self.db.query(model).filter_by(**key).update(increments, synchronize_session=False)
+        if not updated:
+            self.db.add(model(**key, **amounts))
+
+    def _generate_queue_numbers(self, checkup_types: List[str]) -> List[str]:
+        """Generate unique queue numbers for entries of checkup_types from
+        block-allocated sequences, taking each sequence's values at once.
+        
+        Plain numbers look like Q0042. With QUEUE_NUMBER_TYPE_PREFIX and/or
+        QUEUE_NUMBER_DAILY they look like GC-250905-042, where each prefix gets
+        its own sequence, so daily numbers restart at 1.
+        """
+        day = datetime.now().strftime("%y%m%d")
+        prefixes = []
+        for checkup_type in checkup_types:
+            parts = []
+            if settings.queue_number_type_prefix:
+                parts.append(_checkup_type_code(checkup_type))
+            if settings.queue_number_daily:
+                parts.append(day)
+            prefixes.append(tuple(parts))
+        
+        numbers = {}
+        for parts in dict.fromkeys(prefixes):
+            allocator = get_allocator(
+                self.db.get_bind(),
+                ":".join(("queue_number",) + parts),
+                settings.queue_number_block_size
+            )
+            numbers[parts] = iter(allocator.take(prefixes.count(parts)))
+        
+        queue_numbers = []
+        for parts in prefixes:
+            number = next(numbers[parts])
+            if not parts:
+                queue_numbers.append(f"Q{number:04d}")
+            else:
+                queue_numbers.append("-".join(parts + (f"{number:03d}",)))
+        return queue_numbers
@@ -0,0 +1,183 @@
+"""
+Queue change events pushed to connected clients
+"""
+
+import asyncio
+import json
+import threading
+from collections import deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+
+# Event types published by QueueService
+ADDED = "added"
+STATUS_CHANGED = "status_changed"
+PRIORITY_CHANGED = "priority_changed"
+UPDATED = "updated"
+REMOVED = "removed"
+
+# Sent instead of a replay when the missed events are no longer kept; the
+# client should reload the queue and continue from this event's id
+RESET = "reset"
+
+KEEPALIVE = b": keep-alive\n\n"
+
+
+def _frame(sequence: int, event_type: str, data: Dict[str, Any]) -> bytes:
+    """Server-sent event frame; encoded once and shared by every subscriber"""
+    return f"id: {sequence}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n".encode()
+
+
+def _set_all(wakeups: List[asyncio.Event]) -> None:
+    for wakeup in wakeups:
+        wakeup.set()
+
+
+class QueueEventSubscriber:
+    """One connected client: a bounded buffer of frames not yet sent.
+
+    Frames are appended by whichever thread publishes the change and read by
+    the client's stream on the event loop. A client that falls more than
+    max_pending frames behind is evicted instead of slowing the publisher
+    down or growing its buffer; it reconnects with Last-Event-ID and resumes
+    from the broadcaster's history.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_pending: int):
+        self.max_pending = max_pending
+        self.evicted = False
+        self._loop = loop
+        self._pending: Deque[bytes] = deque()
+        self._limit = max_pending
+        self._wakeup = asyncio.Event()
+
+    def replay(self, frames: List[bytes]) -> None:
+        """Queue missed frames on subscribe; they do not count against max_pending"""
+        self._pending.extend(frames)
+        self._limit = self.max_pending + len(frames)
+
+    def push(self, frame: bytes) -> None:
+        """Queue a frame; called with the broadcaster lock held.
+
+        The caller wakes the stream afterwards (see _wake), so publishing to
+        many subscribers costs one event loop callback instead of one each.
+        """
+        if self.evicted:
+            return
+        if len(self._pending) >= self._limit:
+            self.evicted = True
+            self._pending.clear()
+        else:
+            self._pending.append(frame)
+
+    def evict(self) -> None:
+        self.evicted = True
+        self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def frames(self, timeout: float) -> List[bytes]:
+        """Wait up to timeout for frames and take all pending ones"""
+        if not self._pending and not self.evicted:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        frames = []
+        while self._pending:
+            frames.append(self._pending.popleft())
+        self._limit = self.max_pending
+        return frames
+
+
+class QueueEventBroadcaster:
+    """Fans queue changes out to every connected client.
+
+    A change is encoded once and its frame appended to each subscriber's
+    buffer, so it costs O(subscribers) memory writes and no queries. The
+    last history_size frames are kept so a reconnecting client replays what
+    it missed. Sequence numbers are per process: like the in-memory indexes,
+    a worker only sees changes made through it.
+    """
+
+    def __init__(self, history_size: int = 1000, max_pending: int = 256):
+        self.max_pending = max_pending
+        self._sequence = 0
+        self._history: Deque[Tuple[int, bytes]] = deque(maxlen=history_size)
+        self._subscribers: Set[QueueEventSubscriber] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def sequence(self) -> int:
+        """Id of the last published event"""
+        return self._sequence
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event_type: str, queue_id: int, entry: Optional[Dict[str, Any]] = None) -> int:
+        """Send an event to every subscriber and return its sequence number"""
+        with self._lock:
+            self._sequence += 1
+            frame = _frame(self._sequence, event_type, {"queue_id": queue_id, "entry": entry})
+            self._history.append((self._sequence, frame))
+            for subscriber in self._subscribers:
+                subscriber.push(frame)
+            self._wake(self._subscribers)
+            return self._sequence
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> QueueEventSubscriber:
+        """Register a client on the running event loop, replaying events after last_event_id"""
+        subscriber = QueueEventSubscriber(asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            if last_event_id is not None and last_event_id != self._sequence:
+                oldest = self._history[0][0] if self._history else self._sequence + 1
+                if last_event_id > self._sequence or last_event_id + 1 < oldest:
+                    # Unknown id (restarted or another worker) or replay no longer kept
+                    subscriber.replay([_frame(self._sequence, RESET, {"queue_id": None, "entry": None})])
+                else:
+                    subscriber.replay([frame for sequence, frame in self._history if sequence > last_event_id])
+                self._wake([subscriber])
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    @staticmethod
+    def _wake(subscribers) -> None:
+        """Wake the streams of subscribers, with one callback per event loop"""
+        by_loop: Dict[asyncio.AbstractEventLoop, List[asyncio.Event]] = {}
+        for subscriber in subscribers:
+            by_loop.setdefault(subscriber._loop, []).append(subscriber._wakeup)
+        for loop, wakeups in by_loop.items():
+            loop.call_soon_threadsafe(_set_all, wakeups)
+
+    def unsubscribe(self, subscriber: QueueEventSubscriber) -> None:
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def close(self) -> None:
+        """End every open stream (on shutdown)"""
+        with self._lock:
+            for subscriber in self._subscribers:
+                subscriber.evict()
+            self._subscribers.clear()
+
+    async def stream(self, last_event_id: int, keepalive_seconds: float) -> AsyncIterator[bytes]:
+        """Frames after last_event_id for one client until it disconnects or is evicted.
+
+        The client subscribes when the response starts streaming, so a client
+        that goes away before that never holds a subscription.
+        """
+        subscriber = self.subscribe(last_event_id)
+        try:
+            while True:
+                frames = await subscriber.frames(keepalive_seconds)
+                if subscriber.evicted:
+                    break
+                yield b"".join(frames) if frames else KEEPALIVE
+        finally:
+            self.unsubscribe(subscriber)
+
+
+queue_events = QueueEventBroadcaster(
+    history_size=settings.queue_events_history,
+    max_pending=settings.queue_events_max_pending
+)
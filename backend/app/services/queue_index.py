@@ -0,0 +1,200 @@
+"""
+In-process index of waiting queue entries
+"""
+
+import heapq
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.queue import Queue, QueueStatus
+
+
+def utc_naive(value: datetime) -> datetime:
+    """Normalize DB timestamps (aware on PostgreSQL, naive on SQLite) to naive UTC"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class QueueSnapshot:
+    """Detached copy of a queue row, safe to share between requests"""
+
+    COLUMNS = tuple(column.key for column in Queue.__table__.columns)
+    __slots__ = COLUMNS + ("patient",)
+
+    def __init__(self, **values):
+        for key in self.__slots__:
+            setattr(self, key, values.get(key))
+
+    @classmethod
+    def from_model(cls, queue: Queue) -> "QueueSnapshot":
+        return cls(**{key: getattr(queue, key) for key in cls.COLUMNS})
+
+    def with_patient(self, patient) -> "QueueSnapshot":
+        """Copy of this snapshot with patient attached (snapshots themselves are shared)"""
+        return QueueSnapshot(patient=patient, **{key: getattr(self, key) for key in self.COLUMNS})
+
+    @property
+    def sort_key(self) -> Tuple[int, datetime, int]:
+        """Queue order: priority desc, check-in time asc, id asc"""
+        check_in_time = utc_naive(self.check_in_time) if self.check_in_time else datetime.max
+        return (-(self.priority or 0), check_in_time, self.id)
+
+
+class WaitingQueueIndex:
+    """Binary heap of WAITING entries ordered by (priority desc, check-in asc).
+
+    Push and pop are O(log n). Removed or re-prioritized entries are dropped
+    lazily when they reach the top of the heap. The ordered view used for
+    listings is cached until the next change, since boards poll far more
+    often than the queue changes.
+
+    The index only sees changes made through this worker, so it is rebuilt
+    from the database every refresh_seconds (0 disables periodic rebuilds).
+    """
+
+    def __init__(self, refresh_seconds: float = 30):
+        self.refresh_seconds = refresh_seconds
+        self._entries: Dict[int, QueueSnapshot] = {}
+        self._heap: List[Tuple[int, datetime, int]] = []
+        self._ordered: Optional[List[QueueSnapshot]] = None
+        self._positions: Dict[int, int] = {}
+        self._rebuild_log: Optional[List[tuple]] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def is_stale(self) -> bool:
+        """True when the index has never been loaded or is due for a rebuild"""
+        if self._loaded_at is None:
+            return True
+        return self.refresh_seconds > 0 and time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    @property
+    def loaded(self) -> bool:
+        """True once the index has been loaded from the database"""
+        return self._loaded_at is not None
+
+    def rebuild(self, db: Session) -> bool:
+        """Reload every WAITING entry from the database.
+
+        The query runs without holding the lock (under the async engine it
+        yields to other requests on this thread); changes mirrored while it
+        runs are replayed on top of the reloaded entries. Returns False
+        without reloading when another rebuild is already running.
+        """
+        with self._lock:
+            if self._rebuild_log is not None:
+                return False
+            self._rebuild_log = []
+        try:
+            rows = db.query(Queue).filter(Queue.status == QueueStatus.WAITING).all()
+            snapshots = [QueueSnapshot.from_model(row) for row in rows]
+        except Exception:
+            with self._lock:
+                self._rebuild_log = None
+            raise
+
+        with self._lock:
+            log, self._rebuild_log = self._rebuild_log, None
+            self._entries = {snapshot.id: snapshot for snapshot in snapshots}
+            self._heap = [snapshot.sort_key for snapshot in snapshots]
+            heapq.heapify(self._heap)
+            for operation, value in log:
+                if operation == "update":
+                    self._update(value)
+                else:
+                    self._discard(value)
+            self._invalidate_order()
+            self._loaded_at = time.monotonic()
+        return True
+
+    def update(self, queue: Queue) -> None:
+        """Mirror a committed queue row: index it if WAITING, drop it otherwise"""
+        if queue.status != QueueStatus.WAITING:
+            self.discard(queue.id)
+            return
+
+        snapshot = QueueSnapshot.from_model(queue)
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("update", snapshot))
+            self._update(snapshot)
+
+    def discard(self, queue_id: int) -> None:
+        """Drop an entry; its heap slot is removed lazily"""
+        with self._lock:
+            if self._rebuild_log is not None:
+                self._rebuild_log.append(("discard", queue_id))
+            self._discard(queue_id)
+
+    def peek(self) -> Optional[QueueSnapshot]:
+        """Return the next entry to be served without removing it"""
+        with self._lock:
+            self._drop_stale_top()
+            if not self._heap:
+                return None
+            return self._entries[self._heap[0][2]]
+
+    def pop(self) -> Optional[QueueSnapshot]:
+        """Remove and return the next entry to be served"""
+        with self._lock:
+            self._drop_stale_top()
+            if not self._heap:
+                return None
+            _, _, queue_id = heapq.heappop(self._heap)
+            self._invalidate_order()
+            return self._entries.pop(queue_id)
+
+    def ordered(self) -> List[QueueSnapshot]:
+        """All waiting entries in queue order"""
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(self._entries.values(), key=lambda snapshot: snapshot.sort_key)
+                self._positions = {snapshot.id: index for index, snapshot in enumerate(self._ordered, start=1)}
+            return self._ordered
+
+    def position(self, queue_id: int) -> Optional[int]:
+        """1-based position of a waiting entry, or None if it is not waiting"""
+        with self._lock:
+            self.ordered()
+            return self._positions.get(queue_id)
+
+    def _update(self, snapshot: QueueSnapshot) -> None:
+        previous = self._entries.get(snapshot.id)
+        self._entries[snapshot.id] = snapshot
+        if previous is None or previous.sort_key != snapshot.sort_key:
+            heapq.heappush(self._heap, snapshot.sort_key)
+        self._invalidate_order()
+        self._compact()
+
+    def _discard(self, queue_id: int) -> None:
+        if self._entries.pop(queue_id, None) is not None:
+            self._invalidate_order()
+            self._compact()
+
+    def _is_current(self, key: Tuple[int, datetime, int]) -> bool:
+        snapshot = self._entries.get(key[2])
+        return snapshot is not None and snapshot.sort_key == key
+
+    def _drop_stale_top(self) -> None:
+        while self._heap and not self._is_current(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def _compact(self) -> None:
+        # Keep lazily deleted slots from growing the heap without bound
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [key for key in self._heap if self._is_current(key)]
+            heapq.heapify(self._heap)
+
+    def _invalidate_order(self) -> None:
+        self._ordered = None
+        self._positions = {}
+
+
+waiting_queue = WaitingQueueIndex(refresh_seconds=settings.queue_index_refresh_seconds)
@@ -0,0 +1,137 @@
+"""
+Queue gauges for the metrics endpoint
+"""
+
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.metrics import Counter as CounterMetric, Gauge, registry
+from app.models.queue import Queue, QueueStatus
+from app.services.queue_index import utc_naive
+
+# Statuses the gauges count; entries leave the gauges on any other status
+ACTIVE_STATUSES = (QueueStatus.WAITING, QueueStatus.IN_PROGRESS)
+
+queue_entries = registry.register(Gauge(
+    "mhcqms_queue_entries", "Queue entries by checkup type and status (waiting, in_progress)",
+    ["checkup_type", "status"]
+))
+queue_oldest_waiting = registry.register(Gauge(
+    "mhcqms_queue_oldest_waiting_seconds", "Age of the oldest waiting entry by checkup type",
+    ["checkup_type"]
+))
+queue_transitions = registry.register(CounterMetric(
+    "mhcqms_queue_transitions", "Queue entries reaching a status through this worker",
+    ["checkup_type", "status"]
+))
+
+# (status, checkup type, check-in time) of an active entry
+Entry = Tuple[QueueStatus, str, Optional[datetime]]
+
+
+class QueueGauges:
+    """Waiting and in-progress entries per checkup type, kept in memory.
+
+    QueueService reports every committed change, so a scrape only counts
+    entries already held here. Like the waiting-queue index it only sees this
+    worker's changes and is reloaded from the database every refresh_seconds;
+    changes reported while a reload runs are replayed on top of it.
+    """
+
+    def __init__(self, refresh_seconds: float = 30):
+        self.refresh_seconds = refresh_seconds
+        self._entries: Dict[int, Entry] = {}
+        self._checkup_types: Set[str] = set()
+        self._rebuild_log: Optional[List[tuple]] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def is_stale(self) -> bool:
+        """True when the gauges have never been loaded or are due for a reload"""
+        if self._loaded_at is None:
+            return True
+        return self.refresh_seconds > 0 and time.monotonic() - self._loaded_at >= self.refresh_seconds
+
+    def rebuild(self, db: Session) -> None:
+        """Reload every waiting and in-progress entry from the database,
+        unless another reload is already running"""
+        with self._lock:
+            if self._rebuild_log is not None:
+                return
+            self._rebuild_log = []
+        try:
+            rows = db.query(Queue.id, Queue.status, Queue.checkup_type, Queue.check_in_time).filter(
+                Queue.status.in_(ACTIVE_STATUSES)
+            ).all()
+        except Exception:
+            with self._lock:
+                self._rebuild_log = None
+            raise
+
+        with self._lock:
+            log, self._rebuild_log = self._rebuild_log, None
+            self._entries = {row.id: (row.status, row.checkup_type, row.check_in_time) for row in rows}
+            self._checkup_types.update(entry[1] for entry in self._entries.values())
+            for queue_id, entry in log:
+                self._apply(queue_id, entry)
+            self._loaded_at = time.monotonic()
+
+    def update(self, queue: Queue) -> None:
+        """Mirror a committed queue row and count its status transition"""
+        entry = None
+        if queue.status in ACTIVE_STATUSES:
+            entry = (queue.status, queue.checkup_type, queue.check_in_time)
+        with self._lock:
+            previous = self._entries.get(queue.id)
+            # Untracked entries only count when they (re)enter the queue, so
+            # edits to finished entries are not counted as completions
+            if (previous[0] if previous else None) != queue.status and (previous or entry):
+                queue_transitions.inc(checkup_type=queue.checkup_type, status=queue.status.value)
+            self._record(queue.id, entry)
+
+    def discard(self, queue_id: int) -> None:
+        """Drop a deleted entry"""
+        with self._lock:
+            self._record(queue_id, None)
+
+    def collect(self) -> None:
+        """Set the queue gauges from the entries held in memory"""
+        now = datetime.utcnow()
+        with self._lock:
+            entries = list(self._entries.values())
+            checkup_types = set(self._checkup_types)
+        counts: Counter = Counter()
+        oldest: Dict[str, datetime] = {}
+        for status, checkup_type, check_in_time in entries:
+            counts[(checkup_type, status.value)] += 1
+            if status == QueueStatus.WAITING and check_in_time is not None:
+                check_in_time = utc_naive(check_in_time)
+                if checkup_type not in oldest or check_in_time < oldest[checkup_type]:
+                    oldest[checkup_type] = check_in_time
+
+        # Types seen before but emptied out report zero rather than disappearing
+        for checkup_type in checkup_types:
+            for status in ACTIVE_STATUSES:
+                queue_entries.set(counts[(checkup_type, status.value)], checkup_type=checkup_type, status=status.value)
+            age = (now - oldest[checkup_type]).total_seconds() if checkup_type in oldest else 0.0
+            queue_oldest_waiting.set(max(age, 0.0), checkup_type=checkup_type)
+
+    def _record(self, queue_id: int, entry: Optional[Entry]) -> None:
+        if self._rebuild_log is not None:
+            self._rebuild_log.append((queue_id, entry))
+        self._apply(queue_id, entry)
+
+    def _apply(self, queue_id: int, entry: Optional[Entry]) -> None:
+        if entry is None:
+            self._entries.pop(queue_id, None)
+        else:
+            self._entries[queue_id] = entry
+            self._checkup_types.add(entry[1])
+
+
+queue_gauges = QueueGauges(refresh_seconds=settings.metrics_queue_refresh_seconds)
+registry.add_collector(queue_gauges.collect)
@@ -0,0 +1,55 @@
+"""
+Queue version for conditional GETs of queue listings and statistics
+"""
+
+import hashlib
+import threading
+import time
+import uuid
+from typing import Iterable, Tuple
+from app.core.config import settings
+
+
+class QueueVersion:
+    """Counter bumped by every queue change made through QueueService.
+
+    Queue reads are tagged with the version they were served at; while it
+    has not moved, a client's cached copy is still current and the request
+    is answered with 304 Not Modified without touching the database.
+
+    The counter only sees this worker's changes, so it also moves on its own
+    every refresh_seconds (0 = never), which bounds how long a change made by
+    another worker (or time-dependent figures such as the estimated
+    completion time) can go unnoticed. Tags include a per-process token, so
+    a tag issued by another worker or before a restart never matches.
+    """
+
+    def __init__(self, refresh_seconds: float = 10):
+        self.refresh_seconds = refresh_seconds
+        self._token = uuid.uuid4().hex[:8]
+        self._version = 0
+        self._bumped_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def bump(self) -> None:
+        """Record a queue change"""
+        with self._lock:
+            self._version += 1
+            self._bumped_at = time.monotonic()
+
+    def current(self) -> int:
+        """Current version, moved on first if refresh_seconds have passed"""
+        with self._lock:
+            if self.refresh_seconds > 0 and time.monotonic() - self._bumped_at >= self.refresh_seconds:
+                self._version += 1
+                self._bumped_at = time.monotonic()
+            return self._version
+
+    def etag(self, path: str, params: Iterable[Tuple[str, str]]) -> str:
+        """Strong ETag of a read of path with the given query parameters at the current version"""
+        query = "&".join(f"{key}={value}" for key, value in sorted(params))
+        digest = hashlib.sha1(f"{path}?{query}".encode()).hexdigest()[:12]
+        return f'"{self._token}-{self.current()}-{digest}"'
+
+
+queue_version = QueueVersion(refresh_seconds=settings.queue_version_refresh_seconds)
@@ -0,0 +1,111 @@
+"""
+Block (hi/lo) allocation of sequential identifiers
+"""
+
+import threading
+import weakref
+from collections import deque
+from typing import Deque, Dict, List
+from sqlalchemy import insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.dialects import postgresql, sqlite
+from app.models.sequence import IdSequence
+
+
+class BlockAllocator:
+    """Hands out values of a named sequence from blocks reserved in the database.
+
+    Each reservation atomically advances id_sequences.next_value by block_size
+    in its own short transaction, so any number of worker processes can share
+    a sequence without ever issuing the same value. Values are served from
+    memory until the block runs out, so most allocations need no query at
+    all. Values left in a block when the process exits are never reused,
+    which leaves gaps but never duplicates.
+    """
+
+    def __init__(self, engine: Engine, name: str, block_size: int = 100):
+        self.engine = engine
+        self.name = name
+        self.block_size = max(block_size, 1)
+        self._blocks: Deque[List[int]] = deque()  # reserved [next, limit) ranges
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        """Return the next value of the sequence"""
+        return self.take(1)[0]
+
+    def take(self, count: int) -> List[int]:
+        """Return count values, reserving a larger block if the reserved ones are short.
+
+        The lock is never held during a reservation: under the async engine
+        the query yields to the event loop, and another request on the same
+        thread must not block on the lock meanwhile.
+        """
+        values: List[int] = []
+        while True:
+            with self._lock:
+                while self._blocks and len(values) < count:
+                    block = self._blocks[0]
+                    end = min(block[0] + count - len(values), block[1])
+                    values.extend(range(block[0], end))
+                    block[0] = end
+                    if end >= block[1]:
+                        self._blocks.popleft()
+                if len(values) >= count:
+                    return values
+                missing = count - len(values)
+            start, limit = self._reserve(max(missing, self.block_size))
+            with self._lock:
+                self._blocks.append([start, limit])
+
+    def _reserve(self, size: int):
+        """Advance the stored counter by size; return the reserved [start, limit)"""
+        with self.engine.begin() as conn:
+            limit = self._advance(conn, size)
+            if limit is None:
+                self._create(conn)
+                limit = self._advance(conn, size)
+        return limit - size, limit
+
+    def _advance(self, conn, size: int):
+        table = IdSequence.__table__
+        statement = update(table).where(table.c.name == self.name).values(
+            next_value=table.c.next_value + size
+        )
+        if getattr(self.engine.dialect, "update_returning", False):
+            return conn.execute(statement.returning(table.c.next_value)).scalar_one_or_none()
+        # The UPDATE holds the row lock until commit, so the read is consistent
+        if not conn.execute(statement).rowcount:
+            return None
+        return conn.execute(select(table.c.next_value).where(table.c.name == self.name)).scalar_one()
+
+    def _create(self, conn) -> None:
+        table = IdSequence.__table__
+        dialect = self.engine.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            conn.execute(
+                dialect_insert(table).values(name=self.name, next_value=1)
+                .on_conflict_do_nothing(index_elements=["name"])
+            )
+            return
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(table).values(name=self.name, next_value=1))
+        except IntegrityError:
+            pass  # Another worker created the row first
+
+
+_allocators: "weakref.WeakKeyDictionary[Engine, Dict[str, BlockAllocator]]" = weakref.WeakKeyDictionary()
+_allocators_lock = threading.Lock()
+
+
+def get_allocator(engine: Engine, name: str, block_size: int = 100) -> BlockAllocator:
+    """Return the process-wide allocator for a sequence on the given engine"""
+    with _allocators_lock:
+        allocators = _allocators.setdefault(engine, {})
+        allocator = allocators.get(name)
+        if allocator is None:
+            allocator = allocators[name] = BlockAllocator(engine, name, block_size)
+        return allocator
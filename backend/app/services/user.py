@@ -2,19 +2,29 @@
 User service for user management operations
 """
 
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
+from app.core.pagination import CursorKey, check_page_args
+from app.models.queue import Queue
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
-from app.services.auth import AuthService
+from app.services.auth import AuthService, user_cache, token_versions
+from app.services.queue_version import queue_version
+
+# User listings are ordered by ID
+USER_CURSOR = CursorKey("users", {"id": int})
 
 class UserService:
+    # Fields embedded in access tokens; changing them bumps token_version
+    TOKEN_CLAIM_FIELDS = ("username", "is_active", "is_superuser")
+
     def __init__(self, db: Session):
         self.db = db
         self.auth_service = AuthService(db)
 
-    def create_user(self, user_data: UserCreate) -> User:
-        """Create a new user"""
+    def create_user(self, user_data: UserCreate, hashed_password: Optional[str] = None) -> User:
+        """Create a new user, optionally with a password hash computed by the caller"""
         # Check if username already exists
         existing_user = self.db.query(User).filter(User.username == user_data.username).first()
         if existing_user:
@@ -26,7 +36,8 @@ class UserService:
             raise ValueError("Email already registered")
         
         # Hash the password
-        hashed_password = self.auth_service.get_password_hash(user_data.password)
+        if hashed_password is None:
+            hashed_password = self.auth_service.get_password_hash(user_data.password)
         
         # Create user object
         db_user = User(
@@ -55,9 +66,14 @@ class UserService:
         """Get a user by email"""
         return self.db.query(User).filter(User.email == email).first()
 
-    def get_users(self, skip: int = 0, limit: int = 100) -> List[User]:
-        """Get a list of users with pagination"""
-        return self.db.query(User).offset(skip).limit(limit).all()
+    def get_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+        """Get a list of users in ID order, after cursor (or the deprecated skip)"""
+        check_page_args(cursor, skip)
+        query = self.db.query(User)
+        if cursor:
+            (after_id,) = USER_CURSOR.decode(cursor)
+            query = query.filter(User.id > after_id)
+        return query.order_by(User.id).offset(skip).limit(limit).all()
 
     def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
         """Update a user"""
@@ -85,12 +101,23 @@ class UserService:
             if existing_email:
                 raise ValueError("Email already taken")
         
+        # Changing identity or privileges revokes previously issued tokens
+        revoke_tokens = any(
+            field in update_data and update_data[field] != getattr(db_user, field)
+            for field in self.TOKEN_CLAIM_FIELDS
+        )
+        
         # Update the user
+        previous_username = db_user.username
         for field, value in update_data.items():
             setattr(db_user, field, value)
+        if revoke_tokens:
+            db_user.token_version = (db_user.token_version or 0) + 1
         
         self.db.commit()
         self.db.refresh(db_user)
+        user_cache.invalidate(previous_username)
+        token_versions.set(db_user.id, db_user.token_version)
         return db_user
 
     def delete_user(self, user_id: int) -> bool:
@@ -99,8 +126,24 @@ class UserService:
         if not db_user:
             return False
         
-        self.db.delete(db_user)
-        self.db.commit()
+        username = db_user.username
+        try:
+            # Unassign their queue entries here rather than rely on ON DELETE
+            # SET NULL, which SQLite only applies with foreign keys enforced
+            unassigned = self.db.query(Queue).filter(Queue.assigned_to == user_id).update(
+                {Queue.assigned_to: None}, synchronize_session=False
+            )
+            self.db.delete(db_user)
+            self.db.commit()
+        except IntegrityError as e:
+            self.db.rollback()
+            print(f"Error deleting user: {e}")
+            raise ValueError("User is still referenced by other records and cannot be deleted")
+        user_cache.invalidate(username)
+        token_versions.discard(user_id)
+        if unassigned:
+            # Queue listings show assigned_to
+            queue_version.bump()
         return True
 
     def activate_user(self, user_id: int) -> Optional[User]:
@@ -110,8 +153,11 @@ class UserService:
             return None
         
         db_user.is_active = True
+        db_user.token_version = (db_user.token_version or 0) + 1
         self.db.commit()
         self.db.refresh(db_user)
+        user_cache.invalidate(db_user.username)
+        token_versions.set(db_user.id, db_user.token_version)
         return db_user
 
     def deactivate_user(self, user_id: int) -> Optional[User]:
@@ -121,6 +167,9 @@ class UserService:
             return None
         
         db_user.is_active = False
+        db_user.token_version = (db_user.token_version or 0) + 1
         self.db.commit()
         self.db.refresh(db_user)
+        user_cache.invalidate(db_user.username)
+        token_versions.set(db_user.id, db_user.token_version)
         return db_user
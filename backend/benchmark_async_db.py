@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Sync vs async engine throughput benchmark
+Runs the same mix of authenticated API reads (patient and queue lookups,
+patient search, queue listing) against one app instance in each engine mode:
+the default sync engine, where service calls run in the threadpool, and
+DATABASE_ASYNC=true, where they run on an AsyncSession (aiosqlite / asyncpg).
+A third run limits the threadpool to one thread, which serializes database
+work the way the routes did when they called the services on the event loop.
+Each mode runs in its own process on a freshly seeded database.
+
+A local SQLite file answers in microseconds, which hides what the async
+engine is for, so every statement can be delayed by a simulated network
+round trip: time.sleep in sync mode, an awaited asyncio.sleep in async mode.
+
+Usage: python benchmark_async_db.py [requests] [concurrency] [latency_ms]
+       (default: 2000 50 2)
+Set BENCHMARK_DATABASE_URL to run against PostgreSQL instead of SQLite.
+"""
+
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date
+
+PATIENTS = 1000
+
+
+def run_mode(requests, concurrency, latency):
+    """Benchmark the engine mode selected by DATABASE_ASYNC in this process"""
+    import anyio
+    import httpx
+    from sqlalchemy import event
+    from sqlalchemy.util import await_only
+    from app.main import app
+    from app.core.database import Base, SessionLocal, async_engine, create_tables, engine
+    from app.models import Patient, Queue
+    from app.models.queue import QueueStatus
+    from app.schemas.user import UserCreate
+    from app.services.auth import AuthService
+    from app.services.patient import format_patient_id
+    from app.services.user import UserService
+
+    Base.metadata.drop_all(engine)
+    create_tables()
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(i),
+                "first_name": rng.choice(["Anna", "James", "Wei", "Priya", "Olga"]),
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1980, 1, 1),
+                "gender": "other",
+            }
+            for i in range(1, PATIENTS + 1)
+        ])
+        conn.execute(Queue.__table__.insert(), [
+            {
+                "queue_number": f"Q{i:04d}",
+                "patient_id": i,
+                "checkup_type": "general",
+                "priority": i % 3,
+                "status": rng.choice(list(QueueStatus)).name,
+            }
+            for i in range(1, PATIENTS + 1)
+        ])
+
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123"
+        ))
+        token = AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+    finally:
+        db.close()
+
+    if latency > 0:
+        if async_engine is not None:
+            event.listen(async_engine.sync_engine, "before_cursor_execute",
+                         lambda *args: await_only(asyncio.sleep(latency)))
+        else:
+            event.listen(engine, "before_cursor_execute", lambda *args: time.sleep(latency))
+
+    paths = []
+    for _ in range(requests):
+        record = rng.randint(1, PATIENTS)
+        paths.append(rng.choice([
+            (f"/api/v1/patients/{record}", None),
+            (f"/api/v1/queue/{record}", None),
+            ("/api/v1/patients/", {"search": f"Patient{record}", "limit": 10}),
+            ("/api/v1/queue/", {"status_filter": "completed", "limit": 20}),
+        ]))
+
+    async def fire():
+        if os.environ["BENCHMARK_MODE"] == "serialized":
+            anyio.to_thread.current_default_thread_limiter().total_tokens = 1
+        timings = []
+        statuses = []
+        semaphore = asyncio.Semaphore(concurrency)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                     headers={"Authorization": f"Bearer {token}"}) as client:
+            async def one(path, params):
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.get(path, params=params)
+                    timings.append((time.perf_counter() - started) * 1000)
+                    statuses.append(response.status_code)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(path, params) for path, params in paths))
+            elapsed = time.perf_counter() - started
+        if async_engine is not None:
+            await async_engine.dispose()
+        return timings, statuses, elapsed
+
+    timings, statuses, elapsed = asyncio.run(fire())
+    timings.sort()
+    return {
+        "throughput": len(timings) / elapsed,
+        "p50": statistics.median(timings),
+        "p99": timings[int(len(timings) * 0.99) - 1],
+        "errors": sum(1 for code in statuses if code != 200),
+    }
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    latency_ms = float(sys.argv[3]) if len(sys.argv) > 3 else 2
+
+    if os.environ.get("BENCHMARK_MODE"):
+        print(json.dumps(run_mode(requests, concurrency, latency_ms / 1000)))
+        return
+
+    print(f"{requests} requests, {concurrency} concurrent clients, "
+          f"{latency_ms:g} ms simulated latency per statement")
+    print(f"  {'mode':<12}{'req/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for mode in ("serialized", "sync", "async"):
+        url = os.environ.get("BENCHMARK_DATABASE_URL")
+        if url is None:
+            url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'benchmark_async.db')}"
+        env = dict(
+            os.environ,
+            BENCHMARK_MODE=mode,
+            DATABASE_URL=url,
+            DATABASE_ASYNC="true" if mode == "async" else "false",
+            DEBUG="false",
+            QUEUE_INDEX_ENABLED="false",
+            PATIENT_INDEX_REFRESH_SECONDS="0",
+        )
+        output = subprocess.run(
+            [sys.executable, __file__, str(requests), str(concurrency), str(latency_ms)],
+            env=env, capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"  {mode:<12}{result['throughput']:>9.0f}{result['p50']:>10.2f}"
+              f"{result['p99']:>10.2f}{result['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
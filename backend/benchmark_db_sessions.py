@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Load test for database session usage per request
+Counts connection pool checkouts while authenticated requests run concurrently
+against a throwaway SQLite database, once per way a request is authorized:
+- a login token, authorized from its claims and the token version map
+  (get_token_user), which must not take a connection of its own;
+- a token without claims, as issued before claims were embedded, which falls
+  back to get_current_user. The user cache is disabled, so every request
+  queries the users table, and the query must share the handler's session.
+Each kind must take at most one pool checkout per request.
+
+Usage: python benchmark_db_sessions.py [requests] [concurrency]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_sessions.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.database import engine, SessionLocal, create_tables
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService, user_cache
+from app.services.user import UserService
+
+
+class PoolCounter:
+    """Counts pool checkouts and tracks connections currently checked out"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.checked_out = 0
+        self.peak_checked_out = 0
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self.lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.checked_out -= 1
+
+
+def get_tokens(client):
+    """Create a user, log in, and issue a token without claims for it"""
+    db = SessionLocal()
+    try:
+        UserService(db).create_user(UserCreate(
+            username="loadtest",
+            email="loadtest@example.com",
+            full_name="Load Test",
+            password="password123"
+        ))
+    finally:
+        db.close()
+
+    response = client.post(
+        "/api/v1/auth/login",
+        data={"username": "loadtest", "password": "password123"}
+    )
+    response.raise_for_status()
+    db = SessionLocal()
+    try:
+        legacy_token = AuthService(db).create_access_token(data={"sub": "loadtest"})
+    finally:
+        db.close()
+    return {"claims": response.json()["token"], "fallback": legacy_token}
+
+
+def run(client, token, total_requests, concurrency):
+    """Pool usage for total_requests concurrent GETs authorized with token"""
+    headers = {"Authorization": f"Bearer {token}"}
+    counter = PoolCounter()
+    event.listen(engine, "checkout", counter.on_checkout)
+    event.listen(engine, "checkin", counter.on_checkin)
+
+    def hit(i):
+        path = "/api/v1/patients/" if i % 2 else "/api/v1/queue/"
+        return client.get(path, headers=headers).status_code
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            statuses = list(executor.map(hit, range(total_requests)))
+    finally:
+        event.remove(engine, "checkout", counter.on_checkout)
+        event.remove(engine, "checkin", counter.on_checkin)
+    return counter, sum(1 for code in statuses if code != 200)
+
+
+def main():
+    total_requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+
+    create_tables()
+    # Disable the user cache so the fallback path queries the users table
+    user_cache.max_size = 0
+
+    results = {}
+    with TestClient(app) as client:
+        tokens = get_tokens(client)
+        for kind, token in tokens.items():
+            results[kind] = run(client, token, total_requests, concurrency)
+
+    print(f"Requests per token kind: {total_requests} ({concurrency} concurrent)")
+    print(f"  {'token':<10}{'failed':>8}{'checkouts':>11}{'per request':>13}{'peak':>6}{'leaked':>8}")
+    passed = True
+    for kind, (counter, failures) in results.items():
+        per_request = counter.checkouts / total_requests
+        print(f"  {kind:<10}{failures:>8}{counter.checkouts:>11}{per_request:>13.2f}"
+              f"{counter.peak_checked_out:>6}{counter.checked_out:>8}")
+        passed = passed and failures == 0 and per_request <= 1.0 and counter.checked_out == 0
+
+    if passed:
+        print("✅ At most one pool checkout per request and no leaked connections")
+    else:
+        print("❌ Unexpected pool usage")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
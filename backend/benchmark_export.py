@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Patient export benchmark
+Reads every patient out the way clients had to (paging through
+GET /api/v1/patients/?limit=1000 with the cursor) and with
+GET /api/v1/patients/export as NDJSON and CSV. Reports rows per second,
+requests and SQL statements, then the peak memory traced while producing
+the export body for tables of growing size, which stays flat because rows
+are fetched and sent one batch at a time.
+
+Usage: python benchmark_export.py [patients]
+       (default: 50000)
+"""
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'export.db')}"
+os.environ["DEBUG"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Patient
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.export import make_encoder, stream_export
+from app.services.patient import PatientService, format_patient_id
+from app.services.user import UserService
+
+
+def seed(start, count):
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(number),
+                "first_name": "Export",
+                "last_name": f"Patient{number}",
+                "date_of_birth": date(1960 + number % 40, 1 + number % 12, 1 + number % 28),
+                "gender": ("male", "female", "other")[number % 3],
+                "phone": f"+1555{number:07d}",
+                "email": f"patient{number}@example.com",
+                "address": f"{number} Main Street",
+                "created_at": now,
+            }
+            for number in range(start, start + count)
+        ])
+
+
+def token():
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123",
+            is_superuser=True
+        ))
+        return AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+    finally:
+        db.close()
+
+
+def export_peak(export_format):
+    """Peak memory traced while producing the whole export body (chunks are discarded, as sent ones are)"""
+    db = SessionLocal()
+    try:
+        statement = PatientService(db).export_query()
+        encoder = make_encoder(export_format, statement.selected_columns.keys())
+        tracemalloc.start()
+        for _ in stream_export(SessionLocal, statement, encoder):
+            pass
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        return peak
+    finally:
+        db.close()
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    create_tables()
+    seed(1, count)
+    client = TestClient(app, headers={"Authorization": f"Bearer {token()}"})
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    print(f"{count} patients")
+    print(f"  {'method':<29}{'seconds':>9}{'rows/s':>9}{'requests':>9}{'SQL':>7}")
+
+    statements.clear()
+    started = time.perf_counter()
+    rows, requests, cursor = 0, 0, None
+    while True:
+        response = client.get("/api/v1/patients/", params={"limit": 1000, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200, response.text
+        rows += len(response.json())
+        requests += 1
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    elapsed = time.perf_counter() - started
+    assert rows == count
+    print(f"  {'GET /patients/ pages':<29}{elapsed:>9.2f}{rows / elapsed:>9.0f}{requests:>9}{len(statements):>7}")
+
+    for export_format in ("ndjson", "csv"):
+        statements.clear()
+        started = time.perf_counter()
+        response = client.get("/api/v1/patients/export", params={"format": export_format})
+        elapsed = time.perf_counter() - started
+        assert response.status_code == 200, response.text
+        lines = response.text.count("\n") - (export_format == "csv")
+        assert lines == count, lines
+        label = f"GET /patients/export {export_format}"
+        print(f"  {label:<29}{elapsed:>9.2f}{count / elapsed:>9.0f}{1:>9}{len(statements):>7}")
+
+    db = SessionLocal()
+    try:
+        tracemalloc.start()
+        PatientService(db).get_patients(limit=1000)
+        page_peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    finally:
+        db.close()
+    print(f"peak memory loading one 1000-patient page as ORM objects: {page_peak:.2f} MiB")
+    print("peak memory producing the whole NDJSON export body")
+    for total in (count, count * 3):
+        if total > count:
+            seed(count + 1, total - count)
+        print(f"  {total:>9} rows  {export_peak('ndjson'):6.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Group registration benchmark
+Registers groups (a family, a company's employees) at the front desk one
+member at a time, the way the old POST /api/v1/patients/register did it
+(create_patient then add_to_queue, two commits each) and with
+register_patient (one commit per member), then the whole group at once
+with PatientService.register_patients, as POST /patients/register/batch does.
+Reports the time to register a group and the SQL statements and commits it
+takes. Runs against a file SQLite database, where each commit is an fsync.
+
+Usage: python benchmark_group_registration.py [groups] [group size]     (default: 40 25)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'group.db')}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import event
+from app.core.database import SessionLocal, create_tables, engine
+from app.schemas.patient import PatientCreate, PatientRegistration
+from app.schemas.queue import QueueCreate
+from app.services.patient import PatientService
+from app.services.queue import QueueService
+
+
+def registration(number):
+    return PatientRegistration(
+        first_name="Group",
+        last_name=f"Member{number}",
+        date_of_birth=date(1970 + number % 40, 1, 1),
+        gender=("male", "female", "other")[number % 3],
+        phone="+1234567890",
+        checkup_type=("General Checkup", "Eye Exam", "Blood Test")[number % 3],
+        notes="Corporate checkup"
+    )
+
+
+def in_new_session(register):
+    def run(data):
+        db = SessionLocal()
+        try:
+            return register(db, data)
+        finally:
+            db.close()
+    return run
+
+
+@in_new_session
+def two_step(db, data):
+    patient_data = PatientCreate(**data.model_dump(include=set(PatientCreate.model_fields)))
+    patient = PatientService(db).create_patient(patient_data)
+    queue = QueueService(db).add_to_queue(QueueCreate(
+        patient_id=patient.id,
+        checkup_type=data.checkup_type,
+        priority=data.priority,
+        notes=data.notes,
+        estimated_wait_time=data.estimated_wait_time
+    ))
+    return patient, queue
+
+
+@in_new_session
+def one_by_one(db, data):
+    return PatientService(db).register_patient(data)
+
+
+def each_member(register):
+    def run(group):
+        return [register(data) for data in group]
+    return run
+
+
+@in_new_session
+def batch(db, group):
+    return PatientService(db).register_patients(group)
+
+
+def main():
+    groups = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    size = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    create_tables()
+    statements = []
+    commits = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    event.listen(engine, "commit", lambda *args: commits.append(1))
+
+    print(f"{groups} groups of {size} per strategy")
+    print(f"  {'strategy':<24}{'p50 ms':>9}{'p99 ms':>9}{'SQL/group':>11}{'commits/group':>15}")
+    number = 0
+    for label, register in (("create + add_to_queue", each_member(two_step)),
+                            ("register_patient each", each_member(one_by_one)),
+                            ("register_patients", batch)):
+        timings = []
+        statements.clear()
+        commits.clear()
+        for _ in range(groups):
+            group = [registration(number + offset) for offset in range(size)]
+            number += size
+            started = time.perf_counter()
+            registered = register(group)
+            timings.append((time.perf_counter() - started) * 1000)
+            assert len(registered) == size
+        timings.sort()
+        print(f"  {label:<24}{statistics.median(timings):>9.2f}{timings[int(len(timings) * 0.99) - 1]:>9.2f}"
+              f"{len(statements) / groups:>11.1f}{len(commits) / groups:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
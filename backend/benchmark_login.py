@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Login throughput benchmark
+Fires a burst of concurrent logins at the app while a heartbeat coroutine
+measures event-loop latency, then repeats the burst with bcrypt verification
+called inline on the loop for comparison.
+
+Usage: python benchmark_login.py [logins] [concurrency]
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_login.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+import httpx
+from app.main import app
+from app.core.database import SessionLocal, create_tables
+from app.schemas.user import UserCreate
+from app.services.auth import pwd_context, password_pool
+from app.services.user import UserService
+
+HEARTBEAT_INTERVAL = 0.005
+
+
+async def heartbeat(lags, stop):
+    """Record how late each wake-up is compared to the requested sleep"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        lags.append((time.perf_counter() - started - HEARTBEAT_INTERVAL) * 1000)
+
+
+async def measure(burst, label):
+    lags = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+
+    started = time.perf_counter()
+    results = await burst()
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    await monitor
+
+    lags.sort()
+    p99 = lags[int(len(lags) * 0.99) - 1] if lags else 0.0
+    print(f"{label}")
+    print(f"  Logins:         {len(results)} in {elapsed:.2f}s ({len(results) / elapsed:.1f}/s)")
+    print(f"  Status codes:   {dict((code, results.count(code)) for code in set(results))}")
+    print(f"  Loop lag p50:   {statistics.median(lags) if lags else 0.0:.1f} ms")
+    print(f"  Loop lag p99:   {p99:.1f} ms")
+    print(f"  Loop lag max:   {max(lags) if lags else 0.0:.1f} ms")
+    return max(lags) if lags else 0.0
+
+
+async def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    create_tables()
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123"
+        ))
+        hashed_password = user.hashed_password
+    finally:
+        db.close()
+
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        async def login():
+            async with semaphore:
+                response = await client.post(
+                    "/api/v1/auth/login",
+                    data={"username": "benchmark", "password": "password123"}
+                )
+                return response.status_code
+
+        async def pooled_burst():
+            return await asyncio.gather(*(login() for _ in range(total)))
+
+        async def inline_verify():
+            async with semaphore:
+                return 200 if pwd_context.verify("password123", hashed_password) else 401
+
+        async def inline_burst():
+            return await asyncio.gather(*(inline_verify() for _ in range(total)))
+
+        print(f"Password pool: {password_pool.kind}, {password_pool.max_workers} workers, "
+              f"max {password_pool.max_pending} pending\n")
+        pooled_max = await measure(pooled_burst, "Logins through /auth/login (worker pool)")
+        inline_max = await measure(inline_burst, "bcrypt verify inline on the event loop")
+
+    password_pool.shutdown()
+    print()
+    if pooled_max < inline_max:
+        print(f"✅ Worker pool keeps max loop lag at {pooled_max:.1f} ms vs {inline_max:.1f} ms inline")
+    else:
+        print("❌ Worker pool did not reduce event-loop latency")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
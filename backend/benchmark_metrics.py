@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Metrics endpoint benchmark
+Measures what GET /metrics costs the API: the per-request overhead of the
+timing middleware on a trivial ASGI app, and the latency and SQL statements
+of a scrape with a large waiting queue (the queue gauges are kept in memory,
+so a scrape should not touch the database until the gauges are due for a
+reload).
+
+Usage: python benchmark_metrics.py [requests] [queue entries] [scrapes]
+       (default: 20000 5000 200)
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'metrics.db')}"
+os.environ["DEBUG"] = "false"
+os.environ["METRICS_QUEUE_REFRESH_SECONDS"] = "0"  # reload only at startup
+
+import httpx
+from sqlalchemy import event
+from app.main import app
+from app.core.database import create_tables, engine
+from app.core.metrics import MetricsMiddleware
+from app.models import Patient, Queue
+from app.models.queue import QueueStatus
+from app.services.patient import format_patient_id
+
+CHECKUP_TYPES = ["General Checkup", "Cardiology", "Eye Exam", "Blood Work"]
+
+
+async def plain_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def call(asgi_app, count):
+    scope = {"type": "http", "method": "GET", "path": "/health", "headers": []}
+
+    async def receive():
+        return {"type": "http.request", "body": b""}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(count):
+        await asgi_app(dict(scope), receive, send)
+    return (time.perf_counter() - started) / count * 1_000_000
+
+
+def seed(entries):
+    create_tables()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(i),
+                "first_name": "Bench",
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1980, 1, 1),
+                "gender": "other",
+            }
+            for i in range(1, entries + 1)
+        ])
+        conn.execute(Queue.__table__.insert(), [
+            {
+                "queue_number": f"Q{i:05d}",
+                "patient_id": i,
+                "checkup_type": rng.choice(CHECKUP_TYPES),
+                "priority": 0,
+                "status": rng.choice([QueueStatus.WAITING.name] * 3 + [QueueStatus.IN_PROGRESS.name]),
+                "check_in_time": now - timedelta(seconds=rng.randint(0, 7200)),
+            }
+            for i in range(1, entries + 1)
+        ])
+
+
+async def scrape(count):
+    timings = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.get("/metrics")
+            assert response.status_code == 200, response.text
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings, len(response.text.splitlines())
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    entries = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    scrapes = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+
+    bare = asyncio.run(call(plain_app, requests))
+    timed = asyncio.run(call(MetricsMiddleware(plain_app), requests))
+    print(f"Middleware overhead over {requests} requests")
+    print(f"  without {bare:.1f} us/request, with {timed:.1f} us/request (+{timed - bare:.1f} us)")
+
+    seed(entries)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    timings, lines = asyncio.run(scrape(scrapes))
+    timings.sort()
+    print(f"Scrapes with {entries} waiting / in-progress entries ({lines} lines per scrape)")
+    print(f"  p50 {statistics.median(timings):.2f} ms, p99 {timings[int(len(timings) * 0.99) - 1]:.2f} ms, "
+          f"{len(statements)} SQL statements over {scrapes} scrapes (first scrape loads the gauges)")
+
+
+if __name__ == "__main__":
+    main()
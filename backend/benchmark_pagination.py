@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Pagination benchmark for the patient and queue listings
+Reads pages at growing depths of a large patient table and queue, once
+with the deprecated skip (OFFSET) parameter and once continuing from the
+X-Next-Cursor of the previous page, and reports the time per page. Offset
+pages get slower the deeper they are; cursor pages cost the same anywhere.
+
+Usage: python benchmark_pagination.py [rows] [page size]
+       (default: 200000 100)
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'pagination.db')}"
+os.environ["DEBUG"] = "false"
+
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Patient, Queue
+from app.models.queue import QueueStatus
+from app.services.patient import PATIENT_CURSOR, PatientService, format_patient_id
+from app.services.queue import QUEUE_CURSOR, QueueService
+
+
+def seed(rows):
+    create_tables()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(i),
+                "first_name": "Bench",
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1980, 1, 1),
+                "gender": "other",
+            }
+            for i in range(1, rows + 1)
+        ])
+        conn.execute(Queue.__table__.insert(), [
+            {
+                "queue_number": f"Q{i:06d}",
+                "patient_id": i,
+                "checkup_type": "General Checkup",
+                "priority": rng.choice([0, 0, 0, 1, 2]),
+                "status": rng.choice([QueueStatus.WAITING.name, QueueStatus.COMPLETED.name]),
+                "check_in_time": now - timedelta(seconds=rng.randint(0, 86400)),
+            }
+            for i in range(1, rows + 1)
+        ])
+
+
+def timed(read, repeat=5):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        page = read()
+    return (time.perf_counter() - started) * 1000 / repeat, page
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    page_size = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+    seed(rows)
+
+    db = SessionLocal()
+    try:
+        completed = db.query(Queue).filter(Queue.status == QueueStatus.COMPLETED).count()
+        listings = [
+            ("patients", rows, PATIENT_CURSOR,
+             lambda **kw: PatientService(db).get_patients(limit=page_size, **kw)),
+            # Completed entries: the waiting listing is served from the in-memory index
+            ("queue", completed, QUEUE_CURSOR,
+             lambda **kw: QueueService(db).get_queue_status(
+                 status_filter=QueueStatus.COMPLETED.value, limit=page_size, **kw)),
+        ]
+        print(f"{rows} patients, {completed} completed queue entries, {page_size} rows per page")
+        print(f"  {'listing':<10}{'depth':>9}{'skip ms':>10}{'cursor ms':>11}")
+        for name, total, key, read in listings:
+            for depth in (0, total // 10, total // 2, total - 2 * page_size):
+                offset_ms, page = timed(lambda: read(skip=depth))
+                if depth:
+                    # The cursor a client would hold after reading the previous page
+                    cursor = key.encode(read(skip=depth - 1)[0])
+                    cursor_ms, cursor_page = timed(lambda: read(cursor=cursor))
+                    assert [row.id for row in cursor_page] == [row.id for row in page]
+                else:
+                    cursor_ms, _ = timed(lambda: read())
+                print(f"  {name:<10}{depth:>9}{offset_ms:>10.2f}{cursor_ms:>11.2f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
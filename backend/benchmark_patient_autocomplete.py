@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Patient autocomplete benchmark
+Seeds a throwaway database with patients, loads the in-memory prefix index,
+then fires keystroke-style GET /patients/autocomplete requests at the app
+(1-6 characters of real names, patient IDs and phone numbers) from
+one client and then from concurrent clients. Reports index load time,
+per-lookup latency, end-to-end request latency percentiles (with many clients
+this includes queueing on the single event loop) and the SQL statements
+issued while serving.
+
+Usage: python benchmark_patient_autocomplete.py [patients] [requests] [concurrency]
+       (default: 100000 5000 50)
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "benchmark_autocomplete.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+os.environ["DEBUG"] = "false"
+
+import httpx
+from sqlalchemy import event
+from app.main import app
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Patient
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.patient import PatientService, format_patient_id
+from app.services.patient_index import patient_index
+from app.services.user import UserService
+
+BATCH_SIZE = 50000
+FIRST_NAMES = ["James", "Mary", "José", "Aisha", "Wei", "Olga", "Liam", "Priya", "Noah", "Chloé",
+               "Mohammed", "Sofia", "Kenji", "Amara", "Lucas", "Ingrid", "Mateo", "Fatima", "Arjun", "Zoe"]
+LAST_NAMES = ["Smith", "Núñez", "Chen", "Okafor", "Ivanova", "Patel", "García", "Müller", "Kim", "Brown",
+              "Nguyen", "Rossi", "Kowalski", "Haddad", "Silva", "Jensen", "Tanaka", "Dubois", "Cohen", "Singh"]
+
+
+def seed(patients):
+    rng = random.Random(42)
+    for offset in range(1, patients + 1, BATCH_SIZE):
+        with engine.begin() as conn:
+            conn.execute(Patient.__table__.insert(), [
+                {
+                    "patient_id": format_patient_id(i),
+                    "first_name": rng.choice(FIRST_NAMES),
+                    "last_name": rng.choice(LAST_NAMES) + rng.choice(["", "", "son", "-Lee", "ski"]),
+                    "date_of_birth": date(1980, 1, 1),
+                    "gender": "other",
+                    "phone": f"+1 555 {rng.randint(0, 9999999):07d}",
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, patients + 1))
+            ])
+
+
+def keystrokes(patients, count):
+    """Prefixes a receptionist types, 1 to 6 characters of a real value"""
+    rng = random.Random(7)
+    db = SessionLocal()
+    try:
+        rows = db.query(Patient.first_name, Patient.last_name, Patient.patient_id, Patient.phone).filter(
+            Patient.id.in_([rng.randint(1, patients) for _ in range(200)])
+        ).all()
+    finally:
+        db.close()
+    queries = []
+    for _ in range(count):
+        first_name, last_name, patient_id, phone = rng.choice(rows)
+        value = rng.choice([first_name, last_name, f"{last_name} {first_name}", patient_id, phone[3:]])
+        queries.append(value[:rng.randint(1, 6)].strip() or value[0])
+    return queries
+
+
+def percentiles(timings):
+    timings = sorted(timings)
+    return (
+        statistics.median(timings),
+        timings[int(len(timings) * 0.99) - 1],
+        timings[-1],
+    )
+
+
+async def fire(queries, concurrency, token):
+    timings = []
+    statuses = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        async def one(query):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/api/v1/patients/autocomplete", params={"q": query})
+                timings.append((time.perf_counter() - started) * 1000)
+                statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(query) for query in queries))
+        elapsed = time.perf_counter() - started
+    return timings, statuses, elapsed
+
+
+def main():
+    patients = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 5000
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+
+    create_tables()
+    started = time.perf_counter()
+    seed(patients)
+    print(f"Patients: {patients:,} (seeded in {time.perf_counter() - started:.1f}s)")
+
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123"
+        ))
+        token = AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+
+        started = time.perf_counter()
+        PatientService(db).rebuild_patient_index()
+        print(f"Index load:    {time.perf_counter() - started:.2f}s, {len(patient_index._entries):,} keys")
+    finally:
+        db.close()
+
+    queries = keystrokes(patients, requests)
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        patient_index.lookup(query, 10)
+        timings.append((time.perf_counter() - started) * 1000)
+    p50, p99, worst = percentiles(timings)
+    print(f"Index lookup:  p50 {p50:.3f} ms  p99 {p99:.3f} ms  max {worst:.3f} ms")
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    for clients in (1, concurrency):
+        timings, statuses, elapsed = asyncio.run(fire(queries, clients, token))
+        p50, p99, worst = percentiles(timings)
+        print(f"HTTP, {clients} client(s): {len(timings)} requests in {elapsed:.2f}s ({len(timings) / elapsed:.0f}/s)")
+        print(f"  Status codes:  {dict((code, statuses.count(code)) for code in set(statuses))}")
+        print(f"  Latency:       p50 {p50:.2f} ms  p99 {p99:.2f} ms  max {worst:.2f} ms")
+    # The only expected statement is the periodic token-version refresh in auth
+    print(f"SQL statements while serving: {len(statements)}")
+    for statement in statements[:3]:
+        print(f"  {' '.join(statement.split())[:100]}")
+
+if __name__ == "__main__":
+    main()
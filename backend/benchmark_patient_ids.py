@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Patient ID generation microbenchmark
+Seeds a throwaway database with existing patients, then times patient ID
+generation with the old random-string-plus-lookup loop and with the
+block-allocated sequence (single IDs and batches), counting the SQL
+statements issued per ID.
+
+Usage: python benchmark_patient_ids.py [patients ...]     (default: 10000 100000 1000000)
+Set BENCHMARK_DATABASE_URL to run against PostgreSQL instead of SQLite.
+
+Seeding dominates the runtime, at about a minute per million patients on
+SQLite: the defaults take ~1.5 minutes, and
+"python benchmark_patient_ids.py 10000000" takes ~10 minutes. The results
+do not depend on the table size (the old loop costs one lookup per ID, the
+sequence one round trip per block), so the defaults are enough to compare.
+"""
+
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import IdSequence, Patient
+from app.services.patient import PatientService, format_patient_id, is_valid_patient_id
+
+BATCH_SIZE = 50000
+LEGACY_IDS = 2000
+SEQUENCE_IDS = 200000
+BATCHES = 200
+BATCH_IDS = 1000
+
+
+def make_engine(patients):
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+    else:
+        path = os.path.join(tempfile.mkdtemp(), f"patients_{patients}.db")
+        engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed(engine, patients):
+    """Insert patients with sequence-derived IDs and advance the sequence past them"""
+    for offset in range(1, patients + 1, BATCH_SIZE):
+        with engine.begin() as conn:
+            conn.execute(Patient.__table__.insert(), [
+                {
+                    "patient_id": format_patient_id(i),
+                    "first_name": "Bench",
+                    "last_name": f"Patient{i}",
+                    "date_of_birth": date(1980, 1, 1),
+                    "gender": "other",
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, patients + 1))
+            ])
+    with engine.begin() as conn:
+        conn.execute(IdSequence.__table__.insert(), {"name": "patient_id", "next_value": patients + 1})
+
+
+def legacy_patient_id(service):
+    """The random-string loop PatientService used before sequence-derived IDs"""
+    while True:
+        patient_id = ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+        if not service.get_patient_by_patient_id(patient_id):
+            return patient_id
+
+
+def measure(engine, label, count, func):
+    statements = [0]
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements[0] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    started = time.perf_counter()
+    try:
+        ids = func()
+    finally:
+        elapsed = time.perf_counter() - started
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+    assert len(ids) == count and len(set(ids)) == count, "duplicate IDs generated"
+    print(f"  {label:<28} {elapsed * 1e6 / count:9.2f} us/ID {statements[0] / count:9.4f} queries/ID")
+    return ids
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    for patients in sizes:
+        print(f"Existing patients: {patients:,}")
+        engine = make_engine(patients)
+        started = time.perf_counter()
+        seed(engine, patients)
+        print(f"  Seeded in {time.perf_counter() - started:.1f}s")
+
+        db = sessionmaker(bind=engine)()
+        service = PatientService(db)
+        measure(engine, "random + lookup (old)", LEGACY_IDS,
+                lambda: [legacy_patient_id(service) for _ in range(LEGACY_IDS)])
+        single = measure(engine, "sequence, one at a time", SEQUENCE_IDS,
+                         lambda: [service._generate_patient_id() for _ in range(SEQUENCE_IDS)])
+        batched = measure(engine, f"sequence, batches of {BATCH_IDS}", BATCHES * BATCH_IDS,
+                          lambda: [pid for _ in range(BATCHES) for pid in service._generate_patient_ids(BATCH_IDS)])
+        db.close()
+
+        issued = set(single) | set(batched)
+        assert len(issued) == len(single) + len(batched), "sequence reissued an ID"
+        assert all(is_valid_patient_id(pid) for pid in issued)
+        assert format_patient_id(patients) not in issued, "sequence reissued an existing ID"
+        engine.dispose()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Bulk patient import benchmark
+Creates patients one POST /api/v1/patients/ request at a time (how health
+camp rosters were entered) and through POST /api/v1/patients/import with
+CSV and NDJSON uploads streamed in 64 KiB chunks. Reports patients per
+second and SQL statements run, then the peak memory traced while
+parsing uploads of growing size, which stays flat because the upload is
+never held whole.
+
+Usage: python benchmark_patient_import.py [patients] [one-by-one patients]
+       (default: 10000 1000)
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'import.db')}"
+os.environ["DEBUG"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Patient
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.patient_import import make_parser
+from app.services.user import UserService
+
+CHUNK_SIZE = 64 * 1024
+
+
+def seed():
+    create_tables()
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123",
+            is_superuser=True
+        ))
+        return AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+    finally:
+        db.close()
+
+
+def patient(number):
+    return {
+        "first_name": "Camp",
+        "last_name": f"Employee{number}",
+        "date_of_birth": f"19{60 + number % 40}-0{1 + number % 9}-1{number % 10}",
+        "gender": ("male", "female", "other")[number % 3],
+        "phone": f"+1555{number:07d}",
+        "email": f"employee{number}@example.com",
+    }
+
+
+def csv_upload(start, count):
+    yield b"first_name,last_name,date_of_birth,gender,phone,email\n"
+    lines = []
+    for number in range(start, start + count):
+        lines.append(",".join(patient(number).values()) + "\n")
+        if len(lines) == 500:
+            yield "".join(lines).encode()
+            lines = []
+    yield "".join(lines).encode()
+
+
+def ndjson_upload(start, count):
+    lines = []
+    for number in range(start, start + count):
+        lines.append(json.dumps(patient(number)) + "\n")
+        if len(lines) == 500:
+            yield "".join(lines).encode()
+            lines = []
+    yield "".join(lines).encode()
+
+
+def rechunk(parts):
+    """Re-slice an upload into CHUNK_SIZE pieces, as a client would stream it"""
+    buffer = b""
+    for part in parts:
+        buffer += part
+        while len(buffer) >= CHUNK_SIZE:
+            yield buffer[:CHUNK_SIZE]
+            buffer = buffer[CHUNK_SIZE:]
+    if buffer:
+        yield buffer
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    one_by_one = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    token = seed()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+    print(f"  {'method':<22}{'patients':>9}{'seconds':>9}{'per s':>9}{'SQL':>8}")
+
+    statements.clear()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for number in range(one_by_one):
+            assert client.post("/api/v1/patients/", json=patient(number)).status_code == 201
+    elapsed = time.perf_counter() - started
+    print(f"  {'POST /patients/ each':<22}{one_by_one:>9}{elapsed:>9.2f}{one_by_one / elapsed:>9.0f}"
+          f"{len(statements):>8}")
+
+    start = one_by_one
+    for label, content_type, upload in (("import CSV", "text/csv", csv_upload),
+                                        ("import NDJSON", "application/x-ndjson", ndjson_upload)):
+        statements.clear()
+        started = time.perf_counter()
+        response = client.post("/api/v1/patients/import", content=rechunk(upload(start, count)),
+                               headers={"Content-Type": content_type})
+        elapsed = time.perf_counter() - started
+        report = response.json()
+        assert response.status_code == 200 and report["imported"] == count, report
+        print(f"  {label:<22}{count:>9}{elapsed:>9.2f}{count / elapsed:>9.0f}{len(statements):>8}")
+        start += count
+
+    print("peak memory parsing the upload (rows are dropped once parsed, as saved batches are)")
+    for rows in (count, count * 5):
+        parser = make_parser("csv")
+        tracemalloc.start()
+        for chunk in rechunk(csv_upload(0, rows)):
+            parser.feed(chunk)
+        parser.close()
+        peak = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+        print(f"  {rows:>9} rows  {peak:6.2f} MiB")
+
+    db = SessionLocal()
+    try:
+        print(f"{db.query(Patient).count()} patients in the database")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Patient search benchmark
+Seeds a throwaway database with patients, then times PatientService.search_patients
+for typical reception-desk search terms with the search index (SQLite FTS5 /
+PostgreSQL pg_trgm) and with the ILIKE fallback, and checks that both return
+the same matches. Broad terms rank an exact patient ID match, the best
+PATIENT_SEARCH_MAX_RESULTS name-prefix matches and PATIENT_SEARCH_MAX_RESULTS
+other matches only.
+
+Usage: python benchmark_patient_search.py [patients ...]     (default: 1000000)
+Set BENCHMARK_DATABASE_URL to run against PostgreSQL instead of SQLite.
+"""
+
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Patient
+from app.services.patient import PatientService, format_patient_id
+
+BATCH_SIZE = 50000
+REPEAT = 20
+ONSETS = ["", "b", "br", "c", "ch", "d", "dr", "f", "g", "gr", "h", "j", "k", "l", "m",
+          "n", "p", "r", "s", "sh", "st", "t", "th", "v", "w", "z"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ea", "ie", "ou"]
+CODAS = ["", "", "n", "r", "l", "s", "th", "m", "ck", "nd"]
+SUFFIXES = ["", "", "", "son", "sen", "ez"]
+SAMPLES = 3
+
+
+def search_terms(patient):
+    """Typical reception-desk searches for one seeded patient"""
+    return [
+        patient.last_name,                                       # full last name
+        patient.first_name[:4].lower(),                          # first keystrokes of a name
+        f"{patient.first_name[:3]} {patient.last_name[:4]}",     # first and last name fragments
+        f"{patient.first_name[:2]} {patient.last_name[:2]}",     # two short words (ILIKE only)
+        patient.patient_id[1:5],                                 # patient ID fragment
+    ]
+
+
+def make_engine(patients):
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+    else:
+        path = os.path.join(tempfile.mkdtemp(), f"search_{patients}.db")
+        engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def name(rng):
+    syllables = [rng.choice(ONSETS) + rng.choice(VOWELS) + rng.choice(CODAS) for _ in range(rng.randint(2, 3))]
+    return "".join(syllables).capitalize()
+
+
+def seed(engine, patients):
+    rng = random.Random(42)
+    for offset in range(1, patients + 1, BATCH_SIZE):
+        with engine.begin() as conn:
+            conn.execute(Patient.__table__.insert(), [
+                {
+                    "patient_id": format_patient_id(i),
+                    "first_name": name(rng),
+                    "last_name": name(rng) + rng.choice(SUFFIXES),
+                    "date_of_birth": date(1980, 1, 1),
+                    "gender": "other",
+                }
+                for i in range(offset, min(offset + BATCH_SIZE, patients + 1))
+            ])
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def time_search(service, term):
+    timings = []
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        results = service.search_patients(term)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return results, statistics.median(timings), timings[int(len(timings) * 0.95) - 1]
+
+
+def matching_ids(service, term):
+    """Every match for term, without the ranking cut-off"""
+    max_results = settings.patient_search_max_results
+    settings.patient_search_max_results = sys.maxsize
+    try:
+        return {patient_id for (patient_id,) in service._search_query(term).with_entities(Patient.id)}
+    finally:
+        settings.patient_search_max_results = max_results
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1_000_000]
+    for patients in sizes:
+        print(f"Patients: {patients:,}")
+        engine = make_engine(patients)
+        started = time.perf_counter()
+        seed(engine, patients)
+        print(f"  Seeded in {time.perf_counter() - started:.1f}s")
+
+        db = sessionmaker(bind=engine)()
+        service = PatientService(db)
+        sampled = random.Random(7).sample(range(1, patients + 1), SAMPLES)
+        terms = [term for patient_id in sampled for term in search_terms(service.get_patient(patient_id))]
+        terms += ["son", "xyzzy"]  # very common fragment, no match
+
+        print(f"  {'term':<16}{'matches':>9}{'index p50':>11}{'p95':>9}{'ILIKE p50':>11}{'p95':>9}  ms")
+        for term in terms:
+            settings.patient_search_index = True
+            indexed_ids = matching_ids(service, term)
+            _, indexed_p50, indexed_p95 = time_search(service, term)
+
+            settings.patient_search_index = False
+            scan_ids = matching_ids(service, term)
+            _, scan_p50, scan_p95 = time_search(service, term)
+
+            assert indexed_ids == scan_ids, f"index and ILIKE disagree for {term!r}"
+            print(
+                f"  {term:<16}{len(indexed_ids):>9}{indexed_p50:>11.2f}{indexed_p95:>9.2f}"
+                f"{scan_p50:>11.2f}{scan_p95:>9.2f}"
+            )
+        settings.patient_search_index = True
+        db.close()
+        engine.dispose()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Claim-next-patient stress test
+Seeds a throwaway database with waiting patients, then has several stations
+(threads, each with its own session) claim patients concurrently until the
+queue is empty. Verifies every entry was claimed exactly once by the station
+that received it, and reports throughput per station count. The naive
+"read the head, then PATCH it" flow is run the same way for comparison.
+
+Usage: python benchmark_queue_claim.py [stations ...]     (default: 1 2 4 8 16)
+Options via environment:
+  BENCHMARK_DATABASE_URL  run against PostgreSQL instead of SQLite
+  CLAIM_PATIENTS          waiting entries to seed (default: 500)
+  CLAIM_SERVICE_MS        simulated time a station spends per patient (default: 5)
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import Base
+from app.models import Patient, Queue, User
+from app.models.queue import QueueStatus
+from app.schemas.queue import QueueStatusUpdate
+from app.services.queue import QueueService
+
+PATIENTS = int(os.environ.get("CLAIM_PATIENTS", "500"))
+SERVICE_SECONDS = int(os.environ.get("CLAIM_SERVICE_MS", "5")) / 1000
+
+
+def make_engine(stations):
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if url:
+        engine = create_engine(url, pool_size=stations, max_overflow=0)
+        Base.metadata.drop_all(engine)
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "claim.db")
+        engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 30})
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed(engine, stations):
+    """Insert one user per station and PATIENTS waiting queue entries"""
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {
+                "username": f"station{i}",
+                "email": f"station{i}@example.com",
+                "full_name": f"Station {i}",
+                "hashed_password": "x",
+            }
+            for i in range(1, stations + 1)
+        ])
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": f"C{i:05d}",
+                "first_name": "Claim",
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1980, 1, 1),
+                "gender": "other",
+            }
+            for i in range(PATIENTS)
+        ])
+        conn.execute(Queue.__table__.insert(), [
+            {
+                "queue_number": f"C{i}",
+                "patient_id": i + 1,
+                "checkup_type": "General Checkup",
+                "priority": i % 3,
+                "status": QueueStatus.WAITING,
+            }
+            for i in range(PATIENTS)
+        ])
+    return list(range(1, stations + 1))
+
+
+def claim_atomic(service, user_id):
+    return service.claim_next_patient(user_id)
+
+
+def claim_naive(service, user_id):
+    """Read the head of the queue, then update it (what stations did before /claim)"""
+    entry = service.get_next_patient()
+    if not entry:
+        return None
+    entry_id = entry.id
+    entry = service.update_queue_status(entry_id, QueueStatusUpdate(status=QueueStatus.IN_PROGRESS))
+    service.db.query(Queue).filter(Queue.id == entry_id).update({Queue.assigned_to: user_id})
+    service.db.commit()
+    return entry
+
+
+def run(stations, claim):
+    engine = make_engine(stations)
+    user_ids = seed(engine, stations)
+    Session = sessionmaker(bind=engine)
+    claims = {user_id: [] for user_id in user_ids}
+    errors = []
+    start = threading.Barrier(stations)
+
+    def station(user_id):
+        db = Session()
+        service = QueueService(db)
+        start.wait()
+        try:
+            while True:
+                try:
+                    entry = claim(service, user_id)
+                except ValueError:
+                    continue
+                if entry is None:
+                    return
+                claims[user_id].append(entry.id)
+                time.sleep(SERVICE_SECONDS)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=station, args=(user_id,)) for user_id in user_ids]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    # Every entry must have been handed out once, to the station now recorded on it
+    handed_out = Counter(entry_id for entries in claims.values() for entry_id in entries)
+    duplicates = sum(count - 1 for count in handed_out.values() if count > 1)
+    with engine.connect() as conn:
+        rows = conn.execute(Queue.__table__.select()).fetchall()
+    waiting = sum(1 for row in rows if row.status == QueueStatus.WAITING)
+    mismatched = sum(
+        1 for row in rows
+        if row.status != QueueStatus.WAITING and row.id not in claims.get(row.assigned_to, [])
+    )
+    engine.dispose()
+
+    total = sum(handed_out.values())
+    return {
+        "claims": total,
+        "per_second": total / elapsed if elapsed else 0.0,
+        "duplicates": duplicates,
+        "mismatched": mismatched,
+        "left_waiting": waiting,
+        "errors": errors,
+    }
+
+
+def main():
+    settings.queue_index_enabled = False  # measure the database paths only
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 2, 4, 8, 16]
+    print(f"Patients: {PATIENTS}, simulated service time: {SERVICE_SECONDS * 1000:.0f} ms")
+    print(f"{'mode':<8}{'stations':>9}{'claims':>8}{'claims/s':>10}{'double':>8}{'wrong':>7}{'left':>6}")
+
+    failed = False
+    for stations in sizes:
+        for mode, claim in (("claim", claim_atomic), ("naive", claim_naive)):
+            result = run(stations, claim)
+            print(
+                f"{mode:<8}{stations:>9}{result['claims']:>8}{result['per_second']:>10.1f}"
+                f"{result['duplicates']:>8}{result['mismatched']:>7}{result['left_waiting']:>6}"
+            )
+            for error in result["errors"][:3]:
+                print(f"    error: {error!r}")
+            if mode == "claim" and (
+                result["duplicates"] or result["mismatched"] or result["left_waiting"]
+                or result["claims"] != PATIENTS or result["errors"]
+            ):
+                failed = True
+
+    if failed:
+        print("FAILED: claim handed out a patient twice or lost one")
+        sys.exit(1)
+    print("OK: every patient was claimed exactly once")
+
+
+if __name__ == "__main__":
+    main()
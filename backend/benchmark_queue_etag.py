@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Conditional GET benchmark for queue polling
+Simulates waiting-room screens polling GET /api/v1/queue/ and
+/api/v1/queue/stats/summary while reception occasionally changes the
+queue. Each screen either re-downloads everything on every poll or sends
+back the ETag it last saw in If-None-Match. Reports throughput, latency,
+how many polls were answered 304 Not Modified and the SQL statements run.
+
+Usage: python benchmark_queue_etag.py [polls] [screens] [changes]
+       (default: 3000 20 30)
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'etag.db')}"
+os.environ["DEBUG"] = "false"
+os.environ["QUEUE_VERSION_REFRESH_SECONDS"] = "0"
+
+import httpx
+from sqlalchemy import event
+from app.main import app
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Patient, Queue
+from app.models.queue import QueueStatus
+from app.schemas.queue import QueueStatusUpdate
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.patient import format_patient_id
+from app.services.queue import QueueService
+from app.services.user import UserService
+
+ENTRIES = 2000
+
+
+def seed():
+    create_tables()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(i),
+                "first_name": "Bench",
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1980, 1, 1),
+                "gender": "other",
+            }
+            for i in range(1, ENTRIES + 1)
+        ])
+        conn.execute(Queue.__table__.insert(), [
+            {
+                "queue_number": f"Q{i:05d}",
+                "patient_id": i,
+                "checkup_type": rng.choice(["General Checkup", "Cardiology", "Eye Exam"]),
+                "priority": rng.choice([0, 0, 0, 1, 2]),
+                "status": rng.choice([QueueStatus.WAITING.name, QueueStatus.COMPLETED.name]),
+                "check_in_time": now - timedelta(seconds=rng.randint(0, 7200)),
+            }
+            for i in range(1, ENTRIES + 1)
+        ])
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123",
+            is_superuser=True
+        ))
+        return AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+    finally:
+        db.close()
+
+
+def change(number):
+    """A reception desk edit: re-queue one entry with a note"""
+    db = SessionLocal()
+    try:
+        QueueService(db).update_queue_status(
+            (number * 37) % ENTRIES + 1, QueueStatusUpdate(status=QueueStatus.WAITING, notes=f"edit {number}")
+        )
+    finally:
+        db.close()
+
+
+async def fire(token, polls, screens, changes, conditional):
+    timings = []
+    not_modified = 0
+    semaphore = asyncio.Semaphore(screens)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        etags = {}
+
+        async def poll(number):
+            nonlocal not_modified
+            path = ["/api/v1/queue/", "/api/v1/queue/stats/summary"][number % 2]
+            key = (number % screens, path)
+            async with semaphore:
+                headers = {"If-None-Match": etags[key]} if conditional and key in etags else {}
+                started = time.perf_counter()
+                response = await client.get(path, params={"status_filter": "waiting"} if number % 2 == 0 else None,
+                                            headers=headers)
+                timings.append((time.perf_counter() - started) * 1000)
+            if response.status_code == 304:
+                not_modified += 1
+            else:
+                assert response.status_code == 200, response.text
+                etags[key] = response.headers["etag"]
+
+        async def changer():
+            for number in range(changes):
+                await asyncio.sleep(0.02)
+                await asyncio.to_thread(change, number)
+
+        started = time.perf_counter()
+        await asyncio.gather(changer(), *(poll(number) for number in range(polls)))
+        elapsed = time.perf_counter() - started
+    return timings, not_modified, elapsed
+
+
+def main():
+    polls = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    screens = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    changes = int(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    token = seed()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+
+    print(f"{ENTRIES} queue entries, {polls} polls from {screens} screens, {changes} queue changes meanwhile")
+    print(f"  {'polling':<14}{'polls/s':>9}{'p50 ms':>9}{'p99 ms':>9}{'304s':>7}{'SQL':>8}")
+    for conditional in (False, True):
+        statements.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            timings, not_modified, elapsed = asyncio.run(fire(token, polls, screens, changes, conditional))
+        timings.sort()
+        label = "If-None-Match" if conditional else "plain"
+        print(f"  {label:<14}{polls / elapsed:>9.0f}{statistics.median(timings):>9.2f}"
+              f"{timings[int(len(timings) * 0.99) - 1]:>9.2f}{not_modified:>7}{len(statements):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Queue event fan-out benchmark
+Connects a number of in-process subscribers to the queue event broadcaster
+(the stream behind GET /api/v1/queue/events) and publishes queue changes
+from a worker thread, the way a check-in served in the threadpool would.
+Reports the publisher's cost per change and how long the change took to
+reach every subscriber, for growing subscriber counts. None of this touches
+the database; with polling every one of those clients would instead run the
+queue listing and statistics queries on each poll interval.
+
+Usage: python benchmark_queue_events.py [changes] [max subscribers]
+       (default: 200 1000)
+"""
+
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DEBUG"] = "false"
+
+from app.services.queue_events import QueueEventBroadcaster
+
+
+async def run(subscriber_count, changes):
+    broadcaster = QueueEventBroadcaster(history_size=changes, max_pending=changes + 1)
+    published_at = {}
+    delays = []
+
+    async def subscriber():
+        received = 0
+        async for chunk in broadcaster.stream(0, keepalive_seconds=60):
+            now = time.perf_counter()
+            for frame in chunk.split(b"\n\n"):
+                if frame.startswith(b"id: "):
+                    delays.append((now - published_at[int(frame.split(b"\n", 1)[0][4:])]) * 1000)
+                    received += 1
+            if received == changes:
+                return
+
+    tasks = [asyncio.create_task(subscriber()) for _ in range(subscriber_count)]
+    while len(broadcaster) < subscriber_count:
+        await asyncio.sleep(0.01)
+
+    publish_times = []
+
+    def publisher():
+        entry = {"id": 1, "queue_number": "Q0001", "status": "waiting", "priority": 0}
+        for number in range(1, changes + 1):
+            published_at[number] = time.perf_counter()
+            broadcaster.publish("status_changed", number, entry)
+            publish_times.append((time.perf_counter() - published_at[number]) * 1_000_000)
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=publisher)
+    thread.start()
+    await asyncio.gather(*tasks)
+    thread.join()
+    delays.sort()
+    return statistics.median(publish_times), statistics.median(delays), delays[int(len(delays) * 0.99) - 1]
+
+
+def main():
+    changes = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    max_subscribers = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+
+    print(f"{changes} queue changes published from a worker thread")
+    print(f"  {'subscribers':>11}{'publish us':>12}{'delivery p50 ms':>17}{'p99 ms':>9}")
+    for subscriber_count in (10, 100, 1000, 10000):
+        if subscriber_count > max_subscribers:
+            break
+        publish_us, p50, p99 = asyncio.run(run(subscriber_count, changes))
+        print(f"  {subscriber_count:>11}{publish_us:>12.1f}{p50:>17.2f}{p99:>9.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Queue hot-path index benchmark
+Seeds a throwaway database with queue history, then times the queries issued
+by QueueService.get_next_patient, get_queue_status and the add_to_queue
+"already in queue" check, printing their query plans before and after the
+hot-path indexes exist.
+
+Usage: python benchmark_queue_indexes.py [rows ...]     (default: 100000 1000000)
+Set BENCHMARK_DATABASE_URL to run against PostgreSQL instead of SQLite.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models import Patient, Queue
+from app.models.queue import QueueStatus
+from app.services.queue import QueueService
+
+HOT_PATH_INDEXES = [
+    "ix_queue_status_priority_check_in",
+    "ix_queue_patient_id_status",
+    "ix_queue_waiting_priority_check_in",
+]
+PATIENTS = 5000
+BATCH_SIZE = 20000
+REPEAT = 20
+
+
+def make_engine(rows):
+    url = os.environ.get("BENCHMARK_DATABASE_URL")
+    if url:
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+    else:
+        path = os.path.join(tempfile.mkdtemp(), f"queue_{rows}.db")
+        engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def seed(engine, rows):
+    """Insert patients and mostly-completed queue history"""
+    started = datetime.utcnow() - timedelta(days=365)
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": f"B{i:05d}",
+                "first_name": "Bench",
+                "last_name": f"Patient{i}",
+                "date_of_birth": datetime(1980, 1, 1).date(),
+                "gender": "other",
+            }
+            for i in range(PATIENTS)
+        ])
+
+    for offset in range(0, rows, BATCH_SIZE):
+        batch = []
+        for i in range(offset, min(offset + BATCH_SIZE, rows)):
+            remaining = rows - i
+            if remaining <= 200:
+                status = QueueStatus.WAITING
+            elif remaining <= 210:
+                status = QueueStatus.IN_PROGRESS
+            else:
+                status = random.choice([QueueStatus.COMPLETED] * 9 + [QueueStatus.CANCELLED])
+            check_in = started + timedelta(seconds=i * 30)
+            batch.append({
+                "queue_number": f"H{i}",
+                "patient_id": i % PATIENTS + 1,
+                "checkup_type": random.choice(["General Checkup", "Cardiac", "Diabetes Screening"]),
+                "priority": random.choice([0, 0, 0, 1, 2]),
+                "status": status,
+                "check_in_time": check_in,
+                "start_time": check_in + timedelta(minutes=20) if status != QueueStatus.WAITING else None,
+            })
+        with engine.begin() as conn:
+            conn.execute(Queue.__table__.insert(), batch)
+
+
+def drop_hot_path_indexes(engine):
+    with engine.begin() as conn:
+        for name in HOT_PATH_INDEXES:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+
+
+def create_hot_path_indexes(engine):
+    indexes = [index for index in Queue.__table__.indexes if index.name in HOT_PATH_INDEXES]
+    with engine.begin() as conn:
+        for index in indexes:
+            index.create(conn)
+        conn.execute(text("ANALYZE"))
+
+
+def capture_statement(engine, func):
+    """Run func and return the last SQL statement and parameters it issued"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        func()
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    return captured[-1]
+
+
+def explain(engine, statement, parameters):
+    with engine.connect() as conn:
+        if engine.dialect.name == "sqlite":
+            rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+            return [row[-1] for row in rows]
+        rows = conn.exec_driver_sql(f"EXPLAIN {statement}", parameters).fetchall()
+        return [row[0] for row in rows]
+
+
+def run_queries(engine, label):
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    service = QueueService(db)
+    queries = {
+        "get_next_patient": lambda: service.get_next_patient(),
+        "get_queue_status(waiting)": lambda: service.get_queue_status(status_filter="waiting", limit=50),
+        "add_to_queue existing check": lambda: db.query(Queue).filter(
+            Queue.patient_id == 42,
+            Queue.status.in_([QueueStatus.WAITING, QueueStatus.IN_PROGRESS])
+        ).first(),
+    }
+
+    print(f"  {label}")
+    for name, query in queries.items():
+        statement, parameters = capture_statement(engine, query)
+        started = time.perf_counter()
+        for _ in range(REPEAT):
+            query()
+        elapsed_ms = (time.perf_counter() - started) * 1000 / REPEAT
+        print(f"    {name:<30} {elapsed_ms:8.2f} ms")
+        for line in explain(engine, statement, parameters):
+            print(f"      {line}")
+    db.close()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000]
+    for rows in sizes:
+        print(f"Queue rows: {rows:,}")
+        engine = make_engine(rows)
+        started = time.perf_counter()
+        seed(engine, rows)
+        print(f"  Seeded in {time.perf_counter() - started:.1f}s")
+
+        drop_hot_path_indexes(engine)
+        run_queries(engine, "Without hot-path indexes")
+        create_hot_path_indexes(engine)
+        run_queries(engine, "With hot-path indexes")
+        engine.dispose()
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Queue listing with embedded patients benchmark
+Compares how a queue board gets patient names for a page of the queue:
+listing GET /api/v1/queue/ and then GET /api/v1/patients/{id} per entry
+(what the UI did), versus one listing with include_patient=true. Reports
+HTTP requests, SQL statements and time per page, and checks that every
+listing runs at most two SQL statements whatever the page size.
+
+Usage: python benchmark_queue_patients.py [entries] [repeat]
+       (default: 2000 5)
+"""
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'queue_patients.db')}"
+os.environ["DEBUG"] = "false"
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.main import app
+from app.core.database import SessionLocal, create_tables, engine
+from app.models import Patient, Queue
+from app.models.queue import QueueStatus
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.patient import format_patient_id
+from app.services.user import UserService
+
+MAX_STATEMENTS = 2
+
+
+def seed(entries):
+    create_tables()
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(i),
+                "first_name": "Bench",
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1950, 1, 1) + timedelta(days=rng.randint(0, 20000)),
+                "gender": rng.choice(["male", "female", "other"]),
+            }
+            for i in range(1, entries + 1)
+        ])
+        conn.execute(Queue.__table__.insert(), [
+            {
+                "queue_number": f"Q{i:05d}",
+                "patient_id": i,
+                "checkup_type": "General Checkup",
+                "priority": rng.choice([0, 0, 0, 1, 2]),
+                "status": rng.choice([QueueStatus.WAITING.name, QueueStatus.COMPLETED.name]),
+                "check_in_time": now - timedelta(seconds=rng.randint(0, 7200)),
+            }
+            for i in range(1, entries + 1)
+        ])
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123",
+            is_superuser=True
+        ))
+        return AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+    finally:
+        db.close()
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    token = seed(entries)
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    client = TestClient(app, headers={"Authorization": f"Bearer {token}"})
+
+    def page(params, per_row):
+        requests = 1
+        response = client.get("/api/v1/queue/", params=params)
+        assert response.status_code == 200, response.text
+        rows = response.json()
+        if per_row:
+            for row in rows:
+                assert client.get(f"/api/v1/patients/{row['patient_id']}").status_code == 200
+            requests += len(rows)
+        else:
+            assert all(row["patient"]["patient_id"] for row in rows)
+        return requests
+
+    print(f"{entries} queue entries, best of {repeat}")
+    print(f"  {'listing':<12}{'page':>6}{'patients':>12}{'requests':>10}{'SQL':>6}{'ms':>10}")
+    with contextlib.redirect_stdout(io.StringIO()):
+        client.get("/api/v1/queue/", params={"status_filter": "waiting", "limit": 1})
+    for status_filter in (QueueStatus.WAITING.value, QueueStatus.COMPLETED.value, None):
+        for limit in (10, 100, 500):
+            for per_row in (True, False):
+                params = {"limit": limit}
+                if status_filter:
+                    params["status_filter"] = status_filter
+                if not per_row:
+                    params["include_patient"] = "true"
+                best = None
+                for _ in range(repeat):
+                    statements.clear()
+                    started = time.perf_counter()
+                    requests = page(params, per_row)
+                    elapsed = (time.perf_counter() - started) * 1000
+                    best = elapsed if best is None else min(best, elapsed)
+                    if not per_row:
+                        assert len(statements) <= MAX_STATEMENTS, (params, len(statements))
+                label = "per row" if per_row else "embedded"
+                print(f"  {status_filter or 'all':<12}{limit:>6}{label:>12}{requests:>10}{len(statements):>6}{best:>10.1f}")
+    print(f"every include_patient listing ran at most {MAX_STATEMENTS} SQL statements")
+
+
+if __name__ == "__main__":
+    main()
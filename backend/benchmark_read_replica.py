@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Read replica routing benchmark
+Seeds a primary SQLite file, copies it to a second file that acts as the
+read replica, then runs check-ins (POST /patients/register) alongside
+display-board polling (queue listing, queue and patient statistics, patient
+search, user list) against the app. Reports latency and how many SQL
+statements each database served, first with the replica in use and then
+with the lag guard forcing every read back to the primary.
+
+Usage: python benchmark_read_replica.py [polls] [check-ins] [concurrency]
+       (default: 2000 200 20)
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+DIRECTORY = tempfile.mkdtemp()
+PRIMARY_PATH = os.path.join(DIRECTORY, "primary.db")
+REPLICA_PATH = os.path.join(DIRECTORY, "replica.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{PRIMARY_PATH}"
+os.environ["DATABASE_REPLICA_URL"] = f"sqlite:///{REPLICA_PATH}"
+os.environ["REPLICA_MAX_LAG_SECONDS"] = "3600"  # the copy never catches up
+os.environ["DEBUG"] = "false"
+
+import httpx
+from sqlalchemy import event
+from app.main import app
+from app.core.database import SessionLocal, create_tables, engine, replica_engine
+from app.core.replica import replica_guard
+from app.models import IdSequence, Patient
+from app.schemas.user import UserCreate
+from app.services.auth import AuthService
+from app.services.patient import format_patient_id
+from app.services.user import UserService
+
+PATIENTS = 20000
+
+
+def seed():
+    create_tables()
+    rng = random.Random(42)
+    with engine.begin() as conn:
+        conn.execute(Patient.__table__.insert(), [
+            {
+                "patient_id": format_patient_id(i),
+                "first_name": rng.choice(["Anna", "James", "Wei", "Priya", "Olga"]),
+                "last_name": f"Patient{i}",
+                "date_of_birth": date(1980, 1, 1),
+                "gender": "other",
+            }
+            for i in range(1, PATIENTS + 1)
+        ])
+        conn.execute(IdSequence.__table__.insert(), {"name": "patient_id", "next_value": PATIENTS + 1})
+    db = SessionLocal()
+    try:
+        user = UserService(db).create_user(UserCreate(
+            username="benchmark",
+            email="benchmark@example.com",
+            full_name="Benchmark User",
+            password="password123",
+            is_superuser=True
+        ))
+        token = AuthService(db).create_access_token(data={"sub": user.username}, user=user)
+    finally:
+        db.close()
+
+    # "Replicate": stamp the heartbeat, fold the WAL into the file and copy it
+    with engine.begin() as conn:
+        replica_guard._stamp(conn, time.time())
+    engine.dispose()
+    connection = sqlite3.connect(PRIMARY_PATH)
+    connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    connection.close()
+    shutil.copy(PRIMARY_PATH, REPLICA_PATH)
+    return token
+
+
+def polls(count):
+    rng = random.Random(7)
+    return [
+        rng.choice([
+            ("/api/v1/queue/", {"status_filter": "completed", "limit": 20}),
+            ("/api/v1/queue/stats/summary", None),
+            ("/api/v1/patients/stats", None),
+            ("/api/v1/patients/", {"search": f"Patient{rng.randint(1, PATIENTS)}", "limit": 10}),
+            ("/api/v1/users/", None),
+        ])
+        for _ in range(count)
+    ]
+
+
+async def fire(token, poll_requests, check_ins, concurrency):
+    timings = {"poll": [], "check-in": []}
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test",
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        async def poll(path, params):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, params=params)
+                assert response.status_code == 200, response.text
+                timings["poll"].append((time.perf_counter() - started) * 1000)
+
+        async def check_in(number):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/patients/register", json={
+                    "first_name": "Walk",
+                    "last_name": f"In{number}",
+                    "date_of_birth": "1990-01-01",
+                    "gender": "other",
+                    "phone": "5550100",
+                    "checkup_type": "General Checkup",
+                })
+                assert response.status_code == 201, response.text
+                timings["check-in"].append((time.perf_counter() - started) * 1000)
+
+        tasks = [poll(path, params) for path, params in poll_requests]
+        tasks += [check_in(number) for number in range(check_ins)]
+        random.Random(3).shuffle(tasks)
+        started = time.perf_counter()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+    return timings, elapsed
+
+
+def main():
+    poll_count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    check_ins = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    token = seed()
+    statements = {"primary": 0, "replica": 0}
+
+    def counter(name):
+        def count(*args):
+            statements[name] += 1
+        return count
+
+    event.listen(engine, "before_cursor_execute", counter("primary"))
+    event.listen(replica_engine, "before_cursor_execute", counter("replica"))
+
+    print(f"{PATIENTS:,} patients, {poll_count} polls + {check_ins} check-ins, {concurrency} concurrent clients")
+    print(f"  {'reads from':<12}{'req/s':>8}{'poll p50':>10}{'p99':>9}{'check-in p50':>14}{'p99':>9}"
+          f"{'primary SQL':>13}{'replica SQL':>13}")
+    for label, max_lag in (("replica", 3600.0), ("primary", 0.0)):
+        # A zero lag budget makes the guard send every read to the primary
+        replica_guard.max_lag_seconds = max_lag
+        statements.update(primary=0, replica=0)
+        with contextlib.redirect_stdout(io.StringIO()):  # check-ins still print
+            timings, elapsed = asyncio.run(fire(token, polls(poll_count), check_ins, concurrency))
+        line = f"  {label:<12}{(poll_count + check_ins) / elapsed:>8.0f}"
+        for name in ("poll", "check-in"):
+            values = sorted(timings[name])
+            width = 10 if name == "poll" else 14
+            line += f"{statistics.median(values):>{width}.2f}{values[int(len(values) * 0.99) - 1]:>9.2f}"
+        print(f"{line}{statements['primary']:>13}{statements['replica']:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Patient registration benchmark
+Registers patients the way POST /api/v1/patients/register used to
+(PatientService.create_patient, then QueueService.add_to_queue: two
+commits, a refresh after each and a duplicate-queue check) and with
+PatientService.register_patient (both rows in one flush and one commit).
+Reports latency per registration and the SQL statements and commits it
+takes. Runs against a file SQLite database, where each commit is an fsync.
+
+Usage: python benchmark_registration.py [registrations]     (default: 500)
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date
+
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'registration.db')}"
+os.environ["DEBUG"] = "false"
+
+from sqlalchemy import event
+from app.core.database import SessionLocal, create_tables, engine
+from app.schemas.patient import PatientCreate, PatientRegistration
+from app.schemas.queue import QueueCreate
+from app.services.patient import PatientService
+from app.services.queue import QueueService
+
+
+def registration(number):
+    return PatientRegistration(
+        first_name="Bench",
+        last_name=f"Patient{number}",
+        date_of_birth=date(1980, 1, 1),
+        gender="other",
+        phone="+1234567890",
+        checkup_type="General Checkup",
+        priority=number % 3,
+        notes="Walk-in"
+    )
+
+
+def two_step(db, data):
+    patient_data = PatientCreate(**data.model_dump(include=set(PatientCreate.model_fields)))
+    patient = PatientService(db).create_patient(patient_data)
+    queue = QueueService(db).add_to_queue(QueueCreate(
+        patient_id=patient.id,
+        checkup_type=data.checkup_type,
+        priority=data.priority,
+        notes=data.notes,
+        estimated_wait_time=data.estimated_wait_time
+    ))
+    return patient, queue
+
+
+def single_transaction(db, data):
+    return PatientService(db).register_patient(data)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    create_tables()
+    statements = []
+    commits = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    event.listen(engine, "commit", lambda *args: commits.append(1))
+
+    print(f"{count} registrations per strategy")
+    print(f"  {'strategy':<20}{'p50 ms':>9}{'p99 ms':>9}{'SQL/reg':>9}{'commits/reg':>13}")
+    number = 0
+    for label, register in (("create + add_to_queue", two_step), ("register_patient", single_transaction)):
+        timings = []
+        statements.clear()
+        commits.clear()
+        for _ in range(count):
+            number += 1
+            data = registration(number)
+            db = SessionLocal()
+            try:
+                started = time.perf_counter()
+                patient, queue = register(db, data)
+                # What the endpoint serializes
+                patient.created_at, queue.check_in_time
+                timings.append((time.perf_counter() - started) * 1000)
+            finally:
+                db.close()
+        timings.sort()
+        print(f"  {label:<20}{statistics.median(timings):>9.2f}{timings[int(len(timings) * 0.99) - 1]:>9.2f}"
+              f"{len(statements) / count:>9.2f}{len(commits) / count:>13.2f}")
+
+
+if __name__ == "__main__":
+    main()
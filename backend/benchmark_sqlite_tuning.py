@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+SQLite tuning benchmark
+Runs reception check-ins (create patient + add to queue) in writer threads
+while display-board threads poll the queue (statistics, in-progress list,
+patient list) against a fresh SQLite file, once with SQLite's default
+connection settings and once with the tuned profile from
+app.core.database (WAL, synchronous=NORMAL, mmap, cache, busy timeout).
+Reports check-in and poll throughput, poll latency and "database is locked"
+errors.
+
+Usage: python benchmark_sqlite_tuning.py [seconds] [writers] [readers]
+       (default: 10 2 6)
+"""
+
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["DEBUG"] = "false"
+os.environ["QUEUE_INDEX_ENABLED"] = "false"
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base, configure_sqlite
+from app.schemas.patient import PatientCreate
+from app.schemas.queue import QueueCreate
+from app.services.patient import PatientService
+from app.services.queue import QueueService
+
+
+def make_engine(tuned):
+    path = os.path.join(tempfile.mkdtemp(), "tuning.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False},
+                           pool_size=20, max_overflow=0)
+    if tuned:
+        configure_sqlite(engine)
+    Base.metadata.create_all(engine)
+    return engine
+
+
+def check_in(db, number):
+    patient = PatientService(db).create_patient(PatientCreate(
+        first_name="Bench",
+        last_name=f"Patient{number}",
+        date_of_birth=date(1980, 1, 1),
+        gender="other",
+        phone="5550100"
+    ))
+    QueueService(db).add_to_queue(QueueCreate(patient_id=patient.id, checkup_type="General Checkup"))
+
+
+def poll(db, number):
+    [
+        lambda: QueueService(db).get_queue_statistics(),
+        lambda: QueueService(db).get_queue_status(status_filter="waiting", limit=50),
+        lambda: PatientService(db).get_patients(limit=20),
+    ][number % 3]()
+    db.rollback()
+
+
+def worker(Session, task, deadline, timings, errors):
+    db = Session()
+    number = 0
+    try:
+        while time.perf_counter() < deadline:
+            number += 1
+            started = time.perf_counter()
+            try:
+                task(db, number)
+            except OperationalError:
+                db.rollback()
+                errors.append(1)
+                continue
+            timings.append((time.perf_counter() - started) * 1000)
+    finally:
+        db.close()
+
+
+def run(tuned, seconds, writers, readers):
+    engine = make_engine(tuned)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    results = {"check-in": ([], []), "poll": ([], [])}
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=worker, args=(Session, check_in, deadline) + results["check-in"])
+        for _ in range(writers)
+    ] + [
+        threading.Thread(target=worker, args=(Session, poll, deadline) + results["poll"])
+        for _ in range(readers)
+    ]
+    # The services still print every check-in
+    with contextlib.redirect_stdout(io.StringIO()):
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    engine.dispose()
+
+    label = "tuned" if tuned else "default"
+    for name, (timings, errors) in results.items():
+        timings.sort()
+        p50 = statistics.median(timings) if timings else 0
+        p99 = timings[int(len(timings) * 0.99) - 1] if timings else 0
+        print(f"  {label:<9}{name:<10}{len(timings) / seconds:>9.0f}{p50:>10.2f}{p99:>10.2f}{len(errors):>8}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 6
+
+    print(f"{writers} check-in threads, {readers} polling threads, {seconds:g}s per profile")
+    print(f"  {'profile':<9}{'task':<10}{'ops/s':>9}{'p50 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for tuned in (False, True):
+        run(tuned, seconds, writers, readers)
+
+
+if __name__ == "__main__":
+    main()